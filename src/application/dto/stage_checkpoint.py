@@ -0,0 +1,10 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class StageCheckpoint(BaseModel):
+    key: str = Field(description="Llave del documento (record_id y llave del archivo)")
+    stage: str = Field(description="Última etapa completada")
+    values: dict[str, Any] = Field(description="Estado del workflow al terminar la etapa")
+    updated_at: float = Field(description="Momento en que se guardó (epoch en segundos)")
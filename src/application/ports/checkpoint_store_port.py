@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from application.dto.stage_checkpoint import StageCheckpoint
+
+
+class CheckpointStorePort(ABC):
+    @abstractmethod
+    async def load(self, key: str) -> StageCheckpoint | None:
+        ...
+
+    @abstractmethod
+    async def save(self, key: str, stage: str, values: dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        """Libera la conexión del almacén; por defecto no hay nada que liberar"""
+        return None
@@ -9,3 +9,7 @@ class ExtractorDocumentPort(ABC):
     @abstractmethod
     async def extract_pipeline(self, **kwargs) -> TextractPipelineResult | None:
         ...
+
+    async def close(self) -> None:
+        """Libera los recursos de larga vida del extractor; por defecto no hay nada que liberar"""
+        return None
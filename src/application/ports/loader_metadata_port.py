@@ -5,5 +5,5 @@ from domain.models.entities.bank_guarantee_item_entity import BankGuaranteeItemE
 
 class LoaderMetadataPort(ABC):
     @abstractmethod
-    def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+    async def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
         ...
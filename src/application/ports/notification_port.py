@@ -4,5 +4,5 @@ from domain.models.notification import Notification
 
 class NotificationPort(ABC):
     @abstractmethod
-    def notify(self, messages: list[Notification]) -> None:
+    async def notify(self, messages: list[Notification]) -> None:
         ...
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+
+
+class ProcessedDocumentStorePort(ABC):
+    @abstractmethod
+    async def get_processed_at(self, key: str) -> float | None:
+        """Momento (epoch en segundos) en que se procesó el documento; None si no existe o expiró"""
+        ...
+
+    @abstractmethod
+    async def add(self, key: str, processed_at: float) -> None:
+        ...
+
+    async def close(self) -> None:
+        """Libera la conexión del almacén; por defecto no hay nada que liberar"""
+        return None
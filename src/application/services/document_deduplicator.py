@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from application.ports.poller_document_port import PollerDocumentPort
+from application.ports.processed_document_store_port import ProcessedDocumentStorePort
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+app_logger = logging.getLogger("app.workflows")
+
+
+class DocumentDeduplicator:
+    """
+    Descarta los documentos que ya fueron procesados antes de ejecutar el workflow. La llave es el
+    record_id más el ETag del objeto en S3: un archivo reemplazado con otro contenido se vuelve a
+    procesar. Un LRU acotado en memoria responde primero y el almacén persistente sobrevive reinicios;
+    los documentos en curso también se descartan para que una entrega repetida no corra en paralelo
+    """
+
+    def __init__(
+            self,
+            store: ProcessedDocumentStorePort,
+            poller: PollerDocumentPort,
+            bucket_name: str,
+            ttl_seconds: float | None = None,
+            memory_max_entries: int = 10_000,
+            metrics: MetricsRegistry | None = None
+    ):
+        """
+        :param store: Almacén persistente de documentos procesados
+        :param poller: Acceso al bucket para obtener el ETag de los documentos que no lo traen
+        :param bucket_name: Bucket de los documentos
+        :param ttl_seconds: Vigencia de un documento procesado; None no expira
+        :param memory_max_entries: Capacidad del LRU en memoria
+        :param metrics: Registro de métricas para los documentos descartados
+        """
+        self._store: ProcessedDocumentStorePort = store
+        self._poller: PollerDocumentPort = poller
+        self._bucket_name: str = bucket_name
+        self._ttl_seconds: float | None = ttl_seconds
+        self._memory_max_entries: int = memory_max_entries
+        self._metrics: MetricsRegistry | None = metrics
+        # Llave -> momento en que se procesó
+        self._memory: OrderedDict[str, float] = OrderedDict()
+        self._in_flight: set[str] = set()
+
+    @staticmethod
+    def build_key(doc: DocumentContractState) -> str | None:
+        if doc.etag is None:
+            return None
+        etag: str = doc.etag.strip('"')
+        return f"{doc.record_id}:{etag}"
+
+    async def filter_new(
+            self, documents: list[DocumentContractState]
+    ) -> tuple[list[DocumentContractState], list[DocumentContractState]]:
+        """
+        Separa los documentos nuevos de los duplicados y reserva los nuevos como documentos en curso
+        :param documents: Documentos recibidos
+        :return: (documentos a procesar, documentos descartados)
+        """
+        documents = await asyncio.gather(*[self._with_etag(doc) for doc in documents])
+        new_documents: list[DocumentContractState] = []
+        skipped: list[DocumentContractState] = []
+        for doc in documents:
+            key: str | None = self.build_key(doc)
+            if key is None:
+                # Sin ETag no se puede saber si el contenido cambió: se procesa
+                new_documents.append(doc)
+                continue
+            if key in self._in_flight:
+                skipped.append(doc)
+                continue
+            # Se reserva antes de consultar el almacén: una entrega concurrente ya la encuentra en curso
+            self._in_flight.add(key)
+            if await self._is_processed(key):
+                self._in_flight.discard(key)
+                skipped.append(doc)
+                continue
+            new_documents.append(doc)
+        if skipped:
+            app_logger.info(f"Se descartaron {len(skipped)} documentos ya procesados o en curso")
+            if self._metrics is not None:
+                self._metrics.increment("workflow.dedup.skipped", len(skipped))
+        return new_documents, skipped
+
+    async def complete(self, doc: DocumentContractState) -> None:
+        """
+        Libera la reserva del documento; si se procesó con éxito queda registrado como procesado
+        :param doc: Resultado del workflow
+        """
+        key: str | None = self.build_key(doc)
+        if key is None:
+            return
+        self._in_flight.discard(key)
+        if doc.status != DocumentStatus.PROCESSED:
+            return
+        processed_at: float = time.time()
+        self._remember(key, processed_at)
+        try:
+            await self._store.add(key, processed_at)
+        except Exception as e:
+            app_logger.error(f"Error registrando el documento procesado {doc.record_id}: {str(e)}")
+
+    def release(self, documents: list[DocumentContractState]) -> None:
+        """
+        Libera las reservas que quedaron sin resultado (por ejemplo si la ejecución se interrumpió)
+        :param documents: Documentos reservados por filter_new
+        """
+        for doc in documents:
+            key: str | None = self.build_key(doc)
+            if key is not None:
+                self._in_flight.discard(key)
+
+    async def close(self) -> None:
+        await self._store.close()
+
+    async def _with_etag(self, doc: DocumentContractState) -> DocumentContractState:
+        if doc.etag is not None:
+            return doc
+        try:
+            etag: str | None = await self._poller.get_etag(self._bucket_name, doc.key)
+        except Exception as e:
+            app_logger.error(f"Error obteniendo el ETag de {doc.key}: {str(e)}")
+            return doc
+        return doc.model_copy(update={"etag": etag})
+
+    async def _is_processed(self, key: str) -> bool:
+        processed_at: float | None = self._memory.get(key)
+        if processed_at is not None:
+            if not self._expired(processed_at):
+                self._memory.move_to_end(key)
+                return True
+            del self._memory[key]
+            return False
+        try:
+            processed_at = await self._store.get_processed_at(key)
+        except Exception as e:
+            app_logger.error(f"Error consultando el registro de documentos procesados: {str(e)}")
+            return False
+        if processed_at is None or self._expired(processed_at):
+            return False
+        self._remember(key, processed_at)
+        return True
+
+    def _remember(self, key: str, processed_at: float) -> None:
+        self._memory[key] = processed_at
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _expired(self, processed_at: float) -> bool:
+        return self._ttl_seconds is not None and time.time() - processed_at > self._ttl_seconds
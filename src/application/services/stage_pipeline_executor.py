@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from application.use_cases.workflows.workflow_base import WorkflowBase
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+from domain.models.states.etl_base_state import EtlBaseState
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+app_logger = logging.getLogger("app.workflows")
+
+
+@dataclass
+class _PipelineItem:
+    document: DocumentContractState
+    state: EtlBaseState
+    # Se fija cuando la primera etapa toma el documento: la espera en la cola de entrada no cuenta
+    started_at: float | None = None
+
+
+class StagePipelineExecutor:
+    """
+    Ejecuta las etapas de un workflow como un pipeline: cada etapa tiene su propio pool de workers y
+    una cola acotada de entrada. Mientras un documento espera a textract en extract, otros avanzan por
+    transform y load. Las etapas síncronas (CPU) se ejecutan en hilos para no bloquear el event loop
+    """
+
+    def __init__(
+            self,
+            workflow: WorkflowBase,
+            stage_concurrency: dict[str, int] | None = None,
+            queue_size: int = 8,
+            deadline_seconds: float | None = None,
+            metrics: MetricsRegistry | None = None
+    ):
+        """
+        :param workflow: Workflow cuyas etapas se ejecutan
+        :param stage_concurrency: Workers por etapa; las etapas no indicadas usan un worker
+        :param queue_size: Capacidad de la cola de entrada de cada etapa
+        :param deadline_seconds: Tiempo máximo de un documento en todo el pipeline; None no limita
+        :param metrics: Registro de métricas para la profundidad de colas y el tiempo por etapa
+        """
+        self._workflow: WorkflowBase = workflow
+        self._stage_concurrency: dict[str, int] = stage_concurrency or {}
+        self._queue_size: int = queue_size
+        self._deadline_seconds: float | None = deadline_seconds
+        self._metrics: MetricsRegistry | None = metrics
+
+    async def run(self, documents: list[DocumentContractState]) -> AsyncIterator[DocumentContractState]:
+        """
+        Procesa los documentos y entrega cada resultado apenas sale de la última etapa
+        :param documents: Documentos a procesar
+        :return:
+        """
+        if not documents:
+            return
+        stages: list[tuple[str, Callable[[EtlBaseState], Any]]] = self._workflow.stages()
+        queues: list[asyncio.Queue[_PipelineItem]] = [asyncio.Queue(maxsize=self._queue_size) for _ in stages]
+        results: asyncio.Queue[DocumentContractState] = asyncio.Queue()
+        feed: asyncio.Task[None] = asyncio.create_task(self._feed(documents, queues[0], stages[0][0], results))
+        tasks: list[asyncio.Task[None]] = [feed]
+        for index, (name, fn) in enumerate(stages):
+            next_queue: asyncio.Queue[_PipelineItem] | None = queues[index + 1] if index + 1 < len(stages) else None
+            next_name: str | None = stages[index + 1][0] if next_queue is not None else None
+            for _ in range(max(1, self._stage_concurrency.get(name, 1))):
+                tasks.append(asyncio.create_task(
+                    self._worker(name, fn, queues[index], next_queue, next_name, results)))
+        try:
+            for _ in range(len(documents)):
+                yield await self._next_result(results, feed)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _next_result(results: asyncio.Queue[DocumentContractState],
+                           feed: asyncio.Task[None]) -> DocumentContractState:
+        """
+        Espera el próximo resultado; si la alimentación del pipeline termina con error se propaga en
+        lugar de esperar resultados que nunca llegarán
+        """
+        getter: asyncio.Task[DocumentContractState] = asyncio.create_task(results.get())
+        try:
+            while True:
+                if feed.done() and not feed.cancelled() and feed.exception() is not None:
+                    raise feed.exception()
+                waiting: set[asyncio.Task[Any]] = {getter} if feed.done() else {getter, feed}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    return getter.result()
+        finally:
+            getter.cancel()
+
+    async def _feed(self, documents: list[DocumentContractState], queue: asyncio.Queue[_PipelineItem],
+                    stage_name: str, results: asyncio.Queue[DocumentContractState]) -> None:
+        for doc in documents:
+            try:
+                state: EtlBaseState = await self._workflow.restore_state(doc)
+            except Exception as e:
+                # Por ejemplo un checkpoint corrupto: falla solo este documento
+                app_logger.error(f"Error restaurando el estado del documento {doc.record_id}: {str(e)}")
+                await results.put(doc.model_copy(update={
+                    "status": DocumentStatus.FAILED, "failure_stage": "restore", "failure_reason": str(e)}))
+                continue
+            # La cola acotada frena la entrada cuando la primera etapa está saturada
+            await queue.put(_PipelineItem(document=doc, state=state))
+            self._publish_depth(stage_name, queue)
+
+    async def _worker(
+            self,
+            name: str,
+            fn: Callable[[EtlBaseState], Any],
+            queue: asyncio.Queue[_PipelineItem],
+            next_queue: asyncio.Queue[_PipelineItem] | None,
+            next_name: str | None,
+            results: asyncio.Queue[DocumentContractState]
+    ) -> None:
+        while True:
+            item: _PipelineItem = await queue.get()
+            self._publish_depth(name, queue)
+            if item.started_at is None:
+                item.started_at = time.monotonic()
+            try:
+                await self._run_stage(name, fn, item)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    reason: str = "Superó el tiempo máximo del documento"
+                    app_logger.error(f"El documento {item.document.record_id} superó el tiempo máximo en {name}")
+                else:
+                    reason = str(e)
+                    app_logger.error(f"Error en la etapa {name} del documento {item.document.record_id}: {str(e)}")
+                await results.put(item.document.model_copy(update={
+                    "status": DocumentStatus.FAILED, "failure_stage": name, "failure_reason": reason}))
+                continue
+            if next_queue is None:
+                await results.put(self._workflow.build_result(item.document, item.state))
+                continue
+            await next_queue.put(item)
+            self._publish_depth(next_name, next_queue)
+
+    async def _run_stage(self, name: str, fn: Callable[[EtlBaseState], Any], item: _PipelineItem) -> None:
+        timeout: float | None = None
+        if self._deadline_seconds is not None:
+            timeout = max(0.0, self._deadline_seconds - (time.monotonic() - item.started_at))
+        started_at: float = time.monotonic()
+        if inspect.iscoroutinefunction(fn):
+            output: dict[str, Any] = await asyncio.wait_for(fn(item.state), timeout=timeout)
+        else:
+            output = await asyncio.wait_for(asyncio.to_thread(fn, item.state), timeout=timeout)
+        # Mismo efecto que los canales del grafo: cada clave retornada reemplaza su valor en el estado
+        item.state = item.state.model_copy(update=output or {})
+        if self._metrics is not None:
+            self._metrics.observe(f"workflow.pipeline.{name}.seconds", time.monotonic() - started_at)
+
+    def _publish_depth(self, name: str, queue: asyncio.Queue[_PipelineItem]) -> None:
+        if self._metrics is not None:
+            self._metrics.set_gauge(f"workflow.pipeline.{name}.queue_depth", queue.qsize())
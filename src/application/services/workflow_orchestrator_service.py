@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from asyncio import Task
-from typing import Iterable, Any
+from typing import AsyncIterator, Iterator
 
 from application.use_cases.workflows.workflow_bank_guarantee import WorkflowBankGuarantee
 from domain.enums.document_status import DocumentStatus
@@ -13,47 +13,57 @@ app_logger = logging.getLogger("app.workflows")
 class WorkflowOrchestratorServiceApplication:
 
     @staticmethod
-    def create_batch(
-            total_elements: list[DocumentContractState],
-            batch_size: int
-    ) -> Iterable[list[DocumentContractState]]:
+    async def run_sliding_window(
+            documents: list[DocumentContractState],
+            wf: WorkflowBankGuarantee,
+            concurrency: int,
+            deadline_seconds: float | None = None
+    ) -> AsyncIterator[DocumentContractState]:
         """
-        Crea un iterador para generar batches de procesamiento
-        :param total_elements: Total de elementos que se deben recorrer
-        :param batch_size: Tamaño del lote por el cual se segmenta
-        :return:
-        """
-        for i in range(0, len(total_elements), batch_size):
-            yield total_elements[i:i + batch_size]
-
-    @staticmethod
-    async def run_one_batch(
-            batch: list[DocumentContractState],
-            sem: asyncio.Semaphore,
-            wf: WorkflowBankGuarantee
-    ) -> list[DocumentContractState]:
-        """
-        Ejecuta un batch completo en paralelo (por documento)
+        Mantiene siempre N documentos en curso: apenas termina uno se inicia el siguiente, sin esperar
+        al más lento de un batch. Los resultados se entregan en el orden en que terminan
+        :param documents: Total de documentos a procesar
         :param wf: Workflow de garantías
-        :param batch: Cantidad de documentos a procesar
-        :param sem: Cantidad de documentos permitidos trabajar por batch
+        :param concurrency: Cantidad de documentos en curso a la vez
+        :param deadline_seconds: Tiempo máximo por documento; None no limita
         :return:
         """
-        tasks: list[Task[DocumentContractState]] = [
-            asyncio.create_task(WorkflowOrchestratorServiceApplication.process_one_document(b, sem, wf)) for b in
-            batch]
-        results: list[DocumentContractState] = await asyncio.gather(*tasks, return_exceptions=False)
-        return results
+        pending_documents: Iterator[DocumentContractState] = iter(documents)
+        in_flight: set[Task[DocumentContractState]] = set()
+
+        def _fill() -> None:
+            while len(in_flight) < max(1, concurrency):
+                doc: DocumentContractState | None = next(pending_documents, None)
+                if doc is None:
+                    return
+                in_flight.add(asyncio.create_task(
+                    WorkflowOrchestratorServiceApplication.process_one_document(doc, wf, deadline_seconds)))
+
+        _fill()
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                _fill()
+                for task in done:
+                    yield task.result()
+        finally:
+            # Si el consumidor abandona la iteración no quedan documentos huérfanos
+            for task in in_flight:
+                task.cancel()
 
     @staticmethod
-    async def process_one_document(doc: DocumentContractState, sem: asyncio.Semaphore,
-                                   wf: WorkflowBankGuarantee) -> DocumentContractState:
-        async with sem:
-            try:
-
-                new_doc: DocumentContractState = await wf.execute(doc)
-                return new_doc
-            except Exception as e:
-                app_logger.info(f"Error en process_one_document: {str(e)}")
-                doc.status = DocumentStatus.FAILED
-                return doc
+    async def process_one_document(doc: DocumentContractState, wf: WorkflowBankGuarantee,
+                                   deadline_seconds: float | None = None) -> DocumentContractState:
+        try:
+            new_doc: DocumentContractState = await asyncio.wait_for(wf.execute(doc), timeout=deadline_seconds)
+            return new_doc
+        except asyncio.TimeoutError:
+            reason: str = f"Superó el tiempo máximo de {deadline_seconds}s"
+            app_logger.error(f"El documento {doc.record_id}: {reason}")
+        except Exception as e:
+            reason = str(e)
+            app_logger.info(f"Error en process_one_document: {reason}")
+        return doc.model_copy(update={"status": DocumentStatus.FAILED, "failure_stage": "workflow",
+                                      "failure_reason": reason})
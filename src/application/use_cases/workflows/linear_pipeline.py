@@ -0,0 +1,47 @@
+import asyncio
+import inspect
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+
+class LinearPipeline:
+    """
+    Ejecutor mínimo de una cadena lineal de nodos con la misma interfaz que un grafo compilado
+    (ainvoke). Evita la validación del estado y la contabilidad de canales por nodo de LangGraph;
+    conserva su semántica: cada clave retornada reemplaza su valor o se combina con su reducer
+    (Annotated[..., reducer]), los nodos síncronos corren en un hilo y los nodos que declaran un
+    segundo parámetro reciben la configuración de la ejecución
+    """
+
+    def __init__(self, state_schema: type[BaseModel], nodes: list[tuple[str, Callable[..., Any]]]):
+        self._state_schema: type[BaseModel] = state_schema
+        self._nodes: list[tuple[str, Callable[..., Any], bool, bool]] = [
+            (name, fn, inspect.iscoroutinefunction(fn), len(inspect.signature(fn).parameters) > 1)
+            for name, fn in nodes
+        ]
+        # Campo -> reducer declarado con Annotated en el esquema
+        self._reducers: dict[str, Callable[[Any, Any], Any]] = {
+            field_name: reducer
+            for field_name, field in state_schema.model_fields.items()
+            for reducer in field.metadata if callable(reducer)
+        }
+
+    async def ainvoke(self, state: BaseModel, config: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Ejecuta los nodos en orden
+        :param state: Estado inicial
+        :param config: Configuración de la ejecución (configurable)
+        :return: Los valores finales del estado, como el resultado de un grafo compilado
+        """
+        values: dict[str, Any] = dict(state)
+        config = config or {}
+        for _, fn, is_coroutine, accepts_config in self._nodes:
+            # El estado ya fue validado al crearse; entre nodos se construye sin validar
+            current: BaseModel = self._state_schema.model_construct(**values)
+            args: tuple[Any, ...] = (current, config) if accepts_config else (current,)
+            update: dict[str, Any] | None = await fn(*args) if is_coroutine else await asyncio.to_thread(fn, *args)
+            for key, value in (update or {}).items():
+                reducer = self._reducers.get(key)
+                values[key] = reducer(values[key], value) if reducer is not None and key in values else value
+        return values
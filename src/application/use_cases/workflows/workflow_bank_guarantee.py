@@ -1,40 +1,49 @@
 import logging
-from typing import Any
+from typing import Any, Literal
 
 from application.dto.financial_metadata_result import FinancialMetadataResult
 from application.dto.textract_pipeline_result import TextractPipelineResult
+from application.ports.checkpoint_store_port import CheckpointStorePort
 from application.ports.extractor_document_port import ExtractorDocumentPort
 from application.ports.loader_metadata_port import LoaderMetadataPort
 from application.ports.notification_port import NotificationPort
 from application.ports.transform_document_port import TransformDocumentPort
 from application.use_cases.workflows.workflow_base import WorkflowBase
+from domain.enums.document_status import DocumentStatus
 from domain.models.states.document_contract_state import DocumentContractState
 from domain.models.states.etl_bank_guarantee_state import EtlBankGuaranteeState
 from domain.services.workflow_bank_guarantee_service import WorkflowBankGuaranteeServiceDomain
 
 
 class WorkflowBankGuarantee(WorkflowBase):
+    """
+    Workflow de una carta fianza. No guarda datos del documento en la instancia: todo viaja en
+    EtlBankGuaranteeState, por ello un mismo grafo compilado procesa varios documentos a la vez
+    """
+    _state_schema = EtlBankGuaranteeState
+
     def __init__(self,
                  extractor: ExtractorDocumentPort,
                  transformer: TransformDocumentPort,
                  loader_metadata: LoaderMetadataPort,
                  notification: NotificationPort,
+                 engine: Literal["langgraph", "linear"] = "langgraph",
+                 checkpoint_store: CheckpointStorePort | None = None
                  ):
-        super().__init__(extractor, transformer, loader_metadata, notification)
-        self.doc: DocumentContractState | None = None
-        self.grid: list[list[str]] = []
+        super().__init__(extractor, transformer, loader_metadata, notification, engine, checkpoint_store)
         self.logger = logging.getLogger("app.workflows")
 
     async def _extract(self, state: EtlBankGuaranteeState) -> dict[str, Any]:
         try:
+            doc: DocumentContractState = state.document
             extract_results: TextractPipelineResult | None = await self._extractor.extract_pipeline(
-                document_data=self.doc)
+                document_data=doc)
             if extract_results is None:
                 raise ValueError("No se consiguió extraer la metadata")
-            self.grid = extract_results.grid
             return {
-                "period_month": self.doc.period_month,
-                "period_year": self.doc.period_year,
+                "grid": extract_results.grid,
+                "period_month": doc.period_month,
+                "period_year": doc.period_year,
                 "promotor": extract_results.promotor_text,
                 "letter_date": WorkflowBankGuaranteeServiceDomain.transform_date(extract_results.date_text),
                 "project_text": extract_results.project_text,
@@ -44,7 +53,8 @@ class WorkflowBankGuarantee(WorkflowBase):
         except Exception as e:
             self.logger.error(f"Error en la extracción en bank guarantee: {str(e)}")
             return {
-                "extract_success": False
+                "extract_success": False,
+                "failure_reason": state.failure_reason or str(e)
             }
 
     def _transform(self, state: EtlBankGuaranteeState) -> dict[str, Any]:
@@ -53,7 +63,7 @@ class WorkflowBankGuarantee(WorkflowBase):
 
             if not extract_success:
                 raise ValueError("El proceso de extracción fue fallido en bank guarantee")
-            aux: FinancialMetadataResult | None = self._transformer.get_financial_metadata(grid=self.grid)
+            aux: FinancialMetadataResult | None = self._transformer.get_financial_metadata(grid=state.grid)
             if aux is None:
                 raise ValueError("La transformación debió un resultado nulo en bank guarantee")
             return {
@@ -66,32 +76,45 @@ class WorkflowBankGuarantee(WorkflowBase):
         except Exception as e:
             self.logger.error(f"Error en la transformación en bank guarantee: {str(e)}")
             return {
-                "transform_success": False
+                "transform_success": False,
+                "failure_reason": state.failure_reason or str(e)
             }
 
-    def _load(self, state: EtlBankGuaranteeState) -> dict[str, Any]:
+    async def _load(self, state: EtlBankGuaranteeState) -> dict[str, Any]:
         try:
             transform_success: bool = state.transform_success
             if not transform_success:
                 raise ValueError("El proceso de transformación fue fallido en bank guarantee")
 
-            entity = WorkflowBankGuaranteeServiceDomain.transform_in_entity_to_dynamo(self.doc, state)
+            entity = WorkflowBankGuaranteeServiceDomain.transform_in_entity_to_dynamo(state.document, state)
             self.logger.info("Grabar Metadada")
-            self._loader_metadata.save_metadata(entity)
+            await self._loader_metadata.save_metadata(entity)
             return {
                 "load_success": True
             }
         except Exception as e:
             self.logger.error(f"Error en la carga en bank guarantee: {str(e)}")
             return {
-                "load_success": False
+                "load_success": False,
+                "failure_reason": state.failure_reason or str(e)
             }
 
     def _final_task(self, state: EtlBankGuaranteeState) -> dict[str, Any]:
         return {}
 
+    def initial_state(self, doc: DocumentContractState) -> EtlBankGuaranteeState:
+        return EtlBankGuaranteeState(record_id=doc.record_id, document=doc)
+
+    def build_result(self, doc: DocumentContractState, state: EtlBankGuaranteeState) -> DocumentContractState:
+        if state.load_success:
+            # Se retorna una copia: el documento de entrada no se modifica
+            return doc.model_copy(update={"status": DocumentStatus.PROCESSED})
+        return doc.model_copy(update={
+            "status": DocumentStatus.FAILED,
+            "failure_stage": state.failure_stage,
+            "failure_reason": state.failure_reason,
+        })
+
     async def execute(self, doc: DocumentContractState) -> DocumentContractState:
-        self.doc = doc
-        state = EtlBankGuaranteeState(record_id=doc.record_id)
-        output = await self._graph.ainvoke(state)
-        return doc
+        output: dict[str, Any] = await self._graph.ainvoke(await self.restore_state(doc))
+        return self.build_result(doc, EtlBankGuaranteeState.model_validate(output))
@@ -1,27 +1,43 @@
+import asyncio
+import functools
+import inspect
+import logging
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Literal
 
 from langgraph.constants import START, END
 from langgraph.graph import StateGraph
 
+from application.dto.stage_checkpoint import StageCheckpoint
+from application.ports.checkpoint_store_port import CheckpointStorePort
 from application.ports.loader_metadata_port import LoaderMetadataPort
 from application.ports.transform_document_port import TransformDocumentPort
 from application.ports.extractor_document_port import ExtractorDocumentPort
 from application.ports.notification_port import NotificationPort
+from application.use_cases.workflows.linear_pipeline import LinearPipeline
+from domain.models.states.document_contract_state import DocumentContractState
 from domain.models.states.etl_base_state import EtlBaseState
 
 
 class WorkflowBase(ABC):
+    # Esquema del estado del grafo; cada workflow declara el suyo
+    _state_schema: type[EtlBaseState] = EtlBaseState
+
     def __init__(self,
                  extractor: ExtractorDocumentPort,
                  transformer: TransformDocumentPort,
                  loader_metadata: LoaderMetadataPort,
-                 notificator: NotificationPort
+                 notificator: NotificationPort,
+                 engine: Literal["langgraph", "linear"] = "langgraph",
+                 checkpoint_store: CheckpointStorePort | None = None
                  ):
         self._extractor = extractor
         self._transformer = transformer
         self._loader_metadata = loader_metadata
         self._notificator = notificator
+        self._engine = engine
+        self._checkpoint_store = checkpoint_store
+        self._checkpoint_logger = logging.getLogger("app.workflows")
         self._graph = self._build_graph()
 
     @abstractmethod
@@ -40,15 +56,113 @@ class WorkflowBase(ABC):
     def _final_task(self, state: EtlBaseState) -> dict[str, Any]:
         ...
 
+    @abstractmethod
+    def initial_state(self, doc: DocumentContractState) -> EtlBaseState:
+        ...
+
+    @abstractmethod
+    def build_result(self, doc: DocumentContractState, state: EtlBaseState) -> DocumentContractState:
+        ...
+
+    @staticmethod
+    def checkpoint_key(doc: DocumentContractState) -> str | None:
+        """
+        Llave del checkpoint; incluye el ETag para que una nueva versión del objeto nunca retome el
+        estado de la anterior
+        :param doc: Documento
+        :return: None si no se conoce el ETag (el documento no usa checkpoints)
+        """
+        if doc.etag is None:
+            return None
+        etag: str = doc.etag.strip('"')
+        return f"{doc.record_id}:{doc.key}:{etag}"
+
+    def stages(self) -> list[tuple[str, Callable[[EtlBaseState], Any]]]:
+        """
+        Etapas del workflow en orden de ejecución; las usan el grafo y los ejecutores alternativos
+        :return: Lista de (nombre, función de la etapa)
+        """
+        stages: list[tuple[str, Callable[[EtlBaseState], Any]]] = [
+            ("extract", self._extract),
+            ("transform", self._transform),
+            ("load", self._load),
+            ("final_task", self._final_task),
+        ]
+        if self._checkpoint_store is None:
+            return stages
+        last_stage: str = stages[-1][0]
+        return [(name, self._with_checkpoint(name, fn, name == last_stage)) for name, fn in stages]
+
+    async def restore_state(self, doc: DocumentContractState) -> EtlBaseState:
+        """
+        Estado inicial del documento; si existe un checkpoint se retoma desde la última etapa completada
+        :param doc: Documento a procesar
+        :return:
+        """
+        state: EtlBaseState = self.initial_state(doc)
+        key: str | None = self.checkpoint_key(doc)
+        if self._checkpoint_store is None or key is None:
+            return state
+        try:
+            checkpoint: StageCheckpoint | None = await self._checkpoint_store.load(key)
+        except Exception as e:
+            self._checkpoint_logger.error(f"Error leyendo el checkpoint de {doc.record_id}: {str(e)}")
+            return state
+        if checkpoint is None:
+            return state
+        self._checkpoint_logger.info(f"Documento {doc.record_id} retomado después de la etapa {checkpoint.stage}")
+        return self._state_schema.model_validate({**checkpoint.values, "document": doc})
+
+    def _with_checkpoint(self, name: str, fn: Callable[[EtlBaseState], Any],
+                         is_last: bool = False) -> Callable[[EtlBaseState], Any]:
+        """
+        Envuelve una etapa: se omite si ya fue completada y, si termina con éxito, su resultado se
+        persiste en el checkpoint del documento. Al terminar la última etapa el checkpoint se elimina:
+        una ejecución posterior del documento empieza de cero
+        :param name: Nombre de la etapa
+        :param fn: Función de la etapa
+        :param is_last: Indica si es la última etapa del workflow
+        :return:
+        """
+        is_coroutine: bool = inspect.iscoroutinefunction(fn)
+
+        # wraps conserva las anotaciones: el grafo deduce de ellas el esquema del estado del nodo
+        @functools.wraps(fn)
+        async def _run(state: EtlBaseState) -> dict[str, Any]:
+            if name in state.completed_stages:
+                return {}
+            output: dict[str, Any] = (await fn(state) if is_coroutine else await asyncio.to_thread(fn, state)) or {}
+            new_state: EtlBaseState = state.model_copy(update=output)
+            # Tras una etapa fallida no se guarda nada: la siguiente entrega la vuelve a intentar
+            if any(value is False for key, value in new_state if key.endswith("_success")):
+                return output
+            output = {**output, "completed_stages": [*state.completed_stages, name]}
+            document: DocumentContractState | None = getattr(state, "document", None)
+            key: str | None = self.checkpoint_key(document) if document is not None else None
+            if key is None:
+                return output
+            try:
+                if is_last:
+                    await self._checkpoint_store.delete(key)
+                else:
+                    values: dict[str, Any] = new_state.model_copy(update=output).model_dump(
+                        mode="json", exclude={"document"})
+                    await self._checkpoint_store.save(key, name, values)
+            except Exception as e:
+                self._checkpoint_logger.error(f"Error actualizando el checkpoint de {name}: {str(e)}")
+            return output
+
+        return _run
+
     def _build_graph(self):
-        g = StateGraph(EtlBaseState)
-        g.add_node("extract", self._extract)
-        g.add_node("transform", self._transform)
-        g.add_node("load", self._load)
-        g.add_node("final_task", self._final_task)
-        g.add_edge(START, "extract")
-        g.add_edge("extract", "transform")
-        g.add_edge("transform", "load")
-        g.add_edge("load", "final_task")
-        g.add_edge("final_task", END)
+        if self._engine == "linear":
+            # La cadena es fija y sin ramas: se ejecuta directamente sin la maquinaria del grafo
+            return LinearPipeline(self._state_schema, self.stages())
+        g = StateGraph(self._state_schema)
+        previous: str = START
+        for name, fn in self.stages():
+            g.add_node(name, fn)
+            g.add_edge(previous, name)
+            previous = name
+        g.add_edge(previous, END)
         return g.compile()
@@ -2,17 +2,20 @@ import asyncio
 import logging
 import uuid
 
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.constants import START, END
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
+from application.ports.checkpoint_store_port import CheckpointStorePort
 from application.ports.extractor_document_port import ExtractorDocumentPort
 from application.ports.loader_document_port import LoaderDocumentPort
 from application.ports.loader_metadata_port import LoaderMetadataPort
 from application.ports.notification_port import NotificationPort
 from application.ports.poller_document_port import PollerDocumentPort
+from application.ports.processed_document_store_port import ProcessedDocumentStorePort
 from application.ports.transform_document_port import TransformDocumentPort
 from application.use_cases.workflows.workflow_bank_guarantee import (
     WorkflowBankGuarantee,
@@ -25,6 +28,10 @@ from domain.services.workflow_orchestrator_service import (
 from domain.models.notification import Notification, NotificationData
 
 from infrastructure.config.app_settings import AppSettings, get_app_settings
+from infrastructure.utils.metrics_utils.metrics_registry import get_metrics_registry
+from application.services.document_deduplicator import DocumentDeduplicator
+from application.services.stage_pipeline_executor import StagePipelineExecutor
+from application.use_cases.workflows.linear_pipeline import LinearPipeline
 from application.services.workflow_orchestrator_service import (
     WorkflowOrchestratorServiceApplication as wfa,
 )
@@ -38,6 +45,8 @@ class WorkflowOrchestrator:
         transformer: TransformDocumentPort,
         loader_metadata: LoaderMetadataPort,
         notification: NotificationPort,
+        checkpoint_store: CheckpointStorePort | None = None,
+        processed_document_store: ProcessedDocumentStorePort | None = None,
     ):
         self.logger = logging.getLogger("app.workflows")
         self._extractor = extractor
@@ -45,42 +54,92 @@ class WorkflowOrchestrator:
         self._loader_metadata = loader_metadata
         self._notification = notification
         self._poller = poller
+        self._checkpoint_store = checkpoint_store
+        self.app_settings: AppSettings = get_app_settings()
+        self.engine: Literal["langgraph", "linear"] = self.app_settings.workflow_settings.engine
         self.bank_guarantee_wf = WorkflowBankGuarantee(
             extractor=extractor,
             transformer=transformer,
             loader_metadata=loader_metadata,
             notification=notification,
+            engine=self.engine,
+            checkpoint_store=checkpoint_store,
         )
         self._graph = self._build()
-        self.batch_size: int = 1
+        # El workflow de cartas es reentrante: varios documentos comparten el mismo grafo compilado
+        self.concurrency: int = self.app_settings.workflow_settings.concurrency
+        self.document_deadline_seconds: float | None = self.app_settings.workflow_settings.document_deadline_seconds
         self.strategy: Literal["dynamo", "bucket"] = "dynamo"
-        self.app_settings: AppSettings = get_app_settings()
+        workflow_settings = self.app_settings.workflow_settings
+        self.pipeline_executor: StagePipelineExecutor | None = None
+        if workflow_settings.execution_mode == "pipeline":
+            self.pipeline_executor = StagePipelineExecutor(
+                workflow=self.bank_guarantee_wf,
+                stage_concurrency=workflow_settings.stage_concurrency,
+                queue_size=workflow_settings.stage_queue_size,
+                deadline_seconds=self.document_deadline_seconds,
+                metrics=get_metrics_registry(),
+            )
+        self.deduplicator: DocumentDeduplicator | None = None
+        if processed_document_store is not None:
+            dedup_settings = self.app_settings.dedup_settings
+            self.deduplicator = DocumentDeduplicator(
+                store=processed_document_store,
+                poller=poller,
+                bucket_name=self.app_settings.s3_settings.bucket,
+                ttl_seconds=dedup_settings.ttl_seconds,
+                memory_max_entries=dedup_settings.memory_max_entries,
+                metrics=get_metrics_registry(),
+            )
 
-    def _start_task(self, state: EtlOrchestratorState) -> dict[str, Any]:
+    async def _start_task(self, state: EtlOrchestratorState) -> dict[str, Any]:
         try:
+            documents: list[DocumentContractState] = state.total_documents_to_process
             if self.strategy == "bucket":
                 bucket_name: str = self.app_settings.s3_settings.bucket
                 prefix: str = "cartas_fmv/"
-                documents_str: list[str] = self._poller.get_file_names(
+                documents_str: list[str] = await self._poller.get_file_names(
                     bucket_name, prefix
                 )
-                documents: list[DocumentContractState] = [
+                documents = [
                     WorkflowOrchestratorServiceDomain.transform_to_document_contract(d)
                     for d in documents_str
                 ]
+            if self._checkpoint_store is not None:
+                # Los checkpoints se identifican por ETag: sin él un documento no se retoma
+                documents = await self._resolve_etags(documents)
+            if self.deduplicator is None:
                 return {"total_documents_to_process": documents}
-            return {}
+            # Los duplicados se descartan antes de cualquier llamada a textract, dynamo o sqs
+            new_documents, skipped = await self.deduplicator.filter_new(documents)
+            return {"total_documents_to_process": new_documents, "total_documents_skipped": skipped}
         except Exception as e:
             self.logger.error(e)
             return {}
 
-    async def _run_etl(self, state: EtlOrchestratorState) -> dict[str, Any]:
+    async def _resolve_etags(self, documents: list[DocumentContractState]) -> list[DocumentContractState]:
+        bucket_name: str = self.app_settings.s3_settings.bucket
+
+        async def _resolve(doc: DocumentContractState) -> DocumentContractState:
+            if doc.etag is not None:
+                return doc
+            try:
+                return doc.model_copy(update={"etag": await self._poller.get_etag(bucket_name, doc.key)})
+            except Exception as e:
+                self.logger.error(f"Error obteniendo el ETag de {doc.key}: {str(e)}")
+                return doc
+
+        return list(await asyncio.gather(*[_resolve(doc) for doc in documents]))
+
+    async def _run_etl(self, state: EtlOrchestratorState, config: RunnableConfig) -> dict[str, Any]:
         """
         Nodo principal:
-        - Divide documentos en batches
-        - Dentro de cada batch: lanza documentos en paralelo (limitados por semáforo)
-        - Agrega métricas y resultados
+        - Ventana deslizante: mantiene N documentos en curso y arranca el siguiente apenas termina uno
+        - Modo pipeline: cada etapa tiene su pool de workers y una cola acotada entre etapas
+        - Cada documento tiene un tiempo máximo; uno atascado no detiene la ejecución
+        - Los resultados se entregan a on_result (config) a medida que terminan y se agregan al estado
         :param state:
+        :param config: Configuración de la ejecución; puede incluir on_result en configurable
         :return:
         """
         total_documents_to_process: list[DocumentContractState] = (
@@ -90,24 +149,44 @@ class WorkflowOrchestrator:
         if len(total_documents_to_process) == 0:
             self.logger.warning("No hay documentos que procesar")
             return {"total_documents_processed": [], "total_documents_failed": []}
-        sem = asyncio.Semaphore(self.batch_size)
-
+        on_result: Callable[[DocumentContractState], Awaitable[None]] | None = (
+            config.get("configurable", {}).get("on_result")
+        )
         total_documents_processed: list[DocumentContractState] = []
-        for idx, batch_docs in enumerate(
-            wfa.create_batch(total_documents_to_process, self.batch_size)
-        ):
-            batch_result = await wfa.run_one_batch(
-                batch_docs, sem, self.bank_guarantee_wf
+        results: AsyncIterator[DocumentContractState]
+        if self.pipeline_executor is not None:
+            # Cada etapa con su propio pool: transform/load de un documento se solapan con extract de otros
+            results = self.pipeline_executor.run(total_documents_to_process)
+        else:
+            results = wfa.run_sliding_window(
+                total_documents_to_process,
+                self.bank_guarantee_wf,
+                self.concurrency,
+                self.document_deadline_seconds,
             )
-            total_documents_processed.extend(batch_result)
+        try:
+            async for result in results:
+                total_documents_processed.append(result)
+                if on_result is not None:
+                    try:
+                        await on_result(result)
+                    except Exception as e:
+                        self.logger.error(f"Error en on_result del documento {result.record_id}: {str(e)}")
+        except BaseException:
+            # Sin final_task las reservas se liberan aquí; ningún documento queda registrado como procesado
+            if self.deduplicator is not None:
+                self.deduplicator.release(total_documents_to_process)
+            raise
 
         return {
             "total_documents_processed": total_documents_processed,
         }
 
-    def _final_task(self, state: EtlOrchestratorState) -> dict[str, Any]:
+    async def _final_task(self, state: EtlOrchestratorState) -> dict[str, Any]:
         self.logger.info("Finalizando ETL")
         print("State", state)
+        if not state.total_documents_processed:
+            return {}
 
         metadata_notification_type = "regulatory-compliance-prompts.insert-metadata"
         notifications = [
@@ -122,10 +201,25 @@ class WorkflowOrchestrator:
             for result in state.total_documents_processed
         ]
 
-        self._notification.notify(notifications)
+        try:
+            await self._notification.notify(notifications)
+            # Un documento solo queda registrado como procesado cuando su notificación salió: si notify
+            # falla, el reintento del mensaje no se descarta como duplicado
+            if self.deduplicator is not None:
+                for result in state.total_documents_processed:
+                    await self.deduplicator.complete(result)
+        finally:
+            if self.deduplicator is not None:
+                self.deduplicator.release(state.total_documents_to_process)
         return {}
 
-    def _build(self) -> CompiledStateGraph[EtlOrchestratorState]:
+    def _build(self) -> CompiledStateGraph[EtlOrchestratorState] | LinearPipeline:
+        if self.engine == "linear":
+            return LinearPipeline(EtlOrchestratorState, [
+                ("start_task", self._start_task),
+                ("run_etl", self._run_etl),
+                ("final_task", self._final_task),
+            ])
         g = StateGraph(state_schema=EtlOrchestratorState)
         g.add_node("start_task", self._start_task)
         g.add_node("run_etl", self._run_etl)
@@ -137,7 +231,25 @@ class WorkflowOrchestrator:
         g.add_edge("final_task", END)
         return g.compile()
 
-    async def execute(self, documents: list[DocumentContractState]):
+    async def close(self) -> None:
+        await self._extractor.close()
+        if self._checkpoint_store is not None:
+            await self._checkpoint_store.close()
+        if self.deduplicator is not None:
+            await self.deduplicator.close()
+
+    async def execute(
+        self,
+        documents: list[DocumentContractState],
+        on_result: Callable[[DocumentContractState], Awaitable[None]] | None = None,
+    ) -> EtlOrchestratorState:
+        """
+        Ejecuta el ETL de los documentos
+        :param documents: Documentos a procesar
+        :param on_result: Se invoca con cada documento apenas termina, sin esperar al resto
+        :return: Estado final; incluye los documentos procesados y los descartados por duplicados
+        """
         print("documents", documents)
         state = EtlOrchestratorState(total_documents_to_process=documents)
-        await self._graph.ainvoke(state)
+        output: dict[str, Any] = await self._graph.ainvoke(state, config={"configurable": {"on_result": on_result}})
+        return EtlOrchestratorState.model_validate(output)
@@ -0,0 +1,194 @@
+import itertools
+import random
+
+from mypy_boto3_textract.type_defs import BlockTypeDef, GetDocumentAnalysisResponseTypeDef
+from pydantic import BaseModel, Field
+
+
+class SyntheticTextractConfig(BaseModel):
+    pages: int = Field(description="Cantidad de páginas del documento", default=1)
+    lines_per_page: int = Field(description="Cantidad de líneas (LINE) por página", default=40)
+    words_per_line: int = Field(description="Cantidad de palabras (WORD) por línea", default=6)
+    tables_per_page: int = Field(description="Cantidad de tablas por página", default=1)
+    table_rows: int = Field(description="Filas de cada tabla", default=6)
+    table_cols: int = Field(description="Columnas de cada tabla", default=4)
+    merged_header: bool = Field(description="Fusiona las dos primeras celdas de la cabecera de cada tabla",
+                                default=True)
+    queries: list[str] = Field(description="Alias de las queries que se responden en la primera página",
+                               default=["Promotor", "Project"])
+    blocks_per_response: int = Field(description="Bloques por página de resultados (MaxResults)", default=1000)
+    seed: int = Field(description="Semilla para que el documento sea reproducible", default=7)
+
+
+class SyntheticTextractGenerator:
+    """
+    Genera respuestas de GetDocumentAnalysis con la forma que entrega textract para una carta fianza:
+    línea de fecha, línea "Carta N°", texto libre, tablas con celdas fusionadas y pares QUERY/QUERY_RESULT
+    """
+
+    WORDS: list[str] = ["garantía", "banco", "monto", "soles", "fianza", "plazo", "cliente", "obra", "pago"]
+    HEADER: list[str] = ["ADENDA ACTUAL", "DESEMBOLSADOS", "SALDO", "MONEDA"]
+
+    def __init__(self, config: SyntheticTextractConfig | None = None):
+        self.config: SyntheticTextractConfig = config or SyntheticTextractConfig()
+        self._random: random.Random = random.Random(self.config.seed)
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def for_block_count(target_blocks: int, **overrides) -> "SyntheticTextractGenerator":
+        """
+        Dimensiona el documento para acercarse a la cantidad de bloques indicada, manteniendo la
+        proporción de una carta real (texto por página más una tabla)
+        :param target_blocks: Cantidad aproximada de bloques
+        :return:
+        """
+        base: SyntheticTextractConfig = SyntheticTextractConfig(**overrides)
+        words_per_table: int = base.table_rows * base.table_cols
+        per_page: int = (1 + base.lines_per_page * (1 + base.words_per_line)
+                         + base.tables_per_page * (1 + 2 * words_per_table + 1))
+        if target_blocks < per_page:
+            lines: int = max(3, (target_blocks - 60) // (1 + base.words_per_line))
+            return SyntheticTextractGenerator(base.model_copy(update={"lines_per_page": lines}))
+        pages: int = max(1, round(target_blocks / per_page))
+        return SyntheticTextractGenerator(base.model_copy(update={"pages": pages}))
+
+    def _next_id(self) -> str:
+        return f"b{next(self._ids):08d}"
+
+    @staticmethod
+    def _geometry(top: float, left: float, width: float, height: float) -> dict:
+        return {
+            "BoundingBox": {"Top": top, "Left": left, "Width": width, "Height": height},
+            "Polygon": [
+                {"X": left, "Y": top}, {"X": left + width, "Y": top},
+                {"X": left + width, "Y": top + height}, {"X": left, "Y": top + height},
+            ],
+        }
+
+    def _line(self, text: str, page: int, top: float, left: float) -> list[BlockTypeDef]:
+        """Bloque LINE con sus bloques WORD; el ancho se reparte según la cantidad de palabras"""
+        words: list[str] = text.split()
+        width: float = min(0.8, 0.012 * len(text))
+        word_blocks: list[BlockTypeDef] = []
+        cursor: float = left
+        for w in words:
+            w_width: float = width * len(w) / max(1, len(text))
+            word_blocks.append({
+                "BlockType": "WORD", "Id": self._next_id(), "Page": page, "Text": w, "TextType": "PRINTED",
+                "Confidence": 99.0, "Geometry": self._geometry(top, cursor, w_width, 0.012),
+            })
+            cursor += w_width + 0.005
+        line: BlockTypeDef = {
+            "BlockType": "LINE", "Id": self._next_id(), "Page": page, "Text": text, "Confidence": 99.0,
+            "Geometry": self._geometry(top, left, width, 0.012),
+            "Relationships": [{"Type": "CHILD", "Ids": [w["Id"] for w in word_blocks]}],
+        }
+        return [line, *word_blocks]
+
+    def _table(self, page: int, top: float) -> list[BlockTypeDef]:
+        cfg: SyntheticTextractConfig = self.config
+        blocks: list[BlockTypeDef] = []
+        cells: list[BlockTypeDef] = []
+        cell_height: float = 0.02
+        cell_width: float = 0.8 / cfg.table_cols
+        for r in range(1, cfg.table_rows + 1):
+            for c in range(1, cfg.table_cols + 1):
+                if r == 1:
+                    text: str = self.HEADER[(c - 1) % len(self.HEADER)]
+                else:
+                    text = f"{self._random.randint(1, 999_999):,}.{self._random.randint(0, 99):02d}"
+                geometry: dict = self._geometry(top + (r - 1) * cell_height, 0.1 + (c - 1) * cell_width,
+                                                cell_width, cell_height)
+                words: list[BlockTypeDef] = [
+                    {"BlockType": "WORD", "Id": self._next_id(), "Page": page, "Text": w,
+                     "TextType": "PRINTED", "Confidence": 98.0, "Geometry": geometry}
+                    for w in text.split()
+                ]
+                blocks.extend(words)
+                cells.append({
+                    "BlockType": "CELL", "Id": self._next_id(), "Page": page, "RowIndex": r, "ColumnIndex": c,
+                    "RowSpan": 1, "ColumnSpan": 1, "Confidence": 95.0, "Geometry": geometry,
+                    "Relationships": [{"Type": "CHILD", "Ids": [w["Id"] for w in words]}],
+                })
+        blocks.extend(cells)
+        table: BlockTypeDef = {
+            "BlockType": "TABLE", "Id": self._next_id(), "Page": page, "Confidence": 95.0,
+            "Geometry": self._geometry(top, 0.1, 0.8, cfg.table_rows * cell_height),
+            "Relationships": [{"Type": "CHILD", "Ids": [c["Id"] for c in cells]}],
+        }
+        if cfg.merged_header and cfg.table_cols > 1:
+            # Textract representa la fusión con un bloque MERGED_CELL cuyos hijos son las celdas originales
+            merged: BlockTypeDef = {
+                "BlockType": "MERGED_CELL", "Id": self._next_id(), "Page": page, "RowIndex": 1, "ColumnIndex": 1,
+                "RowSpan": 1, "ColumnSpan": 2, "Confidence": 90.0,
+                "Relationships": [{"Type": "CHILD", "Ids": [cells[0]["Id"], cells[1]["Id"]]}],
+            }
+            table["Relationships"].append({"Type": "MERGED_CELL", "Ids": [merged["Id"]]})
+            blocks.append(merged)
+        blocks.append(table)
+        return blocks
+
+    def _queries(self, page: int) -> list[BlockTypeDef]:
+        blocks: list[BlockTypeDef] = []
+        for alias in self.config.queries:
+            result: BlockTypeDef = {
+                "BlockType": "QUERY_RESULT", "Id": self._next_id(), "Page": page, "Confidence": 90.0,
+                "Text": f"{alias.upper()} S.A.C.", "Geometry": self._geometry(0.4, 0.1, 0.3, 0.012),
+            }
+            blocks.append({
+                "BlockType": "QUERY", "Id": self._next_id(), "Page": page,
+                "Query": {"Text": f"¿Cuál es el {alias}?", "Alias": alias},
+                "Relationships": [{"Type": "ANSWER", "Ids": [result["Id"]]}],
+            })
+            blocks.append(result)
+        return blocks
+
+    def _page(self, page: int) -> list[BlockTypeDef]:
+        cfg: SyntheticTextractConfig = self.config
+        content: list[BlockTypeDef] = []
+        line_step: float = 0.5 / max(1, cfg.lines_per_page)
+        for i in range(cfg.lines_per_page):
+            if page == 1 and i == 0:
+                text: str = "Lima, 15 de marzo de 2024"
+                left: float = 0.6
+            elif page == 1 and i == 2:
+                text = f"Carta N° {self._random.randint(100, 999)}-2024-GB"
+                left = 0.1
+            else:
+                text = " ".join(self._random.choice(self.WORDS) for _ in range(cfg.words_per_line))
+                left = 0.1
+            content.extend(self._line(text, page, 0.05 + i * line_step, left))
+        for t in range(cfg.tables_per_page):
+            content.extend(self._table(page, 0.6 + t * 0.01))
+        if page == 1:
+            content.extend(self._queries(page))
+        page_block: BlockTypeDef = {
+            "BlockType": "PAGE", "Id": self._next_id(), "Page": page,
+            "Geometry": self._geometry(0.0, 0.0, 1.0, 1.0),
+            "Relationships": [{"Type": "CHILD", "Ids": [b["Id"] for b in content if b["BlockType"] == "LINE"]}],
+        }
+        return [page_block, *content]
+
+    def blocks(self) -> list[BlockTypeDef]:
+        return [b for page in range(1, self.config.pages + 1) for b in self._page(page)]
+
+    def responses(self) -> list[GetDocumentAnalysisResponseTypeDef]:
+        """
+        Parte los bloques en páginas de resultados encadenadas por NextToken, como GetDocumentAnalysis
+        :return:
+        """
+        blocks: list[BlockTypeDef] = self.blocks()
+        size: int = self.config.blocks_per_response
+        chunks: list[list[BlockTypeDef]] = [blocks[i:i + size] for i in range(0, len(blocks), size)] or [[]]
+        responses: list[GetDocumentAnalysisResponseTypeDef] = []
+        for n, chunk in enumerate(chunks):
+            response: dict = {
+                "JobStatus": "SUCCEEDED",
+                "DocumentMetadata": {"Pages": self.config.pages},
+                "Blocks": chunk,
+                "AnalyzeDocumentModelVersion": "1.0",
+            }
+            if n < len(chunks) - 1:
+                response["NextToken"] = f"token-{n + 1}"
+            responses.append(response)
+        return responses
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark de TextractUtils sobre documentos sintéticos de 100 a 100k bloques.
+
+Uso (desde src/):
+    python -m benchmarks.textract_utils_benchmark
+    python -m benchmarks.textract_utils_benchmark --sizes 100 1000 --repeat 3 --json resultados.json
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from mypy_boto3_textract.type_defs import BlockTypeDef, GetDocumentAnalysisResponseTypeDef
+from pydantic import BaseModel, Field
+
+from benchmarks.synthetic_textract import SyntheticTextractGenerator
+from infrastructure.utils.textract_utils.block_index import BlockIndex
+from infrastructure.utils.textract_utils.texttract_utils import TextractUtils
+
+DEFAULT_SIZES: list[int] = [100, 1_000, 10_000, 100_000]
+
+
+class BenchmarkResult(BaseModel):
+    name: str = Field(description="Función medida")
+    input: str = Field(description="Tipo de entrada: list (bloques crudos) o index (BlockIndex ya construido)")
+    blocks: int = Field(description="Cantidad real de bloques del documento")
+    best_ms: float = Field(description="Mejor tiempo de las repeticiones en milisegundos")
+    mean_ms: float = Field(description="Tiempo promedio de las repeticiones en milisegundos")
+    peak_kb: float = Field(description="Pico de memoria asignada durante una ejecución en KB")
+
+
+def _measure(name: str, input_type: str, blocks: int, fn: Callable[[], Any], repeat: int) -> BenchmarkResult:
+    fn()  # calentamiento
+    timings: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start: float = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    # La memoria se mide en una ejecución aparte para que tracemalloc no distorsione los tiempos
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return BenchmarkResult(name=name, input=input_type, blocks=blocks, best_ms=min(timings),
+                           mean_ms=sum(timings) / len(timings), peak_kb=peak / 1024)
+
+
+def _cases(
+        responses: list[GetDocumentAnalysisResponseTypeDef]
+) -> list[tuple[str, str, Callable[[], Any]]]:
+    _, blocks = TextractUtils.group_by_page(responses)
+    # El índice se construye una sola vez, como en el extractor; sus memorias internas quedan amortizadas
+    index: BlockIndex = BlockIndex(blocks)
+    letter: BlockTypeDef | None = TextractUtils.get_letter_block(index)
+    tables = TextractUtils.build_tables_from_textract_blocks(index)
+    return [
+        ("group_by_page", "list", lambda: TextractUtils.group_by_page(responses)),
+        ("BlockIndex", "list", lambda: BlockIndex(blocks)),
+        ("get_date_by_letter_position", "list", lambda: TextractUtils.get_date_by_letter_position(letter, blocks)),
+        ("get_date_by_letter_position", "index", lambda: TextractUtils.get_date_by_letter_position(letter, index)),
+        ("build_tables_from_textract_blocks", "list", lambda: TextractUtils.build_tables_from_textract_blocks(blocks)),
+        ("build_tables_from_textract_blocks", "index", lambda: TextractUtils.build_tables_from_textract_blocks(index)),
+        ("filter_tables_keyword", "list", lambda: TextractUtils.filter_tables_keyword(tables, blocks)),
+        ("filter_tables_keyword", "index", lambda: TextractUtils.filter_tables_keyword(tables, index)),
+        ("select_table", "index", lambda: TextractUtils.select_table(index)),
+    ]
+
+
+def run(sizes: list[int], repeat: int) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    for size in sizes:
+        responses = SyntheticTextractGenerator.for_block_count(size).responses()
+        block_count: int = sum(len(r["Blocks"]) for r in responses)
+        for name, input_type, fn in _cases(responses):
+            results.append(_measure(name, input_type, block_count, fn, repeat))
+    return results
+
+
+def _print(results: list[BenchmarkResult]) -> None:
+    header: str = f"{'función':<36}{'entrada':<9}{'bloques':>9}{'mejor ms':>12}{'prom ms':>12}{'pico KB':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.name:<36}{r.input:<9}{r.blocks:>9}{r.best_ms:>12.3f}{r.mean_ms:>12.3f}{r.peak_kb:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de TextractUtils")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Cantidades aproximadas de bloques por documento")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por caso")
+    parser.add_argument("--json", dest="json_path", default=None, help="Ruta para guardar los resultados")
+    args = parser.parse_args()
+    results: list[BenchmarkResult] = run(args.sizes, args.repeat)
+    _print(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([r.model_dump() for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compara el costo por documento del workflow de cartas fianza ejecutado con LangGraph y con la cadena
+lineal (LinearPipeline). Los puertos son instantáneos, así solo se mide la sobrecarga del motor.
+
+Uso (desde src/):
+    python -m benchmarks.workflow_engine_benchmark
+    python -m benchmarks.workflow_engine_benchmark --documents 2000 --repeat 3
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from pydantic import BaseModel, Field
+
+from application.dto.financial_metadata_result import FinancialMetadataResult
+from application.dto.textract_pipeline_result import TextractPipelineResult
+from application.ports.extractor_document_port import ExtractorDocumentPort
+from application.ports.loader_metadata_port import LoaderMetadataPort
+from application.ports.notification_port import NotificationPort
+from application.ports.transform_document_port import TransformDocumentPort
+from application.use_cases.workflows.workflow_bank_guarantee import WorkflowBankGuarantee
+from domain.models.entities.bank_guarantee_item_entity import BankGuaranteeItemEntity
+from domain.models.notification import Notification
+from domain.models.states.document_contract_state import DocumentContractState
+
+ENGINES: list[str] = ["langgraph", "linear"]
+
+
+class _InstantExtractor(ExtractorDocumentPort):
+    async def extract_pipeline(self, document_data: DocumentContractState) -> TextractPipelineResult | None:
+        return TextractPipelineResult(
+            date_text="Lima, 15 de marzo de 2024",
+            promotor_text="PROMOTOR S.A.C.",
+            letter_text="Carta N° 123-2024",
+            project_text="PROYECTO",
+            grid=[["ADENDA ACTUAL", "DESEMBOLSADOS"], ["1,000.00", "500.00"]],
+        )
+
+
+class _InstantTransformer(TransformDocumentPort):
+    def get_financial_metadata(self, **kwargs) -> FinancialMetadataResult:
+        return FinancialMetadataResult(disbursed_amount=500.0, reduced_amount=0.0, total_amount=1000.0)
+
+
+class _InstantLoader(LoaderMetadataPort):
+    async def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+        return None
+
+
+class _InstantNotification(NotificationPort):
+    async def notify(self, messages: list[Notification]) -> None:
+        return None
+
+
+class EngineBenchmarkResult(BaseModel):
+    engine: str = Field(description="Motor de ejecución")
+    documents: int = Field(description="Documentos ejecutados por repetición")
+    best_us_per_document: float = Field(description="Mejor tiempo por documento en microsegundos")
+    mean_us_per_document: float = Field(description="Tiempo promedio por documento en microsegundos")
+    peak_kb: float = Field(description="Pico de memoria asignada al ejecutar todos los documentos en KB")
+
+
+def _build_workflow(engine: str) -> WorkflowBankGuarantee:
+    return WorkflowBankGuarantee(
+        extractor=_InstantExtractor(),
+        transformer=_InstantTransformer(),
+        loader_metadata=_InstantLoader(),
+        notification=_InstantNotification(),
+        engine=engine,
+    )
+
+
+def _documents(count: int) -> list[DocumentContractState]:
+    return [
+        DocumentContractState(record_id=str(i), parent_id="parent", key=f"cartas/{i}.pdf", session_id="session",
+                              period_month="03", period_year="2024")
+        for i in range(count)
+    ]
+
+
+async def _run_documents(wf: WorkflowBankGuarantee, documents: list[DocumentContractState]) -> None:
+    for doc in documents:
+        await wf.execute(doc)
+
+
+async def _measure(engine: str, documents: list[DocumentContractState], repeat: int) -> EngineBenchmarkResult:
+    wf: WorkflowBankGuarantee = _build_workflow(engine)
+    await _run_documents(wf, documents[:10])  # calentamiento
+    timings: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start: float = time.perf_counter()
+        await _run_documents(wf, documents)
+        timings.append((time.perf_counter() - start) * 1_000_000 / len(documents))
+    gc.collect()
+    tracemalloc.start()
+    await _run_documents(wf, documents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return EngineBenchmarkResult(engine=engine, documents=len(documents), best_us_per_document=min(timings),
+                                 mean_us_per_document=sum(timings) / len(timings), peak_kb=peak / 1024)
+
+
+async def run(document_count: int, repeat: int) -> list[EngineBenchmarkResult]:
+    documents: list[DocumentContractState] = _documents(document_count)
+    return [await _measure(engine, documents, repeat) for engine in ENGINES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de motores de ejecución del workflow")
+    parser.add_argument("--documents", type=int, default=500, help="Documentos por repetición")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por motor")
+    args = parser.parse_args()
+    results: list[EngineBenchmarkResult] = asyncio.run(run(args.documents, args.repeat))
+    header: str = f"{'motor':<12}{'documentos':>12}{'mejor µs/doc':>16}{'prom µs/doc':>16}{'pico KB':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.engine:<12}{r.documents:>12}{r.best_us_per_document:>16.1f}"
+              f"{r.mean_us_per_document:>16.1f}{r.peak_kb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
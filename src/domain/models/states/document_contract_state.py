@@ -13,3 +13,6 @@ class DocumentContractState(BaseModel):
     period_month: str = Field(...)
     period_year: str = Field(...)
     status: DocumentStatus = Field(default=DocumentStatus.UNPROCESSED)
+    etag: str | None = Field(default=None, description="ETag del objeto en S3; identifica el contenido")
+    failure_stage: str | None = Field(default=None, description="Etapa en la que falló el documento")
+    failure_reason: str | None = Field(default=None, description="Motivo del fallo del documento")
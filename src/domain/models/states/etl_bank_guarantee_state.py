@@ -1,8 +1,14 @@
 from pydantic import Field
+from domain.models.states.document_contract_state import DocumentContractState
 from domain.models.states.etl_base_state import EtlBaseState
 
 
 class EtlBankGuaranteeState(EtlBaseState):
+    document: DocumentContractState | None = Field(
+        description="Documento que recorre el workflow; viaja en el estado para que el grafo sea reentrante",
+        default=None
+    )
+    grid: list[list[str]] = Field(description="Contiene la grilla de la tabla extraída", default_factory=list)
     promotor: str | None = Field(
         description="Contiene el nombre del promotor que se entiende es el cliente",
         default=None
@@ -8,3 +8,13 @@ class EtlBaseState(BaseModel):
     extract_success: bool | None = Field(description="Indica si su procesamiento fue exitoso o no", default=None)
     transform_success: bool | None = Field(description="Indica si su procesamiento fue exitoso o no", default=None)
     load_success: bool | None = Field(description="Indica si su procesamiento fue exitoso o no", default=None)
+    completed_stages: list[str] = Field(description="Etapas ya completadas; permiten retomar el documento",
+                                        default_factory=list)
+    failure_reason: str | None = Field(description="Motivo del primer fallo del documento", default=None)
+
+    @property
+    def failure_stage(self) -> str | None:
+        for stage in ("extract", "transform", "load"):
+            if getattr(self, f"{stage}_success") is False:
+                return stage
+        return None
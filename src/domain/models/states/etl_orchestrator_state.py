@@ -15,6 +15,10 @@ class EtlOrchestratorState(BaseModel):
                                                                                                         "que se"
                                                                                                         "procesaron",
                                                                                             default_factory=list)
+    total_documents_skipped: Annotated[list[DocumentContractState], operator.add] = Field(
+        description="Documentos descartados por haber sido procesados antes o estar en curso",
+        default_factory=list
+    )
     total_documents_failed: Annotated[list[DocumentContractState], operator.add] = Field(description="El total de "
                                                                                                      "documentos que "
                                                                                                      "no se pudieron"
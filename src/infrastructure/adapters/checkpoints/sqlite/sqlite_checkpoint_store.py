@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from application.dto.stage_checkpoint import StageCheckpoint
+from application.ports.checkpoint_store_port import CheckpointStorePort
+
+
+class SqliteCheckpointStore(CheckpointStorePort):
+    """
+    Checkpoints de etapas en un archivo SQLite local; una sola conexión protegida por un lock y
+    operaciones ejecutadas en hilos para no bloquear el event loop
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = None):
+        """
+        :param path: Ruta del archivo SQLite
+        :param ttl_seconds: Vigencia de un checkpoint; None no expira
+        """
+        self.logger = logging.getLogger("app.workflows")
+        self._ttl_seconds: float | None = ttl_seconds
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_checkpoints ("
+                "key TEXT PRIMARY KEY, stage TEXT NOT NULL, state_values TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    async def load(self, key: str) -> StageCheckpoint | None:
+        return await asyncio.to_thread(self._load, key)
+
+    async def save(self, key: str, stage: str, values: dict[str, Any]) -> None:
+        await asyncio.to_thread(self._save, key, stage, values)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    def _load(self, key: str) -> StageCheckpoint | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, state_values, updated_at FROM stage_checkpoints WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        stage, values, updated_at = row
+        if self._ttl_seconds is not None and time.time() - updated_at > self._ttl_seconds:
+            self._delete(key)
+            return None
+        return StageCheckpoint(key=key, stage=stage, values=json.loads(values), updated_at=updated_at)
+
+    def _save(self, key: str, stage: str, values: dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO stage_checkpoints (key, stage, state_values, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET stage = excluded.stage, state_values = excluded.state_values, "
+                "updated_at = excluded.updated_at",
+                (key, stage, json.dumps(values), time.time())
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM stage_checkpoints WHERE key = ?", (key,))
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        with self._lock:
+            self._conn.close()
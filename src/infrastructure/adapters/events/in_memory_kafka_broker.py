@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from aiokafka import TopicPartition
+from aiokafka.structs import ConsumerRecord
+
+from infrastructure.adapters.events.kafka_event_publisher import EventPublisher
+
+
+class InMemoryKafkaBroker(EventPublisher):
+    """
+    Sustituto local de kafka para pruebas: guarda los mensajes por tópico en memoria y entrega
+    consumidores con la parte de la interfaz de AIOKafkaConsumer que usa el controlador de eventos
+    """
+
+    def __init__(self):
+        self.topics: dict[str, list[ConsumerRecord]] = {}
+        self.committed: dict[TopicPartition, int] = {}
+        self._new_message = asyncio.Condition()
+
+    async def publish(self, topic: str, value: bytes, key: bytes | None = None,
+                      headers: list[tuple[str, bytes]] | None = None) -> None:
+        records: list[ConsumerRecord] = self.topics.setdefault(topic, [])
+        records.append(ConsumerRecord(
+            topic=topic, partition=0, offset=len(records), timestamp=int(time.time() * 1000), timestamp_type=0,
+            key=key, value=value, checksum=None, serialized_key_size=len(key or b""),
+            serialized_value_size=len(value), headers=tuple(headers or ()),
+        ))
+        async with self._new_message:
+            self._new_message.notify_all()
+
+    def consumer(self, topic: str) -> "InMemoryKafkaConsumer":
+        return InMemoryKafkaConsumer(self, topic)
+
+    async def wait_for_message(self, timeout: float) -> None:
+        async with self._new_message:
+            try:
+                await asyncio.wait_for(self._new_message.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class InMemoryKafkaConsumer:
+    """
+    Consumidor de una partición de un tópico del broker en memoria
+    """
+
+    def __init__(self, broker: InMemoryKafkaBroker, topic: str):
+        self._broker = broker
+        self._tp = TopicPartition(topic, 0)
+        self._position: int = broker.committed.get(self._tp, 0)
+        self._paused: set[TopicPartition] = set()
+
+    def assignment(self) -> set[TopicPartition]:
+        return {self._tp}
+
+    def paused(self) -> set[TopicPartition]:
+        return set(self._paused)
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self._paused.difference_update(partitions)
+
+    def seek(self, partition: TopicPartition, offset: int) -> None:
+        self._position = offset
+
+    async def getmany(self, timeout_ms: int = 0, max_records: int | None = None) -> dict[TopicPartition, list]:
+        records: list[ConsumerRecord] = self._available(max_records)
+        if not records:
+            await self._broker.wait_for_message(timeout_ms / 1000)
+            records = self._available(max_records)
+        if not records:
+            return {}
+        self._position = records[-1].offset + 1
+        return {self._tp: records}
+
+    def _available(self, max_records: int | None) -> list[ConsumerRecord]:
+        if self._tp in self._paused:
+            return []
+        records: list[ConsumerRecord] = self._broker.topics.get(self._tp.topic, [])[self._position:]
+        return records[:max_records] if max_records is not None else records
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self._broker.committed.update(offsets)
+
+    async def stop(self) -> None:
+        return None
@@ -0,0 +1,55 @@
+import logging
+from abc import ABC, abstractmethod
+
+from aiokafka import AIOKafkaProducer
+
+from infrastructure.config.app_settings import KafkaSettings, get_app_settings
+
+
+class EventPublisher(ABC):
+    """
+    Publicación de mensajes en tópicos (reintentos y mensajes muertos)
+    """
+
+    @abstractmethod
+    async def publish(self, topic: str, value: bytes, key: bytes | None = None,
+                      headers: list[tuple[str, bytes]] | None = None) -> None:
+        ...
+
+    async def start(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class AioKafkaEventPublisher(EventPublisher):
+    """
+    Productor aiokafka compartido por los consumidores del proceso; espera la confirmación de todas
+    las réplicas antes de que el mensaje original se dé por terminado
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("app.environment")
+        self._producer: AIOKafkaProducer | None = None
+
+    async def start(self) -> None:
+        k: KafkaSettings = get_app_settings().kafka_settings
+        self._producer = AIOKafkaProducer(
+            bootstrap_servers=k.bootstrap_servers,
+            security_protocol=k.security_protocol,
+            acks="all",
+            enable_idempotence=True,
+        )
+        await self._producer.start()
+
+    async def publish(self, topic: str, value: bytes, key: bytes | None = None,
+                      headers: list[tuple[str, bytes]] | None = None) -> None:
+        if self._producer is None:
+            raise RuntimeError("El productor de kafka no fue iniciado")
+        await self._producer.send_and_wait(topic, value=value, key=key, headers=headers)
+
+    async def close(self) -> None:
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
@@ -0,0 +1,33 @@
+from typing import Any
+
+from infrastructure.adapters.extractors.textract.textract_completion_listener import TextractCompletionListener
+from infrastructure.adapters.extractors.textract.textract_extractor_document import TextractExtractorDocument
+from infrastructure.utils.aws_utils.aio_client_pool import AioClientPool, get_aio_client_pool
+
+
+class AioTextractExtractorDocument(TextractExtractorDocument):
+    """
+    Extractor de textract sobre los clientes aiobotocore compartidos; las llamadas a textract y S3 del
+    análisis no ocupan hilos del executor. El tier S3 del cache sigue usando el cliente boto3
+    """
+
+    def __init__(
+            self,
+            completion_listener: TextractCompletionListener | None = None,
+            client_pool: AioClientPool | None = None
+    ):
+        super().__init__(completion_listener=completion_listener)
+        self.client_pool: AioClientPool = client_pool or get_aio_client_pool()
+
+    async def _call_textract(self, operation: str, **kwargs) -> Any:
+        textract = await self.client_pool.get("textract")
+        return await getattr(textract, operation)(**kwargs)
+
+    async def _call_s3(self, operation: str, **kwargs) -> Any:
+        s3 = await self.client_pool.get("s3")
+        return await getattr(s3, operation)(**kwargs)
+
+    async def _read_object(self, file_key: str) -> bytes:
+        resp = await self._call_s3("get_object", Bucket=self.app_settings.s3_settings.bucket, Key=file_key)
+        async with resp["Body"] as stream:
+            return await stream.read()
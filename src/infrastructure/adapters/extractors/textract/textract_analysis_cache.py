@@ -0,0 +1,241 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+from botocore.exceptions import ClientError
+from mypy_boto3_s3.client import S3Client
+from mypy_boto3_textract.type_defs import BlockTypeDef
+
+from infrastructure.config.app_settings import TextractCacheSettings
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+
+class TextractAnalysisCache:
+    """
+    Cache de bloques de textract direccionado por contenido (ETag del objeto S3 + configuración del
+    análisis). Tiene tres niveles: LRU en memoria, disco local comprimido y el bucket de destino
+    """
+
+    def __init__(
+            self,
+            settings: TextractCacheSettings,
+            metrics: MetricsRegistry,
+            s3_client: S3Client | None = None,
+            s3_bucket: str | None = None
+    ):
+        self.logger = logging.getLogger("app.workflows")
+        self._settings = settings
+        self._metrics = metrics
+        self._s3 = s3_client if settings.s3_enabled else None
+        self._s3_bucket = s3_bucket
+        self._memory: OrderedDict[str, tuple[int, list[BlockTypeDef]]] = OrderedDict()
+        self._memory_bytes: int = 0
+        # Entradas en disco (llave -> tamaño) de la menos a la más usada y su tamaño total; el directorio se
+        # recorre una sola vez al iniciar y luego cada escritura solo actualiza el total
+        self._disk_lock = threading.Lock()
+        self._disk_entries: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes: int = 0
+        if settings.disk_dir is not None:
+            os.makedirs(settings.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def build_key(etag: str, analysis_config: dict[str, Any]) -> str:
+        """
+        Construye la llave del cache
+        :param etag: ETag del objeto en S3; identifica el contenido del documento
+        :param analysis_config: Features y queries enviados a textract
+        :return: Hash sha256 en hexadecimal
+        """
+        raw = json.dumps({"etag": etag.strip('"'), "config": analysis_config}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> list[BlockTypeDef] | None:
+        """
+        Busca los bloques en cada nivel; una entrada truncada o corrupta se elimina y cuenta como fallo
+        del cache, así el documento se vuelve a analizar
+        :param key: Llave construida con build_key
+        :return:
+        """
+        blocks = self._get_from_memory(key)
+        if blocks is not None:
+            return blocks
+        entry: tuple[list[BlockTypeDef], int] | None = None
+        if self._settings.disk_dir is not None:
+            entry = await asyncio.to_thread(self._load_from_disk, key)
+            self._count("disk", entry is not None)
+        if entry is None and self._s3 is not None:
+            entry = await asyncio.to_thread(self._load_from_s3, key)
+            self._count("s3", entry is not None)
+        if entry is None:
+            return None
+        blocks, size = entry
+        self._put_in_memory(key, blocks, size)
+        return blocks
+
+    async def put(self, key: str, blocks: list[BlockTypeDef]) -> None:
+        raw: bytes = json.dumps(blocks).encode("utf-8")
+        payload: bytes = gzip.compress(raw)
+        self._put_in_memory(key, blocks, len(raw))
+        try:
+            if self._settings.disk_dir is not None:
+                await asyncio.to_thread(self._write_to_disk, key, payload)
+            if self._s3 is not None:
+                await asyncio.to_thread(self._write_to_s3, key, payload)
+        except Exception as e:
+            self.logger.error(f"Error guardando en el cache de textract: {str(e)}")
+
+    def _count(self, tier: str, hit: bool) -> None:
+        self._metrics.increment(f"textract_cache.{tier}.{'hits' if hit else 'misses'}")
+
+    def _get_from_memory(self, key: str) -> list[BlockTypeDef] | None:
+        entry = self._memory.get(key)
+        self._count("memory", entry is not None)
+        if entry is None:
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _put_in_memory(self, key: str, blocks: list[BlockTypeDef], size: int) -> None:
+        if size > self._settings.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[0]
+        self._memory[key] = (size, blocks)
+        self._memory_bytes += size
+        # Se expulsan las entradas menos usadas hasta respetar el tamaño máximo
+        while self._memory_bytes > self._settings.memory_max_bytes:
+            _, (evicted_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._metrics.increment("textract_cache.memory.evictions")
+        self._metrics.set_gauge("textract_cache.memory.bytes", self._memory_bytes)
+
+    def _decode(self, payload: bytes) -> tuple[list[BlockTypeDef], int] | None:
+        """
+        :return: Bloques y tamaño sin comprimir; None si la entrada está truncada o corrupta
+        """
+        try:
+            raw: bytes = gzip.decompress(payload)
+            return json.loads(raw), len(raw)
+        except (OSError, EOFError, zlib.error, ValueError) as e:
+            self.logger.warning(f"Entrada inválida en el cache de textract, se descarta: {str(e)}")
+            self._metrics.increment("textract_cache.corrupt_entries")
+            return None
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self._settings.disk_dir, f"{key}.json.gz")
+
+    def _scan_disk(self) -> None:
+        entries: list[tuple[float, int, str]] = []
+        for name in os.listdir(self._settings.disk_dir):
+            if not name.endswith(".json.gz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self._settings.disk_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-len(".json.gz")]))
+        for _, size, key in sorted(entries):
+            self._disk_entries[key] = size
+            self._disk_bytes += size
+        with self._disk_lock:
+            self._evict_disk()
+
+    def _load_from_disk(self, key: str) -> tuple[list[BlockTypeDef], int] | None:
+        payload: bytes | None = self._read_from_disk(key)
+        if payload is None:
+            return None
+        entry = self._decode(payload)
+        if entry is None:
+            self._remove_from_disk(key)
+        return entry
+
+    def _read_from_disk(self, key: str) -> bytes | None:
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            # Se actualiza la fecha de acceso para que la expulsión sea por uso (LRU), también tras reiniciar
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        with self._disk_lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+        return payload
+
+    def _write_to_disk(self, key: str, payload: bytes) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with self._disk_lock:
+            self._disk_bytes += len(payload) - self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(payload)
+            self._evict_disk()
+
+    def _remove_from_disk(self, key: str) -> None:
+        try:
+            os.remove(self._disk_path(key))
+        except FileNotFoundError:
+            pass
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_entries.pop(key, 0)
+
+    def _evict_disk(self) -> None:
+        """
+        Expulsa las entradas menos usadas hasta respetar el tamaño máximo; se llama con _disk_lock tomado
+        """
+        while self._disk_bytes > self._settings.disk_max_bytes and self._disk_entries:
+            key, size = self._disk_entries.popitem(last=False)
+            try:
+                os.remove(self._disk_path(key))
+                self._metrics.increment("textract_cache.disk.evictions")
+            except FileNotFoundError:
+                pass
+            self._disk_bytes -= size
+        self._metrics.set_gauge("textract_cache.disk.bytes", self._disk_bytes)
+
+    def _s3_key(self, key: str) -> str:
+        return f"{self._settings.s3_prefix}{key}.json.gz"
+
+    def _load_from_s3(self, key: str) -> tuple[list[BlockTypeDef], int] | None:
+        payload: bytes | None = self._read_from_s3(key)
+        if payload is None:
+            return None
+        entry = self._decode(payload)
+        if entry is None:
+            try:
+                self._s3.delete_object(Bucket=self._s3_bucket, Key=self._s3_key(key))
+            except ClientError as e:
+                self.logger.error(f"Error eliminando la entrada inválida del cache en S3: {str(e)}")
+            return None
+        if self._settings.disk_dir is not None:
+            self._write_to_disk(key, payload)
+        return entry
+
+    def _read_from_s3(self, key: str) -> bytes | None:
+        try:
+            resp = self._s3.get_object(Bucket=self._s3_bucket, Key=self._s3_key(key))
+            return resp["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                self.logger.error(f"Error leyendo el cache de textract en S3: {str(e)}")
+            return None
+
+    def _write_to_s3(self, key: str, payload: bytes) -> None:
+        self._s3.put_object(
+            Bucket=self._s3_bucket,
+            Key=self._s3_key(key),
+            Body=payload,
+            ContentType="application/gzip",
+        )
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+from infrastructure.adapters.extractors.textract.textract_completion_queue import TextractCompletionQueue
+from infrastructure.internal_models.textract_completion_message import TextractCompletionMessage
+
+
+class TextractCompletionListener:
+    """
+    Consume las notificaciones de finalización de textract y despierta a la corrutina que espera
+    cada JobId; un único consumidor atiende a todos los documentos en curso
+    """
+
+    def __init__(self, queue: TextractCompletionQueue, wait_seconds: int = 20, max_early_messages: int = 1000):
+        self.logger = logging.getLogger("app.workflows")
+        self._queue = queue
+        self._wait_seconds = wait_seconds
+        self._max_early_messages = max_early_messages
+        self._waiters: dict[str, asyncio.Future[str]] = {}
+        # Notificaciones que llegaron antes de que alguien empiece a esperar su JobId
+        self._early: OrderedDict[str, str] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_for(self, job_id: str, timeout: float) -> str | None:
+        """
+        Espera la notificación de finalización del job
+        :param job_id: ID del job de textract
+        :param timeout: Segundos máximos de espera
+        :return: El estado final del job o None si no llegó la notificación a tiempo
+        """
+        if job_id in self._early:
+            return self._early.pop(job_id)
+        self._ensure_started()
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._waiters[job_id] = future
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"No se recibió la notificación del job {job_id}")
+            return None
+        finally:
+            self._waiters.pop(job_id, None)
+
+    def _dispatch(self, message: TextractCompletionMessage) -> bool:
+        """
+        Entrega la notificación a la corrutina que espera su JobId
+        :param message: Notificación recibida
+        :return: False si ningún documento de este proceso la esperaba
+        """
+        future = self._waiters.get(message.job_id)
+        if future is not None and not future.done():
+            future.set_result(message.status)
+            return True
+        self._early[message.job_id] = message.status
+        while len(self._early) > self._max_early_messages:
+            self._early.popitem(last=False)
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                messages = await self._queue.receive(self._wait_seconds)
+                # Solo se eliminan las notificaciones atendidas; las demás pueden pertenecer a otro worker
+                # o réplica sobre la misma queue y vuelven a ser visibles al vencer el visibility timeout
+                handled = [m for m in messages if self._dispatch(m)]
+                await self._queue.delete([m.receipt_handle for m in handled if m.receipt_handle])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error en el listener de textract: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
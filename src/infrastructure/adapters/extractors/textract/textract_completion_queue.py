@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+
+import boto3
+from botocore.config import Config
+from mypy_boto3_sqs import SQSClient
+
+from infrastructure.config.app_settings import AppSettings, get_app_settings
+from infrastructure.internal_models.textract_completion_message import TextractCompletionMessage
+
+
+class TextractCompletionQueue(ABC):
+    """
+    Fuente de mensajes de finalización de jobs de textract (SNS -> SQS)
+    """
+
+    @abstractmethod
+    async def receive(self, wait_seconds: int) -> list[TextractCompletionMessage]:
+        ...
+
+    @abstractmethod
+    async def delete(self, receipt_handles: list[str]) -> None:
+        ...
+
+    @staticmethod
+    def parse_body(body: str, receipt_handle: str | None = None) -> TextractCompletionMessage | None:
+        """
+        Interpreta el cuerpo del mensaje; soporta tanto el sobre de SNS (campo Message) como la
+        entrega en crudo (raw message delivery)
+        :param body: Cuerpo del mensaje SQS
+        :param receipt_handle: Identificador del mensaje en la queue
+        :return: El mensaje de finalización o None si no corresponde a un job de textract
+        """
+        try:
+            payload: dict[str, Any] = json.loads(body)
+            if "Message" in payload and isinstance(payload["Message"], str):
+                payload = json.loads(payload["Message"])
+            job_id: str | None = payload.get("JobId")
+            status: str | None = payload.get("Status")
+            if job_id is None or status is None:
+                return None
+            return TextractCompletionMessage(job_id=job_id, status=status, receipt_handle=receipt_handle)
+        except (ValueError, TypeError):
+            return None
+
+
+class SqsTextractCompletionQueue(TextractCompletionQueue):
+    def __init__(self, queue_url: str | None = None):
+        self.app_settings: AppSettings = get_app_settings()
+        self.logger = logging.getLogger("app.workflows")
+        self.queue_url: str = queue_url or self.app_settings.textract_settings.completion_queue_url
+        self.sqs: SQSClient = self._get_configuration()
+
+    def _get_configuration(self) -> SQSClient:
+        _cfg = Config(
+            retries={"max_attempts": 10, "mode": "standard"},
+            connect_timeout=3,
+            read_timeout=30,
+        )
+        return boto3.client("sqs", config=_cfg, region_name=self.app_settings.aws_settings.region)
+
+    async def receive(self, wait_seconds: int) -> list[TextractCompletionMessage]:
+        def _call() -> list[TextractCompletionMessage]:
+            resp = self.sqs.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=wait_seconds,
+            )
+            messages: list[TextractCompletionMessage] = []
+            for m in resp.get("Messages", []):
+                parsed = TextractCompletionQueue.parse_body(m.get("Body", ""), m.get("ReceiptHandle"))
+                if parsed is None:
+                    # Se descarta para que no vuelva a entregarse indefinidamente
+                    self.logger.warning(f"Mensaje no reconocido en la queue de textract: {m.get('MessageId')}")
+                    self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=m["ReceiptHandle"])
+                    continue
+                messages.append(parsed)
+            return messages
+
+        return await asyncio.to_thread(_call)
+
+    async def delete(self, receipt_handles: list[str]) -> None:
+        if not receipt_handles:
+            return
+
+        def _call() -> None:
+            self.sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{"Id": str(i), "ReceiptHandle": rh} for i, rh in enumerate(receipt_handles)],
+            )
+
+        await asyncio.to_thread(_call)
+
+
+class InMemoryTextractCompletionQueue(TextractCompletionQueue):
+    """
+    Queue local que imita SNS -> SQS; permite probar el modo de notificación sin AWS
+    """
+
+    def __init__(self):
+        self._messages: asyncio.Queue[str] = asyncio.Queue()
+        self.deleted: list[str] = []
+
+    def publish(self, job_id: str, status: str = "SUCCEEDED") -> None:
+        message = json.dumps({"JobId": job_id, "Status": status, "API": "StartDocumentAnalysis"})
+        self._messages.put_nowait(json.dumps({"Type": "Notification", "Message": message}))
+
+    async def receive(self, wait_seconds: int) -> list[TextractCompletionMessage]:
+        try:
+            body: str = await asyncio.wait_for(self._messages.get(), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            return []
+        bodies: list[str] = [body]
+        while not self._messages.empty() and len(bodies) < 10:
+            bodies.append(self._messages.get_nowait())
+        parsed = [TextractCompletionQueue.parse_body(b, str(id(b))) for b in bodies]
+        return [p for p in parsed if p is not None]
+
+    async def delete(self, receipt_handles: list[str]) -> None:
+        self.deleted.extend(receipt_handles)
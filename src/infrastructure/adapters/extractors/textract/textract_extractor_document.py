@@ -1,27 +1,70 @@
 import logging
-from typing import Any, Sequence
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Sequence
 import boto3
 import asyncio
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from mypy_boto3_s3.client import S3Client
+from mypy_boto3_s3.type_defs import HeadObjectOutputTypeDef
 from mypy_boto3_textract.client import TextractClient
 from mypy_boto3_textract.type_defs import StartDocumentAnalysisResponseTypeDef, QueryTypeDef, \
-    GetDocumentAnalysisResponseTypeDef, BlockTypeDef
+    GetDocumentAnalysisResponseTypeDef, BlockTypeDef, AnalyzeDocumentResponseTypeDef, DocumentTypeDef
 
 from application.dto.textract_pipeline_result import TextractPipelineResult
 from application.ports.extractor_document_port import ExtractorDocumentPort
 from domain.models.states.document_contract_state import DocumentContractState
+from infrastructure.adapters.extractors.textract.textract_analysis_cache import TextractAnalysisCache
+from infrastructure.adapters.extractors.textract.textract_completion_listener import TextractCompletionListener
+from infrastructure.adapters.extractors.textract.textract_job_tracker import TextractJobTracker
+from infrastructure.adapters.extractors.textract.textract_rate_limiter import TextractRateLimiter, \
+    get_textract_rate_limiter
 from infrastructure.config.app_settings import get_app_settings, AppSettings
 from infrastructure.internal_models.build_tables_result import BuildTablesResult
+from infrastructure.internal_models.prepared_document import PreparedDocument
+from infrastructure.utils.metrics_utils.metrics_registry import get_metrics_registry, MetricsRegistry
+from infrastructure.utils.pdf_utils.pdf_utils import PdfUtils
+from infrastructure.utils.textract_utils.block_index import BlockIndex
 from infrastructure.utils.textract_utils.texttract_utils import TextractUtils
 
 app_logger = logging.getLogger("app.workflows")
 
 
 class TextractExtractorDocument(ExtractorDocumentPort):
-    def __init__(self):
+    def __init__(self, completion_listener: TextractCompletionListener | None = None):
         self.app_settings: AppSettings = get_app_settings()
         self.logger = logging.getLogger("app.workflows")
-        self.textract: TextractClient = boto3.client("textract", region_name=self.app_settings.aws_settings.region)
+        aws_settings = self.app_settings.aws_settings
+        client_config = Config(max_pool_connections=aws_settings.max_pool_connections)
+        self.textract: TextractClient = boto3.client("textract", region_name=aws_settings.region, config=client_config)
+        self.s3: S3Client = boto3.client("s3", region_name=aws_settings.region, config=client_config)
+        self.completion_listener: TextractCompletionListener | None = completion_listener
+        self.metrics: MetricsRegistry = get_metrics_registry()
+        # Límite de llamadas compartido por todo el proceso
+        self.rate_limiter: TextractRateLimiter = get_textract_rate_limiter()
+        textract_settings = self.app_settings.textract_settings
+        self.job_tracker = TextractJobTracker(
+            fetch_page=self._get_document_analysis_page,
+            schedule_seconds=textract_settings.poll_schedule_seconds,
+            max_wait_seconds=textract_settings.job_max_wait_seconds,
+        )
+        self.analysis_cache: TextractAnalysisCache | None = None
+        if self.app_settings.textract_cache_settings.enabled:
+            self.analysis_cache = TextractAnalysisCache(
+                settings=self.app_settings.textract_cache_settings,
+                metrics=self.metrics,
+                s3_client=self.s3,
+                s3_bucket=self.app_settings.s3_settings.bucket_destiny,
+            )
+        # Documentos ya recortados: llave del recorte -> documento a enviar
+        self._trimmed_documents: OrderedDict[str, PreparedDocument] = OrderedDict()
+
+    async def close(self) -> None:
+        """Detiene las tareas en segundo plano (seguimiento de jobs y listener de notificaciones)"""
+        await self.job_tracker.stop()
+        if self.completion_listener is not None:
+            await self.completion_listener.stop()
 
     async def extract_pipeline(self, document_data: DocumentContractState) -> TextractPipelineResult | None:
         """
@@ -29,15 +72,11 @@ class TextractExtractorDocument(ExtractorDocumentPort):
         :param document_data: Información del documento obtenido de S3 o de dynamo
         :return: El nombre del promotor, la fecha en bruto de la carta y la grilla con el contenido de la tabla
         """
-        # Obtención del job id
         try:
-            job_id: str | None = await self._start_analysis(document_data.key)
-            if job_id is None:
+            # Índice construido una sola vez por documento; todas las búsquedas lo reutilizan
+            blocks: BlockIndex | None = await self._get_block_index(document_data.key, document_data.etag)
+            if blocks is None:
                 return None
-            # Obtención de todos los datos para el análisis
-            results_from_analysis: list[GetDocumentAnalysisResponseTypeDef] = await self._get_analysis_result(
-                job_id=job_id)
-            pages, blocks = TextractUtils.group_by_page(response=results_from_analysis)
             letter_block: BlockTypeDef | None = TextractUtils.get_letter_block(blocks)
             date_block: BlockTypeDef | None = TextractUtils.get_date_by_letter_position(letter_block, blocks)
             promotor_block: BlockTypeDef | None = TextractUtils.get_query_response_block("Promotor", blocks)
@@ -47,10 +86,9 @@ class TextractExtractorDocument(ExtractorDocumentPort):
             date_text: str | None = TextractUtils.get_text_from_block(date_block)
             promotor_text: str | None = TextractUtils.get_text_from_block(promotor_block)
             project_text: str | None = TextractUtils.get_text_from_block(project_block)
-            # Obtención de la tabla
-            tables: list[BuildTablesResult] = TextractUtils.build_tables_from_textract_blocks(blocks, False)
-            tables_filtered: list[BuildTablesResult] = TextractUtils.filter_tables_keyword(tables, blocks)
-            grid_selected: list[list[str]] = next((t.grid for t in tables_filtered if t.page == 1), [])
+            # Obtención de la tabla; solo se reconstruye la grilla de la tabla elegida
+            table_selected: BuildTablesResult | None = TextractUtils.select_table(blocks, page=1)
+            grid_selected: list[list[str]] = table_selected.grid if table_selected is not None else []
             return TextractPipelineResult(
                 date_text=date_text,
                 promotor_text=promotor_text,
@@ -62,71 +100,277 @@ class TextractExtractorDocument(ExtractorDocumentPort):
             app_logger.error(f"Error en extract_pipeline: {str(e)}")
             return None
 
+    async def _get_block_index(self, file_key: str, etag: str | None = None) -> BlockIndex | None:
+        """
+        Obtiene los bloques del documento; primero se busca en el cache por ETag y configuración del
+        análisis, caso contrario se ejecuta el análisis en textract y se guarda el resultado
+        :param file_key: Llave del documento en el bucket
+        :param etag: ETag ya resuelto del documento (deduplicación o checkpoints); None lo consulta a S3
+        :return: El índice de todos los bloques detectados por textract
+        """
+        textract_settings = self.app_settings.textract_settings
+        cache_key: str | None = None
+        if etag is None and (self.analysis_cache is not None or textract_settings.trim_pages is not None):
+            head: HeadObjectOutputTypeDef | None = await self._head_object(file_key)
+            etag = head.get("ETag") if head is not None else None
+        if self.analysis_cache is not None:
+            if etag is not None:
+                cache_key = TextractAnalysisCache.build_key(etag, self._get_cache_config())
+                cached_blocks: list[BlockTypeDef] | None = await self.analysis_cache.get(cache_key)
+                if cached_blocks is not None:
+                    self.logger.info(f"Resultado de textract obtenido del cache: {file_key}")
+                    return BlockIndex(cached_blocks)
+        document: PreparedDocument = await self._prepare_document(file_key, etag)
+        started_at: float = time.perf_counter()
+        block_index: BlockIndex | None = None
+        analysis_path: str = "sync"
+        if self._use_sync_path(document):
+            block_index = await self._analyze_document_sync(document)
+        if block_index is None:
+            analysis_path = "async"
+            # Obtención del job id
+            job_id: str | None = await self._start_analysis(document.key)
+            if job_id is None:
+                return None
+            # Obtención de todos los datos para el análisis
+            first_response: GetDocumentAnalysisResponseTypeDef = await self._wait_for_job(job_id)
+            # Solo se guardan análisis completos
+            if first_response.get("JobStatus") != "SUCCEEDED":
+                cache_key = None
+            block_index = await self._get_analysis_result(job_id, first_response)
+        self.metrics.observe(f"textract.{analysis_path}.latency_seconds", time.perf_counter() - started_at)
+        self.logger.info(f"Análisis de textract por la ruta {analysis_path}: {file_key}")
+        if cache_key is not None:
+            await self.analysis_cache.put(cache_key, block_index.blocks)
+        return block_index
+
+    def _use_sync_path(self, document: PreparedDocument) -> bool:
+        """
+        Decide si el documento se analiza con la API síncrona (analyze_document); solo admite PDFs de
+        una página, por ello en modo auto se usa únicamente cuando pypdf contó una sola página
+        :param document: Documento que se envía a textract
+        :return:
+        """
+        sync_mode = self.app_settings.textract_settings.sync_mode
+        if sync_mode != "auto":
+            return sync_mode == "always"
+        return document.page_count == 1
+
+    async def _analyze_document_sync(self, document: PreparedDocument) -> BlockIndex | None:
+        """
+        Analiza el documento con la API síncrona; si textract no lo admite (por ejemplo, un PDF de varias
+        páginas) retorna None para continuar con el job asíncrono
+        :param document: Documento que se envía a textract
+        :return:
+        """
+        textract_document: DocumentTypeDef = {
+            "S3Object": {
+                "Bucket": self.app_settings.s3_settings.bucket,
+                "Name": document.key
+            }
+        }
+        if document.content is not None:
+            textract_document = {"Bytes": document.content}
+        try:
+            resp: AnalyzeDocumentResponseTypeDef = await self.rate_limiter.call(
+                "AnalyzeDocument",
+                lambda: self._call_textract(
+                    "analyze_document", Document=textract_document, **self._get_analysis_config())
+            )
+        except ClientError as e:
+            self.logger.info(f"analyze_document no disponible, se usa el job asíncrono: {str(e)}")
+            self.metrics.increment("textract.sync.fallbacks")
+            return None
+        return BlockIndex(resp.get("Blocks", []), max_page=self.app_settings.textract_settings.stop_after_page)
+
+    async def _prepare_document(self, file_key: str, etag: str | None) -> PreparedDocument:
+        """
+        Recorta el PDF a sus primeras páginas para que textract solo analice lo que se usa en la
+        extracción. El recorte se sube al bucket con una llave derivada del ETag, así los reintentos
+        reutilizan el mismo objeto (se recomienda una regla de expiración sobre el prefijo)
+        :param file_key: Llave del documento original en el bucket
+        :param etag: ETag del documento original
+        :return: El documento que se envía a textract
+        """
+        trim_pages: int | None = self.app_settings.textract_settings.trim_pages
+        if trim_pages is None or etag is None:
+            return PreparedDocument(key=file_key)
+        etag_value: str = etag.strip('"')
+        trimmed_key: str = f"{self.app_settings.textract_settings.trim_prefix}{etag_value}-p{trim_pages}.pdf"
+        if trimmed_key in self._trimmed_documents:
+            self._trimmed_documents.move_to_end(trimmed_key)
+            return self._trimmed_documents[trimmed_key]
+        try:
+            bucket: str = self.app_settings.s3_settings.bucket
+            if await self._head_object(trimmed_key) is not None:
+                document = PreparedDocument(key=trimmed_key, page_count=trim_pages)
+            else:
+                content: bytes = await self._read_object(file_key)
+                page_count: int = await asyncio.to_thread(PdfUtils.count_pages, content)
+                if page_count <= trim_pages:
+                    document = PreparedDocument(key=file_key, page_count=page_count, content=content)
+                else:
+                    trimmed: bytes = await asyncio.to_thread(PdfUtils.trim_pages, content, trim_pages)
+                    await self._call_s3(
+                        "put_object", Bucket=bucket, Key=trimmed_key, Body=trimmed, ContentType="application/pdf")
+                    document = PreparedDocument(key=trimmed_key, page_count=trim_pages, content=trimmed)
+        except Exception as e:
+            self.logger.error(f"Error en prepare_document, se usa el documento completo: {str(e)}")
+            return PreparedDocument(key=file_key)
+        # Solo se guarda la llave; el contenido se libera para no retener PDFs en memoria
+        self._trimmed_documents[trimmed_key] = document.model_copy(update={"content": None})
+        while len(self._trimmed_documents) > 1000:
+            self._trimmed_documents.popitem(last=False)
+        return document
+
+    async def _head_object(self, file_key: str) -> HeadObjectOutputTypeDef | None:
+        try:
+            return await self._call_s3("head_object", Bucket=self.app_settings.s3_settings.bucket, Key=file_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                self.logger.error(f"Error en head_object: {str(e)}")
+            return None
+
+    @staticmethod
+    def _get_analysis_config() -> dict[str, Any]:
+        """
+        Features y queries que se envían a textract; forman parte de la llave del cache
+        :return:
+        """
+        promotor_query: QueryTypeDef = {
+            "Text": "Who is the promotor?",
+            "Alias": "Promotor",
+            "Pages": ["1"]
+        }
+        project_query: QueryTypeDef = {
+            "Text": "What is the project name?",
+            "Alias": "Project",
+            "Pages": ["1"]
+        }
+        queries: Sequence[QueryTypeDef] = [
+            promotor_query,
+            project_query
+        ]
+        return {
+            "QueriesConfig": {
+                "Queries": [*queries]
+            },
+            "FeatureTypes": ["TABLES", "QUERIES"],
+        }
+
+    def _get_cache_config(self) -> dict[str, Any]:
+        return {
+            **self._get_analysis_config(),
+            "StopAfterPage": self.app_settings.textract_settings.stop_after_page,
+            "TrimPages": self.app_settings.textract_settings.trim_pages
+        }
+
     async def _start_analysis(self, file_key: str) -> str | None:
         try:
-            def _call() -> StartDocumentAnalysisResponseTypeDef:
-                promotor_query: QueryTypeDef = {
-                    "Text": "Who is the promotor?",
-                    "Alias": "Promotor",
-                    "Pages": ["1"]
+            kwargs: dict[str, Any] = {
+                "DocumentLocation": {
+                    "S3Object": {
+                        "Bucket": self.app_settings.s3_settings.bucket,
+                        "Name": file_key
+                    }
+                },
+                **self._get_analysis_config(),
+            }
+            # Textract publica la finalización en SNS cuando el modo de notificación está activo
+            if self.completion_listener is not None:
+                kwargs["NotificationChannel"] = {
+                    "SNSTopicArn": self.app_settings.textract_settings.sns_topic_arn,
+                    "RoleArn": self.app_settings.textract_settings.role_arn
                 }
-                project_query: QueryTypeDef = {
-                    "Text": "What is the project name?",
-                    "Alias": "Project",
-                    "Pages": ["1"]
-                }
-                queries: Sequence[QueryTypeDef] = [
-                    promotor_query,
-                    project_query
-                ]
-                return self.textract.start_document_analysis(
-                    DocumentLocation={
-                        "S3Object": {
-                            "Bucket": self.app_settings.s3_settings.bucket,
-                            "Name": file_key
-                        }
-                    },
-                    QueriesConfig={
-                        "Queries": [*queries]
-                    },
-                    FeatureTypes=["TABLES", "QUERIES"],
-                )
-
-            resp = await asyncio.to_thread(_call)
+            resp: StartDocumentAnalysisResponseTypeDef = await self.rate_limiter.call(
+                "StartDocumentAnalysis", lambda: self._call_textract("start_document_analysis", **kwargs))
             return resp.get("JobId", None)
 
         except ClientError as e:
             self.logger.error(f"Error en start_analysis: {str(e)}")
             return None
 
-    async def _get_analysis_result(self, job_id: str) -> list[GetDocumentAnalysisResponseTypeDef]:
+    async def _wait_for_job(self, job_id: str) -> GetDocumentAnalysisResponseTypeDef:
         """
-        Polling asíncrono hasta que el Job termine, luego une el resultado
+        Espera a que el Job termine. El seguimiento lo hace el tracker compartido; si existe un listener
+        de notificaciones, su aviso adelanta la consulta del tracker, que sigue su calendario en paralelo
+        por si la notificación no llega
         :param job_id: el ID del procesamiento que realiza textract
-        :return:
+        :return: La primera página de resultados del job
         """
-        resp = await self._get_document_analysis_page(job_id)
+        tracking: asyncio.Future[GetDocumentAnalysisResponseTypeDef] = self.job_tracker.track(job_id)
+        if self.completion_listener is not None:
+            notified: asyncio.Task[str | None] = asyncio.create_task(self.completion_listener.wait_for(
+                job_id, timeout=self.app_settings.textract_settings.notification_timeout_seconds))
+            try:
+                await asyncio.wait({tracking, notified}, return_when=asyncio.FIRST_COMPLETED)
+                if notified.done() and notified.result() is not None and not tracking.done():
+                    self.logger.info(f"Job status notificado: {notified.result()}")
+                    self.job_tracker.track(job_id, check_now=True)
+            finally:
+                notified.cancel()
+        resp = await tracking
         self.logger.info(f"Job status: {resp.get('JobStatus', 'sin status')}")
-        while resp.get("JobStatus", "IN_PROGRESS") == "IN_PROGRESS":
-            await asyncio.sleep(5)
-            resp = await self._get_document_analysis_page(job_id)
-            self.logger.info(f"Job status: {resp.get('JobStatus', 'sin status')}")
-        all_responses: list[GetDocumentAnalysisResponseTypeDef] = [resp]
-        while "NexToken" in all_responses[-1]:
-            next_token = all_responses[-1]["NextToken"]  # type: ignore[index]
-            next_page = await self._get_document_analysis_page(job_id, next_token)
-            all_responses.append(next_page)
-        return all_responses
+        return resp
+
+    async def _iter_analysis_pages(
+            self,
+            job_id: str,
+            first_response: GetDocumentAnalysisResponseTypeDef
+    ) -> AsyncIterator[GetDocumentAnalysisResponseTypeDef]:
+        """
+        Entrega las páginas de resultados a medida que llegan siguiendo el NextToken
+        :param job_id: el ID del procesamiento que realiza textract
+        :param first_response: Primera página obtenida al finalizar el job
+        :return:
+        """
+        resp: GetDocumentAnalysisResponseTypeDef = first_response
+        yield resp
+        while resp.get("NextToken"):
+            resp = await self._get_document_analysis_page(job_id, resp["NextToken"])
+            yield resp
+
+    async def _get_analysis_result(
+            self,
+            job_id: str,
+            first_response: GetDocumentAnalysisResponseTypeDef
+    ) -> BlockIndex:
+        """
+        Construye el índice de bloques de forma incremental; deja de pedir páginas de resultados cuando
+        las páginas del documento que se usan en la extracción ya están completas
+        :param job_id: el ID del procesamiento que realiza textract
+        :param first_response: Primera página obtenida al finalizar el job
+        :return:
+        """
+        stop_after_page: int | None = self.app_settings.textract_settings.stop_after_page
+        block_index = BlockIndex(max_page=stop_after_page)
+        async for result_page in self._iter_analysis_pages(job_id, first_response):
+            block_index.add_blocks(result_page.get("Blocks", []))
+            if stop_after_page is not None and block_index.is_page_complete(stop_after_page):
+                break
+        return block_index
 
     async def _get_document_analysis_page(self, job_id: str,
                                           next_token: str | None = None) -> GetDocumentAnalysisResponseTypeDef:
         """ Retorna una página de resultados (maneja nextToken)"""
+        kwargs: dict[str, Any] = {"JobId": job_id}
+        if next_token is not None:
+            kwargs["NextToken"] = next_token
+        resp = await self.rate_limiter.call(
+            "GetDocumentAnalysis", lambda: self._call_textract("get_document_analysis", **kwargs))
+        return resp
+
+    async def _call_textract(self, operation: str, **kwargs) -> Any:
+        """
+        Punto único de llamada a textract; con boto3 se ejecuta en un hilo para no bloquear el event loop
+        :param operation: Nombre de la operación del cliente (start_document_analysis, ...)
+        :return: La respuesta de textract
+        """
+        return await asyncio.to_thread(getattr(self.textract, operation), **kwargs)
 
-        def _call() -> GetDocumentAnalysisResponseTypeDef:
-            kwargs = {"JobId": job_id}
-            if next_token is not None:
-                kwargs["NextToken"] = next_token
-            return self.textract.get_document_analysis(**kwargs)
+    async def _call_s3(self, operation: str, **kwargs) -> Any:
+        return await asyncio.to_thread(getattr(self.s3, operation), **kwargs)
 
-        resp = await asyncio.to_thread(_call)
-        return resp
+    async def _read_object(self, file_key: str) -> bytes:
+        resp = await self._call_s3("get_object", Bucket=self.app_settings.s3_settings.bucket, Key=file_key)
+        return await asyncio.to_thread(resp["Body"].read)
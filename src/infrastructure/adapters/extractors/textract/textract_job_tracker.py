@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence
+
+from mypy_boto3_textract.type_defs import GetDocumentAnalysisResponseTypeDef
+
+
+@dataclass
+class _TrackedJob:
+    future: asyncio.Future[GetDocumentAnalysisResponseTypeDef]
+    started_at: float
+    next_check_at: float
+    attempts: int = 0
+    polling: bool = False
+
+
+class TextractJobTracker:
+    """
+    Único poller en segundo plano para todos los jobs de textract en curso. Consulta cada JobId según
+    un calendario de espera creciente y resuelve el future de cada job con la primera página de
+    resultados; el presupuesto de solicitudes por segundo lo aplica la función de consulta
+    """
+
+    def __init__(
+            self,
+            fetch_page: Callable[[str], Awaitable[GetDocumentAnalysisResponseTypeDef]],
+            schedule_seconds: Sequence[float] = (1, 1, 2, 3, 5, 8),
+            max_wait_seconds: float = 900
+    ):
+        self.logger = logging.getLogger("app.workflows")
+        self._fetch_page = fetch_page
+        self._schedule: list[float] = list(schedule_seconds) or [5]
+        self._max_wait_seconds = max_wait_seconds
+        self._jobs: dict[str, _TrackedJob] = {}
+        self._wakeup = asyncio.Event()
+        self._polls: set[asyncio.Task[None]] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending_jobs(self) -> int:
+        return len(self._jobs)
+
+    def track(self, job_id: str, check_now: bool = False) -> asyncio.Future[GetDocumentAnalysisResponseTypeDef]:
+        """
+        Registra un job para su seguimiento
+        :param job_id: ID del job de textract
+        :param check_now: Consulta el job en el siguiente ciclo (por ejemplo, cuando ya se notificó su fin)
+        :return: Future que se resuelve con la respuesta final del job
+        """
+        loop = asyncio.get_running_loop()
+        tracked = self._jobs.get(job_id)
+        if tracked is None:
+            now = loop.time()
+            tracked = _TrackedJob(
+                future=loop.create_future(),
+                started_at=now,
+                next_check_at=now if check_now else now + self._schedule[0]
+            )
+            self._jobs[job_id] = tracked
+        elif check_now:
+            tracked.next_check_at = loop.time()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return tracked.future
+
+    def _next_delay(self, attempts: int) -> float:
+        return self._schedule[min(attempts, len(self._schedule) - 1)]
+
+    async def _poll(self, job_id: str, tracked: _TrackedJob) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            resp = await self._fetch_page(job_id)
+            if resp.get("JobStatus", "IN_PROGRESS") != "IN_PROGRESS":
+                self._jobs.pop(job_id, None)
+                if not tracked.future.done():
+                    tracked.future.set_result(resp)
+                return
+        except Exception as e:
+            self.logger.error(f"Error consultando el job {job_id}: {str(e)}")
+        tracked.attempts += 1
+        tracked.next_check_at = loop.time() + self._next_delay(tracked.attempts)
+        if loop.time() - tracked.started_at > self._max_wait_seconds:
+            self._jobs.pop(job_id, None)
+            if not tracked.future.done():
+                tracked.future.set_exception(TimeoutError(f"El job {job_id} superó el tiempo máximo de espera"))
+        tracked.polling = False
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            # Se descartan los jobs cuyo solicitante ya no espera (cancelación)
+            for job_id in [j for j, t in self._jobs.items() if t.future.done()]:
+                self._jobs.pop(job_id, None)
+            waiting = [t for t in self._jobs.values() if not t.polling]
+            if not waiting:
+                await self._wakeup.wait()
+                continue
+            delay = min(t.next_check_at for t in waiting) - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due = sorted(
+                ((j, t) for j, t in self._jobs.items() if not t.polling and t.next_check_at <= loop.time()),
+                key=lambda item: item[1].next_check_at
+            )
+            for job_id, tracked in due:
+                tracked.polling = True
+                poll = asyncio.create_task(self._poll(job_id, tracked))
+                self._polls.add(poll)
+                poll.add_done_callback(self._polls.discard)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
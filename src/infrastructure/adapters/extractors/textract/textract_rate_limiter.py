@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import random
+from functools import lru_cache
+from typing import Awaitable, Callable, TypeVar
+
+from botocore.exceptions import ClientError
+
+from infrastructure.config.app_settings import TextractSettings, get_app_settings
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry, get_metrics_registry
+from infrastructure.utils.rate_limit_utils.token_bucket import AsyncTokenBucket
+
+T = TypeVar("T")
+
+
+class TextractRateLimiter:
+    """
+    Control de admisión de las llamadas a textract compartido por todo el proceso (handlers de Kafka y
+    API HTTP). Cada API tiene su propio token bucket; las llamadas rechazadas por throttling se vuelven
+    a encolar con espera exponencial en lugar de fallar el documento
+    """
+
+    THROTTLING_CODES: frozenset[str] = frozenset({
+        "ThrottlingException",
+        "ProvisionedThroughputExceededException",
+        "LimitExceededException",
+    })
+
+    def __init__(self, settings: TextractSettings, metrics: MetricsRegistry, process_share: int = 1):
+        """
+        :param settings: Configuración de textract; los límites son los de toda la aplicación
+        :param metrics: Registro de métricas
+        :param process_share: Procesos que comparten la cuenta; cada uno recibe su parte del presupuesto
+        """
+        share: int = max(1, process_share)
+        self.logger = logging.getLogger("app.workflows")
+        self.metrics: MetricsRegistry = metrics
+        self.max_retries: int = settings.throttle_max_retries
+        self.buckets: dict[str, AsyncTokenBucket] = {
+            "StartDocumentAnalysis": AsyncTokenBucket(
+                "rate_limit.textract.start_document_analysis", settings.start_analysis_max_rps / share,
+                metrics=metrics),
+            "GetDocumentAnalysis": AsyncTokenBucket(
+                "rate_limit.textract.get_document_analysis", settings.get_analysis_max_rps / share, metrics=metrics),
+            "AnalyzeDocument": AsyncTokenBucket(
+                "rate_limit.textract.analyze_document", settings.analyze_document_max_rps / share, metrics=metrics),
+        }
+
+    async def call(self, api: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta una llamada a textract cuando el bucket de su API lo admite
+        :param api: Nombre de la API (StartDocumentAnalysis, GetDocumentAnalysis, AnalyzeDocument)
+        :param fn: Función que realiza la llamada
+        :return: La respuesta de textract
+        """
+        bucket: AsyncTokenBucket = self.buckets[api]
+        attempt: int = 0
+        while True:
+            await bucket.acquire()
+            try:
+                return await fn()
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in self.THROTTLING_CODES or attempt >= self.max_retries:
+                    raise
+                self.metrics.increment(f"{bucket.name}.throttled")
+                # Textract limita por cuenta: se vacía el bucket para frenar también al resto del proceso
+                bucket.drain()
+                delay: float = min(20.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                self.logger.info(f"Throttling en {api}, reintento {attempt + 1} en {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+@lru_cache(maxsize=1)
+def get_textract_rate_limiter() -> TextractRateLimiter:
+    app_settings = get_app_settings()
+    # Con varios procesos worker el presupuesto de textract se reparte entre ellos
+    return TextractRateLimiter(app_settings.textract_settings, get_metrics_registry(),
+                               app_settings.worker_settings.processes)
@@ -0,0 +1,51 @@
+import logging
+from typing import Any
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from application.ports.loader_metadata_port import LoaderMetadataPort
+from domain.models.entities.bank_guarantee_item_entity import BankGuaranteeItemEntity
+from infrastructure.adapters.loaders.dynamo.dynamo_loader_document import DynamoLoaderDocument
+from infrastructure.config.app_settings import AppSettings, get_app_settings
+from infrastructure.utils.aws_utils.aio_client_pool import AioClientPool, get_aio_client_pool
+
+
+class AioDynamoLoaderDocument(LoaderMetadataPort):
+    """
+    Carga de metadata en dynamo sobre el cliente aiobotocore compartido; aiobotocore no ofrece la API de
+    recursos, por ello los valores se serializan con los serializadores de boto3
+    """
+
+    def __init__(self, client_pool: AioClientPool | None = None):
+        self.app_settings: AppSettings = get_app_settings()
+        self.client_pool: AioClientPool = client_pool or get_aio_client_pool()
+        self.logger = logging.getLogger("app.DynamoLoaderDocument")
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    async def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+        dynamo = await self.client_pool.get("dynamodb")
+        table_name: str = self.app_settings.table_settings.si_table
+        raw_data = data.model_dump(mode="json", exclude_none=True)
+        query_output = await dynamo.query(
+            TableName=table_name,
+            IndexName="supervisoryRecordId-index",
+            KeyConditionExpression="supervisoryRecordId = :record_id",
+            ExpressionAttributeValues={":record_id": self._serializer.serialize(data.supervisory_record_id)},
+            Limit=1,
+        )
+        items: list[dict[str, Any]] = query_output.get("Items") or [{}]
+        existing_metadata: dict[str, Any] = {k: self._deserializer.deserialize(v) for k, v in items[0].items()}
+
+        self.logger.info("Existing Metadata")
+        self.logger.info(existing_metadata)
+
+        metadata = DynamoLoaderDocument.build_metadata(raw_data, existing_metadata)
+
+        await dynamo.update_item(
+            TableName=table_name,
+            Key={"id": self._serializer.serialize(existing_metadata["id"])},
+            UpdateExpression="set metadata = :metadata",
+            ExpressionAttributeValues={":metadata": self._serializer.serialize(metadata)},
+            ReturnValues="UPDATED_NEW",
+        )
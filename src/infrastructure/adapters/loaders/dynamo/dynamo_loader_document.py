@@ -1,3 +1,5 @@
+import asyncio
+
 import boto3
 from botocore.config import Config
 from boto3.dynamodb.conditions import Key, Attr
@@ -29,12 +31,29 @@ class DynamoLoaderDocument(LoaderMetadataPort):
             retries={"max_attempts": 10, "mode": "standard"},
             connect_timeout=3,
             read_timeout=5,
+            max_pool_connections=self.app_settings.aws_settings.max_pool_connections,
         )
         return boto3.resource(
             "dynamodb", config=_cfg, region_name=self.app_settings.aws_settings.region
         )
 
-    def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+    async def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+        await asyncio.to_thread(self._save_metadata, data)
+
+    @staticmethod
+    def build_metadata(raw_data: dict[str, Any], existing_metadata: dict[str, Any]) -> dict[str, Any]:
+        """
+        Combina la metadata nueva con la existente; los valores ya registrados en dynamo prevalecen
+        :param raw_data: Entidad serializada
+        :param existing_metadata: Item existente en la tabla
+        :return:
+        """
+        metadata = raw_data["metadata"]
+        if existing_metadata.get("metadata"):
+            metadata.update(existing_metadata["metadata"])
+        return metadata
+
+    def _save_metadata(self, data: BankGuaranteeItemEntity) -> None:
         raw_data = data.model_dump(mode="json", exclude_none=True)
         query_output: QueryOutputTableTypeDef = self.si_table.query(
             KeyConditionExpression=Key("supervisoryRecordId").eq(
@@ -50,10 +69,8 @@ class DynamoLoaderDocument(LoaderMetadataPort):
 
         self.logger.info("Metadata")
         self.logger.info(raw_data["metadata"])
-        
-        metadata = raw_data["metadata"]
-        if existing_metadata.get("metadata"):
-            metadata.update(existing_metadata["metadata"])
+
+        metadata = self.build_metadata(raw_data, existing_metadata)
 
         self.si_table.update_item(
             Key={
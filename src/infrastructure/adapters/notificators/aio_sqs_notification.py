@@ -0,0 +1,31 @@
+import asyncio
+import logging
+
+from application.ports.notification_port import NotificationPort
+from domain.models.notification import Notification
+from infrastructure.adapters.notificators.sqs_notification import SqsNotification
+from infrastructure.config.app_settings import AppSettings, get_app_settings
+from infrastructure.utils.aws_utils.aio_client_pool import AioClientPool, get_aio_client_pool
+
+
+class AioSqsNotification(NotificationPort):
+    """
+    Notificador SQS sobre el cliente aiobotocore compartido; no bloquea el event loop
+    """
+
+    def __init__(self, client_pool: AioClientPool | None = None):
+        self.app_settings: AppSettings = get_app_settings()
+        self.client_pool: AioClientPool = client_pool or get_aio_client_pool()
+        self.logger = logging.getLogger("app.workflows")
+
+    async def notify(self, notifications: list[Notification]):
+        batches = SqsNotification.build_batches(notifications)
+        if not batches:
+            return
+        sqs = await self.client_pool.get("sqs")
+        responses = await asyncio.gather(*[
+            sqs.send_message_batch(QueueUrl=self.app_settings.sqs_settings.queue_url, Entries=sqs_messages)
+            for sqs_messages in batches
+        ])
+        for response in responses:
+            SqsNotification.log_failed(self.logger, response)
@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from typing import Any
+
 import boto3
 import json
 
@@ -11,8 +15,12 @@ from domain.models.notification import Notification
 
 
 class SqsNotification(NotificationPort):
+    # Límite de entradas por llamada a send_message_batch
+    MAX_BATCH_ENTRIES: int = 10
+
     def __init__(self):
         self.app_settings: AppSettings = get_app_settings()
+        self.logger = logging.getLogger("app.workflows")
         self.queue: SQSClient = self._get_configuration()
 
     def _get_configuration(self) -> SQSClient:
@@ -20,20 +28,44 @@ class SqsNotification(NotificationPort):
             retries={"max_attempts": 10, "mode": "standard"},
             connect_timeout=3,
             read_timeout=5,
+            max_pool_connections=self.app_settings.aws_settings.max_pool_connections,
         )
         sqs_client: SQSClient = boto3.client(
             "sqs", config=_cfg, region_name=self.app_settings.aws_settings.region
         )
         return sqs_client
 
-    def notify(self, notifications: list[Notification]):
-        sqs_messages = [
+    async def notify(self, notifications: list[Notification]):
+        await asyncio.to_thread(self._notify, notifications)
+
+    @staticmethod
+    def build_entries(notifications: list[Notification]) -> list[dict[str, str]]:
+        return [
             {"Id": notification.id, "MessageBody": notification.message.model_dump_json(by_alias=True)}
             for notification in notifications
         ]
 
-        print("sqs_messages", sqs_messages)
-        print("queue_url", self.app_settings.sqs_settings.queue_url)
-        self.queue.send_message_batch(
-            QueueUrl=self.app_settings.sqs_settings.queue_url, Entries=sqs_messages
-        )
+    @staticmethod
+    def build_batches(notifications: list[Notification]) -> list[list[dict[str, str]]]:
+        """
+        Agrupa las entradas en lotes que respetan el límite de SQS por llamada
+        :param notifications: Notificaciones a enviar
+        :return:
+        """
+        entries: list[dict[str, str]] = SqsNotification.build_entries(notifications)
+        size: int = SqsNotification.MAX_BATCH_ENTRIES
+        return [entries[i:i + size] for i in range(0, len(entries), size)]
+
+    @staticmethod
+    def log_failed(logger: logging.Logger, response: dict[str, Any]) -> None:
+        for failed in response.get("Failed", []):
+            logger.error(f"SQS rechazó la notificación {failed.get('Id')}: {failed.get('Message')}")
+
+    def _notify(self, notifications: list[Notification]):
+        for sqs_messages in self.build_batches(notifications):
+            print("sqs_messages", sqs_messages)
+            print("queue_url", self.app_settings.sqs_settings.queue_url)
+            response = self.queue.send_message_batch(
+                QueueUrl=self.app_settings.sqs_settings.queue_url, Entries=sqs_messages
+            )
+            self.log_failed(self.logger, response)
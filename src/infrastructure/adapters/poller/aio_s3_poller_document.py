@@ -0,0 +1,33 @@
+from botocore.exceptions import ClientError
+
+from application.ports.poller_document_port import PollerDocumentPort
+from infrastructure.adapters.poller.s3_poller_document import S3PollerDocument
+from infrastructure.utils.aws_utils.aio_client_pool import AioClientPool, get_aio_client_pool
+
+
+class AioS3PollerDocument(PollerDocumentPort):
+    """
+    Listado de documentos del bucket sobre el cliente aiobotocore compartido
+    """
+
+    def __init__(self, client_pool: AioClientPool | None = None):
+        self.client_pool: AioClientPool = client_pool or get_aio_client_pool()
+
+    async def get_file_names(self, bucket_name: str, prefix_path: str, document_type: str = "pdf",
+                             position: int | None = None) -> list[str]:
+        s3 = await self.client_pool.get("s3")
+        paginator = s3.get_paginator("list_objects_v2")
+        keys: list[str] = []
+        async for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix_path):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return S3PollerDocument.filter_file_names(keys, document_type, position)
+
+    async def get_etag(self, bucket_name: str, key: str) -> str | None:
+        s3 = await self.client_pool.get("s3")
+        try:
+            head = await s3.head_object(Bucket=bucket_name, Key=key)
+        except ClientError as e:
+            if S3PollerDocument.is_not_found(e):
+                return None
+            raise
+        return head.get("ETag")
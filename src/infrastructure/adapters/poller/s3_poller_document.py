@@ -1,4 +1,8 @@
+import asyncio
+
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from mypy_boto3_s3.client import S3Client
 
 from application.ports.poller_document_port import PollerDocumentPort
@@ -8,20 +12,56 @@ from infrastructure.config.app_settings import AppSettings, get_app_settings
 class S3PollerDocument(PollerDocumentPort):
     def __init__(self):
         self.app_settings: AppSettings = get_app_settings()
-        self.s3_client: S3Client = boto3.client("s3", self.app_settings.aws_settings.region)
+        self.s3_client: S3Client = boto3.client(
+            "s3", self.app_settings.aws_settings.region,
+            config=Config(max_pool_connections=self.app_settings.aws_settings.max_pool_connections)
+        )
+
+    async def get_file_names(self, bucket_name: str, prefix_path: str, document_type: str = "pdf",
+                             position: int | None = None) -> list[str]:
+        return await asyncio.to_thread(self._get_file_names, bucket_name, prefix_path, document_type, position)
 
-    def get_file_names(self, bucket_name: str, prefix_path: str, document_type: str = "pdf",
-                       position: int | None = None) -> list[str]:
+    def _get_file_names(self, bucket_name: str, prefix_path: str, document_type: str = "pdf",
+                        position: int | None = None) -> list[str]:
         paginator = self.s3_client.get_paginator('list_objects_v2')
+        keys: list[str] = [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix_path)
+            for obj in page.get("Contents", [])
+        ]
+        return self.filter_file_names(keys, document_type, position)
+
+    async def get_etag(self, bucket_name: str, key: str) -> str | None:
+        return await asyncio.to_thread(self._get_etag, bucket_name, key)
+
+    def _get_etag(self, bucket_name: str, key: str) -> str | None:
+        try:
+            return self.s3_client.head_object(Bucket=bucket_name, Key=key).get("ETag")
+        except ClientError as e:
+            if self.is_not_found(e):
+                return None
+            raise
+
+    @staticmethod
+    def is_not_found(error: ClientError) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    @staticmethod
+    def filter_file_names(keys: list[str], document_type: str = "pdf", position: int | None = None) -> list[str]:
+        """
+        Descarta las carpetas y los objetos de otro tipo de documento
+        :param keys: Llaves listadas en el bucket
+        :param document_type: Extensión del documento
+        :param position: Si se indica, solo se retorna la llave en esa posición
+        :return:
+        """
         results: list[str] = []
-        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix_path):
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                if key.endswith("/"):
-                    continue
-                if not key.lower().endswith(f".{document_type.lower()}"):
-                    continue
-                results.append(key)
+        for key in keys:
+            if key.endswith("/"):
+                continue
+            if not key.lower().endswith(f".{document_type.lower()}"):
+                continue
+            results.append(key)
         if position is None:
             return results
         return [results[position]]
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from application.ports.processed_document_store_port import ProcessedDocumentStorePort
+
+
+class SqliteProcessedDocumentStore(ProcessedDocumentStorePort):
+    """
+    Registro persistente de documentos ya procesados en un archivo SQLite local; una sola conexión
+    protegida por un lock y operaciones ejecutadas en hilos para no bloquear el event loop
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = None):
+        """
+        :param path: Ruta del archivo SQLite
+        :param ttl_seconds: Vigencia de un registro; None no expira
+        """
+        self.logger = logging.getLogger("app.workflows")
+        self._ttl_seconds: float | None = ttl_seconds
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed_documents (key TEXT PRIMARY KEY, processed_at REAL NOT NULL)"
+            )
+            if ttl_seconds is not None:
+                # Los registros vencidos se depuran al abrir el archivo; así la tabla no crece sin límite
+                self._conn.execute("DELETE FROM processed_documents WHERE processed_at < ?",
+                                   (time.time() - ttl_seconds,))
+
+    async def get_processed_at(self, key: str) -> float | None:
+        return await asyncio.to_thread(self._get_processed_at, key)
+
+    async def add(self, key: str, processed_at: float) -> None:
+        await asyncio.to_thread(self._add, key, processed_at)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _get_processed_at(self, key: str) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT processed_at FROM processed_documents WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        processed_at: float = row[0]
+        if self._ttl_seconds is not None and time.time() - processed_at > self._ttl_seconds:
+            return None
+        return processed_at
+
+    def _add(self, key: str, processed_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO processed_documents (key, processed_at) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET processed_at = excluded.processed_at",
+                (key, processed_at)
+            )
+
+    def _close(self) -> None:
+        with self._lock:
+            self._conn.close()
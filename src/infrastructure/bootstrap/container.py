@@ -1,21 +1,150 @@
+import asyncio
+import logging
+from functools import lru_cache
+
+import boto3
+
+from application.ports.checkpoint_store_port import CheckpointStorePort
+from application.ports.extractor_document_port import ExtractorDocumentPort
+from application.ports.loader_metadata_port import LoaderMetadataPort
+from application.ports.notification_port import NotificationPort
+from application.ports.poller_document_port import PollerDocumentPort
+from application.ports.processed_document_store_port import ProcessedDocumentStorePort
 from application.use_cases.workflows.workflow_orchestrator import WorkflowOrchestrator
+from infrastructure.adapters.checkpoints.sqlite.sqlite_checkpoint_store import SqliteCheckpointStore
+from infrastructure.adapters.extractors.textract.aio_textract_extractor_document import AioTextractExtractorDocument
+from infrastructure.adapters.extractors.textract.textract_completion_listener import TextractCompletionListener
+from infrastructure.adapters.extractors.textract.textract_completion_queue import SqsTextractCompletionQueue
 from infrastructure.adapters.extractors.textract.textract_extractor_document import TextractExtractorDocument
+from infrastructure.adapters.extractors.textract.textract_rate_limiter import get_textract_rate_limiter
+from infrastructure.adapters.loaders.dynamo.aio_dynamo_loader_document import AioDynamoLoaderDocument
 from infrastructure.adapters.loaders.dynamo.dynamo_loader_document import DynamoLoaderDocument
+from infrastructure.adapters.notificators.aio_sqs_notification import AioSqsNotification
 from infrastructure.adapters.notificators.sqs_notification import SqsNotification
+from infrastructure.adapters.poller.aio_s3_poller_document import AioS3PollerDocument
 from infrastructure.adapters.poller.s3_poller_document import S3PollerDocument
+from infrastructure.adapters.processed_documents.sqlite.sqlite_processed_document_store import (
+    SqliteProcessedDocumentStore,
+)
 from infrastructure.adapters.transformers.pandas.pandas_transformer_document import PandasTransformerDocument
+from infrastructure.config.app_settings import get_app_settings
+from infrastructure.utils.aws_utils.aio_client_pool import get_aio_client_pool
+
+
+def build_completion_listener() -> TextractCompletionListener | None:
+    if not get_app_settings().textract_settings.notification_enabled:
+        return None
+    return TextractCompletionListener(SqsTextractCompletionQueue())
+
+
+def build_checkpoint_store() -> CheckpointStorePort | None:
+    checkpoint_settings = get_app_settings().checkpoint_settings
+    if not checkpoint_settings.enabled:
+        return None
+    return SqliteCheckpointStore(checkpoint_settings.sqlite_path, checkpoint_settings.ttl_seconds)
+
+
+def build_processed_document_store() -> ProcessedDocumentStorePort | None:
+    dedup_settings = get_app_settings().dedup_settings
+    if not dedup_settings.enabled:
+        return None
+    return SqliteProcessedDocumentStore(dedup_settings.sqlite_path, dedup_settings.ttl_seconds)
 
 
 def build_workflow() -> WorkflowOrchestrator:
-    extractor = TextractExtractorDocument()
-    poller = S3PollerDocument()
+    extractor: ExtractorDocumentPort
+    poller: PollerDocumentPort
+    loader_metadata: LoaderMetadataPort
+    notification: NotificationPort
+    if get_app_settings().aws_settings.client_mode == "aio":
+        # Clientes aiobotocore compartidos con pool de conexiones; sin hilos por llamada
+        extractor = AioTextractExtractorDocument(completion_listener=build_completion_listener())
+        poller = AioS3PollerDocument()
+        loader_metadata = AioDynamoLoaderDocument()
+        notification = AioSqsNotification()
+    else:
+        extractor = TextractExtractorDocument(completion_listener=build_completion_listener())
+        poller = S3PollerDocument()
+        loader_metadata = DynamoLoaderDocument()
+        notification = SqsNotification()
     transformer = PandasTransformerDocument()
-    loader_metadata = DynamoLoaderDocument()
-    notification = SqsNotification()
     return WorkflowOrchestrator(
         extractor=extractor,
         poller=poller,
         transformer=transformer,
         loader_metadata=loader_metadata,
-        notification=notification
+        notification=notification,
+        checkpoint_store=build_checkpoint_store(),
+        processed_document_store=build_processed_document_store()
     )
+
+
+class ApplicationContainer:
+    """
+    Contenedor de vida larga del proceso: construye una sola vez los adaptadores, sus clientes AWS y los
+    grafos compilados al iniciar la API o el worker, y libera las tareas y conexiones al detenerse
+    """
+
+    AIO_SERVICES: tuple[str, ...] = ("textract", "s3", "sqs", "dynamodb")
+
+    def __init__(self):
+        self.logger = logging.getLogger("app.environment")
+        self._workflow: WorkflowOrchestrator | None = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._workflow is not None
+
+    @property
+    def workflow(self) -> WorkflowOrchestrator:
+        if self._workflow is None:
+            raise RuntimeError("El contenedor de la aplicación no fue iniciado")
+        return self._workflow
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._workflow is not None:
+                return
+            # La construcción de clientes boto3 y la compilación de grafos es bloqueante: se hace fuera del loop
+            workflow: WorkflowOrchestrator = await asyncio.to_thread(build_workflow)
+            await self._warm_up()
+            self._workflow = workflow
+            self.logger.info("Contenedor de la aplicación iniciado")
+
+    async def _warm_up(self) -> None:
+        """
+        Resuelve credenciales y endpoints antes de la primera solicitud, así la latencia de los
+        documentos no incluye la cadena de credenciales ni la creación de clientes
+        """
+        get_textract_rate_limiter()
+        if get_app_settings().aws_settings.client_mode == "aio":
+            pool = get_aio_client_pool()
+            for service in self.AIO_SERVICES:
+                await pool.get(service)
+            return
+        await asyncio.to_thread(self._resolve_boto3_credentials)
+
+    @staticmethod
+    def _resolve_boto3_credentials() -> None:
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+        credentials = boto3.DEFAULT_SESSION.get_credentials()
+        if credentials is not None:
+            # En credenciales renovables (rol, IMDS) fuerza la primera obtención
+            credentials.get_frozen_credentials()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._workflow is None:
+                return
+            await self._workflow.close()
+            if get_app_settings().aws_settings.client_mode == "aio":
+                await get_aio_client_pool().close()
+            self._workflow = None
+            self.logger.info("Contenedor de la aplicación detenido")
+
+
+@lru_cache(maxsize=1)
+def get_application_container() -> ApplicationContainer:
+    return ApplicationContainer()
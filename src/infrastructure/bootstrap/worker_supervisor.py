@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable
+
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry, get_metrics_registry
+
+app_logger = logging.getLogger("app.environment")
+
+
+async def report_metrics(metrics_queue: Any, worker_index: int, interval_seconds: float) -> None:
+    """
+    Envía periódicamente el snapshot de métricas del proceso worker al supervisor
+    :param metrics_queue: Cola compartida con el supervisor
+    :param worker_index: Posición del worker en el supervisor
+    :param interval_seconds: Intervalo entre reportes
+    """
+    registry: MetricsRegistry = get_metrics_registry()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            metrics_queue.put_nowait((worker_index, os.getpid(), registry.snapshot()))
+        except Exception as e:
+            app_logger.error(f"Error reportando métricas al supervisor: {str(e)}")
+
+
+class WorkerSupervisor:
+    """
+    Supervisor del modo worker multiproceso: crea N procesos consumidores en el mismo grupo de kafka
+    (cada uno con su propio event loop y núcleo), reinicia los que terminan inesperadamente con una
+    espera creciente y suma las métricas que reportan
+    """
+
+    RESTART_MAX_DELAY_SECONDS: float = 30
+    # Un proceso que vivió al menos este tiempo se considera estable: su siguiente reinicio es inmediato
+    STABLE_SECONDS: float = 60
+    STOP_GRACE_SECONDS: float = 60
+
+    def __init__(
+            self,
+            processes: int,
+            target: Callable[[int, Any], None],
+            metrics_interval_seconds: float = 30,
+            metrics_path: str | None = None
+    ):
+        """
+        :param processes: Cantidad de procesos worker
+        :param target: Función de cada proceso; recibe su posición y la cola de métricas
+        :param metrics_interval_seconds: Intervalo de publicación de las métricas sumadas
+        :param metrics_path: Archivo JSON donde se escriben las métricas sumadas; None solo las registra en el log
+        """
+        self._processes: int = max(1, processes)
+        self._target = target
+        self._metrics_interval_seconds: float = metrics_interval_seconds
+        self._metrics_path: str | None = metrics_path
+        # fork reutiliza la configuración y los módulos ya cargados; spawn solo donde fork no existe
+        method: str = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(method)
+        self._metrics_queue = self._context.Queue()
+        self._workers: dict[int, BaseProcess] = {}
+        self._started_at: dict[int, float] = {}
+        self._failures: dict[int, int] = {}
+        self._restart_at: dict[int, float] = {}
+        self._latest_metrics: dict[int, dict[str, Any]] = {}
+        # Contadores y tiempos de procesos ya terminados; así la suma no retrocede tras un reinicio
+        self._retired_metrics: dict[str, Any] = MetricsRegistry.merge_snapshots([])
+        self._stopping: bool = False
+
+    def run(self) -> int:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._request_stop)
+        for index in range(self._processes):
+            self._start_worker(index)
+        app_logger.info(f"Supervisor iniciado con {self._processes} procesos worker")
+        next_publish: float = time.monotonic() + self._metrics_interval_seconds
+        try:
+            while not self._stopping:
+                self._drain_metrics(timeout=1)
+                self._check_workers()
+                if time.monotonic() >= next_publish:
+                    self._publish_metrics()
+                    next_publish = time.monotonic() + self._metrics_interval_seconds
+        finally:
+            self._stop_workers()
+            self._drain_metrics(timeout=0)
+            self._publish_metrics()
+        return 0
+
+    def _request_stop(self, signum: int, frame: Any) -> None:
+        self._stopping = True
+
+    def _start_worker(self, index: int) -> None:
+        process: BaseProcess = self._context.Process(
+            target=self._target, args=(index, self._metrics_queue), name=f"worker-{index}", daemon=False
+        )
+        process.start()
+        self._workers[index] = process
+        self._started_at[index] = time.monotonic()
+        self._restart_at.pop(index, None)
+        app_logger.info(f"Proceso worker-{index} iniciado (pid {process.pid})")
+
+    def _check_workers(self) -> None:
+        now: float = time.monotonic()
+        for index, process in list(self._workers.items()):
+            if process.is_alive():
+                continue
+            if index not in self._restart_at:
+                process.join()
+                self._retire_metrics(index)
+                lived: float = now - self._started_at[index]
+                self._failures[index] = 0 if lived >= self.STABLE_SECONDS else self._failures.get(index, 0) + 1
+                delay: float = min(self.RESTART_MAX_DELAY_SECONDS, 2 ** self._failures[index] - 1)
+                self._restart_at[index] = now + delay
+                app_logger.error(f"Proceso worker-{index} terminó con código {process.exitcode}; "
+                                 f"se reinicia en {delay:.0f}s")
+            if now >= self._restart_at[index]:
+                self._start_worker(index)
+
+    def _stop_workers(self) -> None:
+        # Cada worker recibe SIGTERM, termina sus mensajes en curso y confirma sus offsets
+        for process in self._workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline: float = time.monotonic() + self.STOP_GRACE_SECONDS
+        for index, process in self._workers.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                app_logger.error(f"Proceso worker-{index} no terminó a tiempo; se fuerza su cierre")
+                process.kill()
+                process.join()
+        app_logger.info("Supervisor detenido")
+
+    def _drain_metrics(self, timeout: float) -> None:
+        block: bool = timeout > 0
+        while True:
+            try:
+                index, pid, snapshot = self._metrics_queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                return
+            process: BaseProcess | None = self._workers.get(index)
+            # Un reporte atrasado de un proceso ya reemplazado no pisa al del proceso actual
+            if process is not None and process.pid == pid:
+                self._latest_metrics[index] = snapshot
+            block = False
+
+    def _retire_metrics(self, index: int) -> None:
+        snapshot: dict[str, Any] | None = self._latest_metrics.pop(index, None)
+        if snapshot is None:
+            return
+        # Los gauges describen el estado actual: los de un proceso terminado ya no aplican
+        self._retired_metrics = MetricsRegistry.merge_snapshots(
+            [self._retired_metrics, {**snapshot, "gauges": {}}])
+
+    def aggregated_metrics(self) -> dict[str, Any]:
+        merged: dict[str, Any] = MetricsRegistry.merge_snapshots(
+            [self._retired_metrics, *self._latest_metrics.values()])
+        merged["workers"] = {
+            "processes": self._processes,
+            "alive": sum(1 for p in self._workers.values() if p.is_alive()),
+            "reporting": len(self._latest_metrics),
+        }
+        return merged
+
+    def _publish_metrics(self) -> None:
+        metrics: dict[str, Any] = self.aggregated_metrics()
+        app_logger.info(f"Métricas de los workers: {json.dumps(metrics)}")
+        if self._metrics_path is None:
+            return
+        try:
+            # Se escribe en un temporal y se reemplaza: los lectores nunca ven un archivo a medias
+            tmp_path: str = f"{self._metrics_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(metrics, f)
+            os.replace(tmp_path, self._metrics_path)
+        except OSError as e:
+            app_logger.error(f"Error escribiendo las métricas de los workers: {str(e)}")
@@ -14,6 +14,35 @@ class KafkaSettings(BaseModel):
     sasl_mechanism: str | None = Field(description="", default=None)
     sasl_username: str | None = Field(description="", default=None)
     sasl_password: str | None = Field(description="", default=None)
+    commit_interval_ms: int = Field(
+        description="Cada cuánto se confirman los offsets de los mensajes ya terminados",
+        default=1000
+    )
+    max_in_flight: int = Field(
+        description="Mensajes en curso del consumidor; al alcanzarse se pausan las particiones",
+        default=16
+    )
+    max_in_flight_per_partition: int = Field(
+        description="Mensajes en curso por partición; al alcanzarse se pausa esa partición",
+        default=8
+    )
+    batch_max_documents: int = Field(
+        description="Documentos de mensajes distintos que se agrupan en una misma ejecución del orquestador",
+        default=8
+    )
+    batch_max_linger_ms: int = Field(
+        description="Espera máxima de un mensaje para completar su lote antes de ejecutarlo",
+        default=200
+    )
+    retry_enabled: bool = Field(
+        description="Publica los documentos fallidos en tópicos de reintento y luego en el de mensajes muertos",
+        default=False
+    )
+    retry_delays_seconds: list[float] = Field(
+        description="Espera de cada nivel de reintento (<topic>.retry.N), en orden",
+        default_factory=lambda: [30, 300, 1800]
+    )
+    dlq_topic: str | None = Field(description="Tópico de mensajes muertos; por defecto <topic>.dlq", default=None)
 
 
 class AwsSettings(BaseModel):
@@ -22,6 +51,14 @@ class AwsSettings(BaseModel):
         description="es el access key de la cuenta obtenido en el IAM"
     )
     secret: str | None = Field(description="es el secret key de la cuenta obtenido en el IAM")
+    client_mode: Literal["boto3", "aio"] = Field(
+        description="Familia de clientes AWS: boto3 en hilos o aiobotocore nativo asíncrono",
+        default="boto3"
+    )
+    max_pool_connections: int = Field(
+        description="Conexiones HTTP reutilizables por cliente AWS",
+        default=50
+    )
 
 
 class S3Settings(BaseModel):
@@ -38,6 +75,120 @@ class SqsSettings(BaseModel):
     queue_url: str = Field(description="URL de la queue SQS")
 
 
+class TextractSettings(BaseModel):
+    completion_mode: Literal["polling", "notification"] = Field(
+        description="Indica cómo se detecta la finalización del job: polling o notificación SNS->SQS",
+        default="polling"
+    )
+    sns_topic_arn: str | None = Field(description="ARN del tópico SNS donde textract publica el estado del job",
+                                      default=None)
+    role_arn: str | None = Field(description="ARN del rol que permite a textract publicar en el tópico SNS",
+                                 default=None)
+    completion_queue_url: str | None = Field(description="URL de la queue SQS suscrita al tópico SNS", default=None)
+    poll_schedule_seconds: list[float] = Field(
+        description="Segundos de espera entre consultas sucesivas de un job; el último valor se repite",
+        default_factory=lambda: [1, 1, 2, 3, 5, 8]
+    )
+    get_analysis_max_rps: float = Field(
+        description="Presupuesto global de llamadas GetDocumentAnalysis por segundo del proceso",
+        default=5
+    )
+    start_analysis_max_rps: float = Field(
+        description="Presupuesto global de llamadas StartDocumentAnalysis por segundo del proceso",
+        default=2
+    )
+    analyze_document_max_rps: float = Field(
+        description="Presupuesto global de llamadas AnalyzeDocument por segundo del proceso",
+        default=1
+    )
+    throttle_max_retries: int = Field(
+        description="Reintentos de una llamada que textract rechaza por throttling antes de fallar",
+        default=5
+    )
+    job_max_wait_seconds: float = Field(description="Segundos máximos de espera de un job", default=900)
+    stop_after_page: int | None = Field(
+        description="Última página del documento que se usa en la extracción; None lee todos los resultados",
+        default=1
+    )
+    trim_pages: int | None = Field(
+        description="Si se indica, solo se envían a textract las primeras N páginas del PDF",
+        default=None
+    )
+    trim_prefix: str = Field(description="Prefijo de los PDF recortados en el bucket", default="textract-trimmed/")
+    sync_mode: Literal["auto", "always", "never"] = Field(
+        description="Uso de la API síncrona analyze_document: auto la usa solo si el PDF tiene una página",
+        default="never"
+    )
+    notification_timeout_seconds: float = Field(
+        description="Segundos máximos a esperar la notificación antes de volver al polling",
+        default=300
+    )
+
+    @property
+    def notification_enabled(self) -> bool:
+        return (self.completion_mode == "notification" and self.sns_topic_arn is not None
+                and self.role_arn is not None and self.completion_queue_url is not None)
+
+
+class TextractCacheSettings(BaseModel):
+    enabled: bool = Field(description="Habilita el cache de resultados de textract", default=False)
+    memory_max_bytes: int = Field(description="Tamaño máximo del cache en memoria", default=64 * 1024 * 1024)
+    disk_dir: str | None = Field(description="Directorio del cache local en disco; None lo deshabilita",
+                                 default=None)
+    disk_max_bytes: int = Field(description="Tamaño máximo del cache en disco", default=1024 * 1024 * 1024)
+    s3_enabled: bool = Field(description="Habilita el cache en el bucket de destino", default=False)
+    s3_prefix: str = Field(description="Prefijo de los objetos de cache en el bucket de destino",
+                           default="textract-cache/")
+
+
+class WorkflowSettings(BaseModel):
+    engine: Literal["langgraph", "linear"] = Field(
+        description="Motor de ejecución de los workflows: grafo de LangGraph o cadena lineal directa",
+        default="langgraph"
+    )
+    execution_mode: Literal["window", "pipeline"] = Field(
+        description="window: ventana deslizante de documentos completos; pipeline: pool de workers por etapa",
+        default="window"
+    )
+    concurrency: int = Field(description="Cantidad de documentos que se mantienen en curso a la vez", default=4)
+    document_deadline_seconds: float | None = Field(
+        description="Tiempo máximo de procesamiento de un documento; None no limita",
+        default=1200
+    )
+    stage_concurrency: dict[str, int] = Field(
+        description="Workers por etapa en el modo pipeline",
+        default_factory=lambda: {"extract": 8, "transform": 2, "load": 4, "final_task": 1}
+    )
+    stage_queue_size: int = Field(description="Capacidad de la cola de entrada de cada etapa", default=8)
+
+
+class CheckpointSettings(BaseModel):
+    enabled: bool = Field(description="Guarda el estado de cada etapa para retomar documentos interrumpidos",
+                          default=False)
+    sqlite_path: str = Field(description="Archivo SQLite de los checkpoints", default="checkpoints/checkpoints.db")
+    ttl_seconds: float | None = Field(description="Vigencia de un checkpoint; None no expira", default=7 * 24 * 3600)
+
+
+class DedupSettings(BaseModel):
+    enabled: bool = Field(description="Descarta los documentos ya procesados (record_id + ETag)", default=False)
+    sqlite_path: str = Field(description="Archivo SQLite del registro de documentos procesados",
+                             default="dedup/processed_documents.db")
+    ttl_seconds: float | None = Field(description="Vigencia de un documento procesado; None no expira",
+                                      default=7 * 24 * 3600)
+    memory_max_entries: int = Field(description="Capacidad del registro en memoria", default=10_000)
+
+
+class WorkerSettings(BaseModel):
+    processes: int = Field(description="Procesos consumidores del worker en el mismo grupo de kafka", default=1)
+    concurrency: int = Field(description="Ejecuciones del orquestador en curso por proceso", default=8)
+    metrics_interval_seconds: float = Field(
+        description="Cada cuánto los procesos reportan sus métricas al supervisor",
+        default=30
+    )
+    metrics_path: str | None = Field(description="Archivo JSON con la suma de las métricas de los procesos",
+                                     default=None)
+
+
 class AppSettings(BaseModel):
     aws_settings: AwsSettings = Field(description="Todas las configuraciones de AWS")
     s3_settings: S3Settings = Field(
@@ -50,6 +201,26 @@ class AppSettings(BaseModel):
         description="Todas las configuraciones de las tablas"
     )
     kafka_settings: KafkaSettings = Field(description="Todas las configuraciones asociadas al kafka")
+    textract_settings: TextractSettings = Field(description="Todas las configuraciones asociadas a textract")
+    textract_cache_settings: TextractCacheSettings = Field(
+        description="Todas las configuraciones del cache de resultados de textract"
+    )
+    workflow_settings: WorkflowSettings = Field(
+        description="Configuraciones de ejecución de los workflows",
+        default_factory=WorkflowSettings
+    )
+    checkpoint_settings: CheckpointSettings = Field(
+        description="Configuraciones de los checkpoints por etapa de los workflows",
+        default_factory=CheckpointSettings
+    )
+    dedup_settings: DedupSettings = Field(
+        description="Configuraciones de la deduplicación de documentos ya procesados",
+        default_factory=DedupSettings
+    )
+    worker_settings: WorkerSettings = Field(
+        description="Configuraciones del worker de kafka y sus procesos",
+        default_factory=WorkerSettings
+    )
 
     @classmethod
     def load(cls) -> "AppSettings":
@@ -59,11 +230,13 @@ class AppSettings(BaseModel):
                     region=os.getenv("AWS_DEFAULT_REGION"),
                     access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
                     secret=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    client_mode=os.getenv("AWS_CLIENT_MODE", "boto3"),
+                    max_pool_connections=int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50")),
                 ),
                 s3_settings=S3Settings(
                     bucket=os.getenv("BUCKET_NAME"),
                     bucket_origin="origin",
-                    bucket_destiny="processed",
+                    bucket_destiny=os.getenv("BUCKET_DESTINY", "processed"),
                 ),
                 table_settings=TableSettings(
                     si_table=os.getenv("SUPERVISED_ITEMS_TABLE"),
@@ -78,10 +251,76 @@ class AppSettings(BaseModel):
                     security_protocol="PLAINTEXT",
                     sasl_mechanism=None,
                     sasl_username=None,
-                    sasl_password=None
+                    sasl_password=None,
+                    commit_interval_ms=int(os.getenv("AWS_KAFKA_COMMIT_INTERVAL_MS", "1000")),
+                    max_in_flight=int(os.getenv("AWS_KAFKA_MAX_IN_FLIGHT", "16")),
+                    max_in_flight_per_partition=int(os.getenv("AWS_KAFKA_MAX_IN_FLIGHT_PER_PARTITION", "8")),
+                    batch_max_documents=int(os.getenv("AWS_KAFKA_BATCH_MAX_DOCUMENTS", "8")),
+                    batch_max_linger_ms=int(os.getenv("AWS_KAFKA_BATCH_MAX_LINGER_MS", "200")),
+                    retry_enabled=os.getenv("AWS_KAFKA_RETRY_ENABLED", "false").lower() == "true",
+                    retry_delays_seconds=[
+                        float(v) for v in os.getenv("AWS_KAFKA_RETRY_DELAYS_SECONDS", "30,300,1800").split(",")
+                    ],
+                    dlq_topic=os.getenv("AWS_KAFKA_DLQ_TOPIC"),
+                ),
+                textract_settings=TextractSettings(
+                    completion_mode=os.getenv("TEXTRACT_COMPLETION_MODE", "polling"),
+                    sns_topic_arn=os.getenv("TEXTRACT_SNS_TOPIC_ARN"),
+                    role_arn=os.getenv("TEXTRACT_SNS_ROLE_ARN"),
+                    completion_queue_url=os.getenv("TEXTRACT_COMPLETION_QUEUE_URL"),
+                    poll_schedule_seconds=[
+                        float(v) for v in os.getenv("TEXTRACT_POLL_SCHEDULE_SECONDS", "1,1,2,3,5,8").split(",")
+                    ],
+                    get_analysis_max_rps=float(os.getenv("TEXTRACT_GET_ANALYSIS_MAX_RPS", "5")),
+                    start_analysis_max_rps=float(os.getenv("TEXTRACT_START_ANALYSIS_MAX_RPS", "2")),
+                    analyze_document_max_rps=float(os.getenv("TEXTRACT_ANALYZE_DOCUMENT_MAX_RPS", "1")),
+                    throttle_max_retries=int(os.getenv("TEXTRACT_THROTTLE_MAX_RETRIES", "5")),
+                    job_max_wait_seconds=float(os.getenv("TEXTRACT_JOB_MAX_WAIT_SECONDS", "900")),
+                    stop_after_page=int(os.getenv("TEXTRACT_STOP_AFTER_PAGE", "1")) or None,
+                    trim_pages=int(os.getenv("TEXTRACT_TRIM_PAGES", "0")) or None,
+                    sync_mode=os.getenv("TEXTRACT_SYNC_MODE", "never"),
+                    notification_timeout_seconds=float(os.getenv("TEXTRACT_NOTIFICATION_TIMEOUT_SECONDS", "300")),
+                ),
+                textract_cache_settings=TextractCacheSettings(
+                    enabled=os.getenv("TEXTRACT_CACHE_ENABLED", "false").lower() == "true",
+                    memory_max_bytes=int(os.getenv("TEXTRACT_CACHE_MEMORY_MAX_MB", "64")) * 1024 * 1024,
+                    disk_dir=os.getenv("TEXTRACT_CACHE_DISK_DIR"),
+                    disk_max_bytes=int(os.getenv("TEXTRACT_CACHE_DISK_MAX_MB", "1024")) * 1024 * 1024,
+                    s3_enabled=os.getenv("TEXTRACT_CACHE_S3_ENABLED", "false").lower() == "true",
+                ),
+                workflow_settings=WorkflowSettings(
+                    concurrency=int(os.getenv("WORKFLOW_CONCURRENCY", "4")),
+                    document_deadline_seconds=float(os.getenv("WORKFLOW_DOCUMENT_DEADLINE_SECONDS", "1200")) or None,
+                    execution_mode=os.getenv("WORKFLOW_EXECUTION_MODE", "window"),
+                    engine=os.getenv("WORKFLOW_ENGINE", "langgraph"),
+                    stage_concurrency={
+                        stage: int(workers) for stage, workers in (
+                            item.split("=") for item in os.getenv(
+                                "WORKFLOW_STAGE_CONCURRENCY", "extract=8,transform=2,load=4,final_task=1"
+                            ).split(",")
+                        )
+                    },
+                    stage_queue_size=int(os.getenv("WORKFLOW_STAGE_QUEUE_SIZE", "8")),
+                ),
+                checkpoint_settings=CheckpointSettings(
+                    enabled=os.getenv("CHECKPOINT_ENABLED", "false").lower() == "true",
+                    sqlite_path=os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints/checkpoints.db"),
+                    ttl_seconds=float(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600))) or None,
+                ),
+                dedup_settings=DedupSettings(
+                    enabled=os.getenv("DEDUP_ENABLED", "false").lower() == "true",
+                    sqlite_path=os.getenv("DEDUP_SQLITE_PATH", "dedup/processed_documents.db"),
+                    ttl_seconds=float(os.getenv("DEDUP_TTL_SECONDS", str(7 * 24 * 3600))) or None,
+                    memory_max_entries=int(os.getenv("DEDUP_MEMORY_MAX_ENTRIES", "10000")),
+                ),
+                worker_settings=WorkerSettings(
+                    processes=int(os.getenv("WORKER_PROCESSES", "1")),
+                    concurrency=int(os.getenv("WORKER_CONCURRENCY", "8")),
+                    metrics_interval_seconds=float(os.getenv("WORKER_METRICS_INTERVAL_SECONDS", "30")),
+                    metrics_path=os.getenv("WORKER_METRICS_PATH"),
                 ),
             )
-        except (KeyError, ValidationError) as e:
+        except (KeyError, ValueError, ValidationError) as e:
             raise RuntimeError(f"Configuración invalidad: {e}") from e
 
 
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class KeywordHit(BaseModel):
+    keyword: str = Field(description="Nombre de la palabra clave encontrada")
+    block_id: str = Field(description="ID del bloque donde se encontró")
+    block_type: str = Field(description="Tipo del bloque donde se encontró (LINE o WORD)")
+    page: int = Field(description="Página a la que pertenece el bloque")
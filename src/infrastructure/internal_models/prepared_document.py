@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class PreparedDocument(BaseModel):
+    key: str = Field(description="Llave en el bucket del documento que se envía a textract")
+    page_count: int | None = Field(description="Cantidad de páginas del documento enviado, si se conoce",
+                                   default=None)
+    content: bytes | None = Field(description="Contenido del documento enviado, si ya fue descargado",
+                                  default=None)
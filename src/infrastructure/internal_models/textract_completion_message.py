@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class TextractCompletionMessage(BaseModel):
+    job_id: str = Field(description="ID del job de textract que finalizó")
+    status: str = Field(description="Estado final del job: SUCCEEDED, FAILED, ERROR o PARTIAL_SUCCESS")
+    receipt_handle: str | None = Field(description="Identificador para eliminar el mensaje de la queue",
+                                       default=None)
@@ -0,0 +1,55 @@
+import asyncio
+import contextlib
+from functools import lru_cache
+from typing import Any
+
+from infrastructure.config.app_settings import AwsSettings, get_app_settings
+
+
+class AioClientPool:
+    """
+    Clientes aiobotocore de larga vida compartidos por todos los adaptadores del proceso; cada cliente
+    mantiene su propio pool de conexiones HTTP, así cientos de llamadas pueden estar en curso sin hilos
+    """
+
+    def __init__(self, aws_settings: AwsSettings):
+        self._aws_settings: AwsSettings = aws_settings
+        self._clients: dict[str, Any] = {}
+        self._exit_stack: contextlib.AsyncExitStack = contextlib.AsyncExitStack()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def get(self, service: str) -> Any:
+        """
+        Obtiene el cliente del servicio; se crea al primer uso
+        :param service: Nombre del servicio de AWS (s3, textract, sqs, dynamodb)
+        :return:
+        """
+        client = self._clients.get(service)
+        if client is not None:
+            return client
+        async with self._lock:
+            if service not in self._clients:
+                # Dependencia opcional: solo se requiere cuando AWS_CLIENT_MODE=aio
+                from aiobotocore.config import AioConfig
+                from aiobotocore.session import get_session
+
+                config = AioConfig(
+                    retries={"max_attempts": 10, "mode": "standard"},
+                    connect_timeout=3,
+                    read_timeout=60,
+                    max_pool_connections=self._aws_settings.max_pool_connections,
+                )
+                self._clients[service] = await self._exit_stack.enter_async_context(
+                    get_session().create_client(service, region_name=self._aws_settings.region, config=config)
+                )
+        return self._clients[service]
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+        self._clients.clear()
+        self._exit_stack = contextlib.AsyncExitStack()
+
+
+@lru_cache(maxsize=1)
+def get_aio_client_pool() -> AioClientPool:
+    return AioClientPool(get_app_settings().aws_settings)
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+app_logger = logging.getLogger("app.environment")
+
+
+class MicroBatcher(Generic[T]):
+    """
+    Agrupa elementos que llegan de a uno en lotes: un lote se entrega cuando alcanza max_items o
+    cuando su primer elemento esperó max_linger_ms, lo que ocurra primero. Cada lote se procesa en su
+    propia tarea, así un lote lento no detiene la formación de los siguientes
+    """
+
+    def __init__(self, flush: Callable[[list[T]], Awaitable[None]], max_items: int = 8, max_linger_ms: int = 200):
+        """
+        :param flush: Procesa un lote; sus errores se registran y no afectan a los demás lotes
+        :param max_items: Cantidad máxima de elementos por lote
+        :param max_linger_ms: Espera máxima del primer elemento de un lote antes de entregarlo
+        """
+        self._flush = flush
+        self._max_items: int = max(1, max_items)
+        self._max_linger: float = max(0, max_linger_ms) / 1000
+        self._items: list[T] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    def add(self, item: T) -> None:
+        self._items.append(item)
+        if len(self._items) >= self._max_items:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self._max_linger, self.flush)
+
+    def flush(self) -> None:
+        """
+        Entrega de inmediato el lote en formación
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        batch, self._items = self._items, []
+        task: asyncio.Task[None] = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def close(self) -> None:
+        """
+        Entrega el lote pendiente y espera a que terminen todos los lotes en curso
+        """
+        self.flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _run(self, batch: list[T]) -> None:
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            app_logger.error(f"Error procesando un lote de {len(batch)} elementos: {str(e)}")
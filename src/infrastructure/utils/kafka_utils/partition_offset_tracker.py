@@ -0,0 +1,90 @@
+from collections import deque
+
+from aiokafka import TopicPartition
+
+
+class PartitionOffsetTracker:
+    """
+    Seguimiento de los mensajes en curso por partición para commits manuales. Los mensajes de una
+    partición pueden terminar en cualquier orden; solo se confirma el offset más alto cuya secuencia
+    desde el último commit terminó completa, así un fallo nunca pierde un mensaje sin procesar
+    """
+
+    def __init__(self):
+        # Offsets recibidos y aún no confirmados, en el orden en que llegaron (crecientes por partición)
+        self._pending: dict[TopicPartition, deque[int]] = {}
+        self._finished: dict[TopicPartition, set[int]] = {}
+        # Próximo offset a confirmar (último terminado contiguo + 1) aún no enviado al broker
+        self._committable: dict[TopicPartition, int] = {}
+
+    def track(self, tp: TopicPartition, offset: int) -> None:
+        """
+        Registra un mensaje recibido
+        :param tp: Partición del mensaje
+        :param offset: Offset del mensaje
+        """
+        self._pending.setdefault(tp, deque()).append(offset)
+        self._finished.setdefault(tp, set())
+
+    def finish(self, tp: TopicPartition, offset: int) -> None:
+        """
+        Marca un mensaje como terminado y avanza la posición confirmable de su partición
+        :param tp: Partición del mensaje
+        :param offset: Offset del mensaje
+        """
+        pending: deque[int] | None = self._pending.get(tp)
+        if pending is None or offset not in pending:
+            # La partición fue revocada mientras el mensaje estaba en curso
+            return
+        finished: set[int] = self._finished[tp]
+        finished.add(offset)
+        while pending and pending[0] in finished:
+            done: int = pending.popleft()
+            finished.discard(done)
+            self._committable[tp] = done + 1
+
+    def is_finished(self, tp: TopicPartition, offset: int) -> bool:
+        """
+        Indica si el mensaje terminó y espera a que terminen los anteriores para confirmarse
+        :param tp: Partición del mensaje
+        :param offset: Offset del mensaje
+        """
+        return offset in self._finished.get(tp, ())
+
+    def in_flight(self, tp: TopicPartition | None = None) -> int:
+        """
+        Mensajes recibidos aún no terminados
+        :param tp: Partición; None cuenta todas
+        :return:
+        """
+        if tp is not None:
+            return len(self._pending.get(tp, ())) - len(self._finished.get(tp, ()))
+        return sum(len(p) - len(self._finished[t]) for t, p in self._pending.items())
+
+    def pop_committable(self) -> dict[TopicPartition, int]:
+        """
+        Offsets a confirmar desde el último llamado; si el commit falla se deben devolver con restore
+        :return: Partición -> próximo offset a consumir
+        """
+        offsets: dict[TopicPartition, int] = self._committable
+        self._committable = {}
+        return offsets
+
+    def restore(self, offsets: dict[TopicPartition, int]) -> None:
+        """
+        Devuelve offsets cuyo commit falló para reintentarlos en el próximo commit
+        :param offsets: Offsets retornados por pop_committable
+        """
+        for tp, offset in offsets.items():
+            if tp in self._pending and offset > self._committable.get(tp, -1):
+                self._committable[tp] = offset
+
+    def revoke(self, partitions: set[TopicPartition]) -> None:
+        """
+        Olvida las particiones revocadas; sus mensajes pendientes los volverá a entregar el broker
+        :param partitions: Particiones revocadas
+        """
+        for tp in partitions:
+            self._pending.pop(tp, None)
+            self._finished.pop(tp, None)
+            self._committable.pop(tp, None)
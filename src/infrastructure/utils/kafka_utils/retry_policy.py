@@ -0,0 +1,58 @@
+class RetryPolicy:
+    """
+    Enrutamiento de los mensajes fallidos: cada intento fallido pasa al siguiente tópico de reintento
+    (con una espera mayor) y, agotados los niveles, al tópico de mensajes muertos (DLQ)
+    """
+
+    ATTEMPT_HEADER: str = "x-retry-attempt"
+    STAGE_HEADER: str = "x-failure-stage"
+    REASON_HEADER: str = "x-failure-reason"
+    ORIGINAL_TOPIC_HEADER: str = "x-original-topic"
+
+    def __init__(self, topic: str, delays_seconds: list[float], dlq_topic: str | None = None):
+        """
+        :param topic: Tópico principal
+        :param delays_seconds: Espera de cada nivel de reintento, en orden
+        :param dlq_topic: Tópico de mensajes muertos; por defecto <topic>.dlq
+        """
+        self.topic: str = topic
+        self.delays_seconds: list[float] = delays_seconds
+        self.dlq_topic: str = dlq_topic or f"{topic}.dlq"
+
+    def retry_topics(self) -> list[tuple[str, float]]:
+        """
+        :return: (tópico, espera en segundos) de cada nivel de reintento
+        """
+        return [(f"{self.topic}.retry.{i + 1}", delay) for i, delay in enumerate(self.delays_seconds)]
+
+    def destination(self, attempt: int) -> str:
+        """
+        Tópico al que se envía un mensaje que falló
+        :param attempt: Reintentos ya realizados (0 si falló en el tópico principal)
+        :return:
+        """
+        retry_topics: list[tuple[str, float]] = self.retry_topics()
+        if attempt < len(retry_topics):
+            return retry_topics[attempt][0]
+        return self.dlq_topic
+
+    @staticmethod
+    def attempt_of(headers: list[tuple[str, bytes]] | tuple[tuple[str, bytes], ...] | None) -> int:
+        for name, value in headers or ():
+            if name == RetryPolicy.ATTEMPT_HEADER:
+                try:
+                    return int(value.decode("utf-8"))
+                except ValueError:
+                    return 0
+        return 0
+
+    @staticmethod
+    def build_headers(attempt: int, stage: str | None, reason: str | None,
+                      original_topic: str) -> list[tuple[str, bytes]]:
+        return [
+            (RetryPolicy.ATTEMPT_HEADER, str(attempt).encode("utf-8")),
+            (RetryPolicy.STAGE_HEADER, (stage or "desconocida").encode("utf-8")),
+            # Los valores de headers deben ser cortos; el motivo se trunca
+            (RetryPolicy.REASON_HEADER, (reason or "")[:1000].encode("utf-8")),
+            (RetryPolicy.ORIGINAL_TOPIC_HEADER, original_topic.encode("utf-8")),
+        ]
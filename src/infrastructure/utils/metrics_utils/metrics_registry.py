@@ -0,0 +1,62 @@
+import threading
+from functools import lru_cache
+from typing import Any
+
+
+class MetricsRegistry:
+    """
+    Registro en memoria de métricas del proceso: contadores, gauges y tiempos (count/total/max)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {k: dict(v) for k, v in self._timings.items()},
+            }
+
+    @staticmethod
+    def merge_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Suma snapshots de varios procesos: contadores, gauges y tiempos se suman; el máximo se conserva
+        :param snapshots: Snapshots a combinar
+        :return:
+        """
+        merged: dict[str, Any] = {"counters": {}, "gauges": {}, "timings": {}}
+        for snapshot in snapshots:
+            for kind in ("counters", "gauges"):
+                for name, value in snapshot.get(kind, {}).items():
+                    merged[kind][name] = merged[kind].get(name, 0) + value
+            for name, timing in snapshot.get("timings", {}).items():
+                current = merged["timings"].setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+                current["count"] += timing["count"]
+                current["total"] += timing["total"]
+                current["max"] = max(current["max"], timing["max"])
+        return merged
+
+
+@lru_cache(maxsize=1)
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
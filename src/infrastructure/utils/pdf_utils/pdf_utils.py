@@ -0,0 +1,31 @@
+import io
+
+from pypdf import PdfReader, PdfWriter
+
+
+class PdfUtils:
+
+    @staticmethod
+    def count_pages(data: bytes) -> int:
+        """
+        Cuenta las páginas de un PDF
+        :param data: Contenido del PDF
+        :return: Número de páginas
+        """
+        return len(PdfReader(io.BytesIO(data)).pages)
+
+    @staticmethod
+    def trim_pages(data: bytes, max_pages: int) -> bytes:
+        """
+        Genera un nuevo PDF solo con las primeras páginas del documento
+        :param data: Contenido del PDF original
+        :param max_pages: Cantidad de páginas a conservar
+        :return: Contenido del PDF recortado
+        """
+        reader = PdfReader(io.BytesIO(data))
+        writer = PdfWriter()
+        for page in reader.pages[:max_pages]:
+            writer.add_page(page)
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
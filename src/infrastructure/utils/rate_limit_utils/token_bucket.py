@@ -0,0 +1,97 @@
+import asyncio
+import time
+from collections import deque
+
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket asíncrono con cola FIFO: los solicitantes que no encuentran tokens esperan su turno en
+    orden de llegada en lugar de fallar. Publica la profundidad de la cola y el tiempo de espera
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float | None = None, metrics: MetricsRegistry | None = None):
+        """
+        :param name: Nombre del bucket; prefijo de sus métricas
+        :param rate: Tokens que se reponen por segundo; 0 o negativo deshabilita el límite
+        :param capacity: Ráfaga máxima permitida; por defecto un segundo de tokens
+        :param metrics: Registro de métricas del proceso
+        """
+        self.name: str = name
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity is not None else max(1.0, rate)
+        self._metrics: MetricsRegistry | None = metrics
+        self._tokens: float = self.capacity
+        self._updated_at: float = time.monotonic()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _publish_depth(self) -> None:
+        if self._metrics is not None:
+            self._metrics.set_gauge(f"{self.name}.queue_depth", len(self._waiters))
+
+    def _grant(self) -> None:
+        """Entrega tokens a los solicitantes en orden de llegada y reprograma el siguiente turno"""
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            waiter: asyncio.Future[None] = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._tokens -= 1
+            waiter.set_result(None)
+        self._publish_depth()
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not self._waiters:
+            return
+        delay: float = max(0.0, (1 - self._tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._grant)
+
+    async def acquire(self) -> float:
+        """
+        Espera un token
+        :return: Segundos que se esperó en la cola
+        """
+        if self.rate <= 0:
+            return 0.0
+        started_at: float = time.monotonic()
+        self._refill()
+        # Solo se toma el token directamente si nadie espera, así se respeta el orden de llegada
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+        else:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._publish_depth()
+            self._schedule()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._publish_depth()
+                elif waiter.done() and not waiter.cancelled():
+                    # El token ya fue entregado: se devuelve al bucket
+                    self._tokens += 1
+                raise
+        waited: float = time.monotonic() - started_at
+        if self._metrics is not None:
+            self._metrics.observe(f"{self.name}.wait_seconds", waited)
+        return waited
+
+    def drain(self) -> None:
+        """Vacía el bucket; se usa cuando el servicio remoto reporta throttling pese al límite local"""
+        self._refill()
+        self._tokens = 0
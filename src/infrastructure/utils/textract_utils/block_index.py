@@ -0,0 +1,138 @@
+from typing import Iterable
+
+from mypy_boto3_textract.type_defs import BlockTypeDef
+
+from infrastructure.utils.textract_utils.keyword_engine import KeywordHits
+from infrastructure.utils.textract_utils.line_geometry_store import LineGeometryStore
+
+
+class BlockIndex:
+    """
+    Índice de los bloques de un documento construido en una sola pasada; se alimenta de forma
+    incremental a medida que llegan las páginas de resultados de textract. Permite búsquedas por Id,
+    por tipo de bloque, por página, por alias de query y por relaciones padre/hijo
+    """
+
+    def __init__(self, blocks: Iterable[BlockTypeDef] = (), max_page: int | None = None):
+        """
+        :param blocks: Bloques iniciales
+        :param max_page: Si se indica, se ignoran los bloques de páginas posteriores
+        """
+        self.max_page: int | None = max_page
+        self.blocks: list[BlockTypeDef] = []
+        self.by_id: dict[str, BlockTypeDef] = {}
+        self.by_type: dict[str, list[BlockTypeDef]] = {}
+        self.by_page: dict[int, list[BlockTypeDef]] = {}
+        self.query_by_alias: dict[str, BlockTypeDef] = {}
+        # Id del hijo -> Ids de sus padres (relaciones CHILD); una palabra pertenece a una línea y a una celda
+        self.parent_ids: dict[str, list[str]] = {}
+        self.last_page_seen: int = 0
+        self._line_geometry: LineGeometryStore | None = None
+        # Texto de cada celda ya reconstruido (Id de celda -> texto)
+        self.cell_text_cache: dict[str, str] = {}
+        # Resultado del motor de palabras clave; se calcula una sola vez por documento
+        self.keyword_hits: KeywordHits | None = None
+        self.add_blocks(blocks)
+
+    @staticmethod
+    def ensure(blocks: "BlockIndex | Iterable[BlockTypeDef]") -> "BlockIndex":
+        """
+        Permite que las utilidades reciban tanto un índice como la lista de bloques
+        :param blocks: Índice ya construido o lista de bloques
+        :return:
+        """
+        if isinstance(blocks, BlockIndex):
+            return blocks
+        return BlockIndex(blocks)
+
+    def add_blocks(self, blocks: Iterable[BlockTypeDef]) -> None:
+        self._line_geometry = None
+        self.cell_text_cache.clear()
+        self.keyword_hits = None
+        for b in blocks:
+            page: int = b.get("Page", 1)
+            self.last_page_seen = max(self.last_page_seen, page)
+            if self.max_page is not None and page > self.max_page:
+                continue
+            self.blocks.append(b)
+            self.by_id[b["Id"]] = b
+            self.by_type.setdefault(b.get("BlockType"), []).append(b)
+            self.by_page.setdefault(page, []).append(b)
+            if b.get("BlockType") == "QUERY":
+                alias: str | None = b.get("Query", {}).get("Alias")
+                if alias is not None and alias not in self.query_by_alias:
+                    self.query_by_alias[alias] = b
+            for rid in self.related_ids(b, "CHILD"):
+                self.parent_ids.setdefault(rid, []).append(b["Id"])
+
+    def is_page_complete(self, page: int) -> bool:
+        """
+        Textract entrega los bloques ordenados por página; al ver un bloque de una página posterior
+        se asume que la página indicada ya llegó completa
+        :param page: Número de página
+        :return:
+        """
+        return self.last_page_seen > page
+
+    @property
+    def line_geometry(self) -> LineGeometryStore:
+        """
+        Geometría vectorizada de las líneas; se construye al primer uso y se invalida al agregar bloques
+        :return:
+        """
+        if self._line_geometry is None:
+            self._line_geometry = LineGeometryStore(self.of_type("LINE"))
+        return self._line_geometry
+
+    def get(self, block_id: str, default: BlockTypeDef | None = None) -> BlockTypeDef | None:
+        return self.by_id.get(block_id, default)
+
+    def of_type(self, block_type: str) -> list[BlockTypeDef]:
+        return self.by_type.get(block_type, [])
+
+    def on_page(self, page: int) -> list[BlockTypeDef]:
+        return self.by_page.get(page, [])
+
+    def query(self, alias: str) -> BlockTypeDef | None:
+        return self.query_by_alias.get(alias)
+
+    @staticmethod
+    def related_ids(block: BlockTypeDef, relation_type: str = "CHILD") -> list[str]:
+        """
+        Obtiene los Ids relacionados a un bloque por el tipo de relación indicado
+        :param block: Bloque de origen
+        :param relation_type: Tipo de relación (CHILD, ANSWER, VALUE, ...)
+        :return:
+        """
+        return [
+            rid for rel in block.get("Relationships", []) or [] if rel.get("Type") == relation_type
+            for rid in rel.get("Ids", []) or []
+        ]
+
+    def children(
+            self,
+            block: BlockTypeDef,
+            types: tuple[str, ...] | None = None,
+            relation_type: str = "CHILD"
+    ) -> list[BlockTypeDef]:
+        """
+        Obtiene los bloques relacionados que existen en el índice, opcionalmente filtrados por tipo
+        :param block: Bloque padre
+        :param types: Tipos de bloque requeridos
+        :param relation_type: Tipo de relación
+        :return:
+        """
+        related: list[BlockTypeDef] = [
+            self.by_id[rid] for rid in self.related_ids(block, relation_type) if rid in self.by_id
+        ]
+        if types is None:
+            return related
+        return [b for b in related if b.get("BlockType") in types]
+
+    def parents(self, block_id: str, types: tuple[str, ...] | None = None) -> list[BlockTypeDef]:
+        parents: list[BlockTypeDef] = [
+            self.by_id[pid] for pid in self.parent_ids.get(block_id, []) if pid in self.by_id
+        ]
+        if types is None:
+            return parents
+        return [b for b in parents if b.get("BlockType") in types]
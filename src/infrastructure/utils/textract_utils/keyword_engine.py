@@ -0,0 +1,83 @@
+import re
+from typing import TYPE_CHECKING
+
+from infrastructure.internal_models.keyword_hit import KeywordHit
+
+if TYPE_CHECKING:
+    from infrastructure.utils.textract_utils.block_index import BlockIndex
+
+
+class KeywordHits:
+    """
+    Resultado del recorrido del motor de palabras clave sobre un documento
+    """
+
+    def __init__(self, hits: list[KeywordHit]):
+        self.hits: list[KeywordHit] = hits
+        self.by_keyword: dict[str, list[KeywordHit]] = {}
+        for h in hits:
+            self.by_keyword.setdefault(h.keyword, []).append(h)
+
+    def of(self, keyword: str, block_type: str | None = None, page: int | None = None) -> list[KeywordHit]:
+        return [
+            h for h in self.by_keyword.get(keyword, [])
+            if (block_type is None or h.block_type == block_type) and (page is None or h.page == page)
+        ]
+
+    def first(self, keyword: str, block_type: str | None = None, page: int | None = None) -> KeywordHit | None:
+        return next(iter(self.of(keyword, block_type, page)), None)
+
+
+class KeywordEngine:
+    """
+    Motor de palabras clave de un solo recorrido: todas las variantes se compilan en una única expresión
+    regular con alternativas nombradas y se evalúan una sola vez sobre el texto normalizado de cada
+    bloque LINE/WORD. Agregar nuevas palabras clave no agrega nuevos recorridos del documento
+    """
+
+    def __init__(self, keywords: dict[str, list[str]]):
+        """
+        :param keywords: Nombre de la palabra clave -> variantes de texto que la identifican
+        """
+        self._group_to_keyword: dict[str, str] = {}
+        alternatives: list[str] = []
+        for keyword, variants in keywords.items():
+            for variant in variants:
+                group: str = f"k{len(alternatives)}"
+                self._group_to_keyword[group] = keyword
+                alternatives.append(f"(?P<{group}>{re.escape(KeywordEngine.normalize(variant))})")
+        self._pattern: re.Pattern[str] = re.compile("|".join(alternatives))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def find(self, text: str) -> list[str]:
+        """
+        Palabras clave presentes en un texto
+        :param text: Texto a evaluar
+        :return: Nombres de las palabras clave encontradas (sin repetir)
+        """
+        found: list[str] = []
+        for match in self._pattern.finditer(KeywordEngine.normalize(text)):
+            keyword: str = self._group_to_keyword[match.lastgroup]
+            if keyword not in found:
+                found.append(keyword)
+        return found
+
+    def scan(self, block_index: "BlockIndex", block_types: tuple[str, ...] = ("LINE", "WORD")) -> KeywordHits:
+        """
+        Recorre una sola vez los bloques de texto del documento registrando cada coincidencia
+        :param block_index: Índice de bloques del documento
+        :param block_types: Tipos de bloque a recorrer
+        :return: Todas las coincidencias en el orden de lectura
+        """
+        hits: list[KeywordHit] = []
+        for b in block_index.blocks:
+            block_type: str = b.get("BlockType")
+            if block_type not in block_types:
+                continue
+            for keyword in self.find(b.get("Text", "")):
+                hits.append(KeywordHit(keyword=keyword, block_id=b["Id"], block_type=block_type,
+                                       page=b.get("Page", 1)))
+        return KeywordHits(hits)
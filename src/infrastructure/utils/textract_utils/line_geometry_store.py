@@ -0,0 +1,47 @@
+import numpy as np
+from mypy_boto3_textract.type_defs import BlockTypeDef
+
+
+class LineGeometryStore:
+    """
+    Geometría de las líneas (LINE) de un documento empaquetada en arreglos de NumPy; permite resolver
+    predicados espaciales sobre todas las líneas con una sola operación vectorizada
+    """
+
+    def __init__(self, lines: list[BlockTypeDef]):
+        """
+        :param lines: Bloques de tipo LINE en el orden de lectura de textract
+        """
+        self.lines: list[BlockTypeDef] = lines
+        boxes = [line.get("Geometry", {}).get("BoundingBox", {}) for line in lines]
+        n: int = len(lines)
+        # Las líneas sin bounding box quedan como NaN y nunca cumplen un predicado
+        self.top: np.ndarray = np.fromiter((b.get("Top", np.nan) for b in boxes), dtype=np.float64, count=n)
+        self.left: np.ndarray = np.fromiter((b.get("Left", np.nan) for b in boxes), dtype=np.float64, count=n)
+        self.width: np.ndarray = np.fromiter((b.get("Width", np.nan) for b in boxes), dtype=np.float64, count=n)
+        self.height: np.ndarray = np.fromiter((b.get("Height", np.nan) for b in boxes), dtype=np.float64, count=n)
+
+    def above_and_left_of(self, top: float, left: float, width: float) -> np.ndarray:
+        """
+        Máscara de las líneas que están por encima de la coordenada superior indicada y que empiezan
+        antes del borde derecho del bounding box de referencia
+        :param top: Coordenada superior del bounding box de referencia
+        :param left: Coordenada izquierda del bounding box de referencia
+        :param width: Ancho del bounding box de referencia
+        :return: Arreglo booleano alineado con self.lines
+        """
+        return (self.top < top) & (self.left < left + width)
+
+    def select(self, mask: np.ndarray) -> list[BlockTypeDef]:
+        return [self.lines[i] for i in np.flatnonzero(mask)]
+
+    def last(self, mask: np.ndarray) -> BlockTypeDef | None:
+        """
+        Última línea que cumple la máscara según el orden de lectura
+        :param mask: Máscara booleana
+        :return:
+        """
+        indexes: np.ndarray = np.flatnonzero(mask)
+        if indexes.size == 0:
+            return None
+        return self.lines[int(indexes[-1])]
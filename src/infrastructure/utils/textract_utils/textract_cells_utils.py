@@ -1,20 +1,26 @@
 from mypy_boto3_textract.type_defs import BlockTypeDef, RelationshipTypeDef
 
 from infrastructure.internal_models.build_tables_result import BuildTablesResult
+from infrastructure.utils.textract_utils.block_index import BlockIndex
 
 
 class TextractCellsUtils:
 
     @staticmethod
-    def extract_cell_text(cell_block: BlockTypeDef, block_by_id: dict[str, BlockTypeDef]):
+    def extract_cell_text(cell_block: BlockTypeDef, block_by_id: dict[str, BlockTypeDef] | BlockIndex):
         """
          Extrae el contenido de la celda de turno; una celda puede tener relaciones de tipo CHILD
         los cuales deben conformar el contenido completo requerido; por ello buscamos sus relaciones
         de tipo CHILD; obtenemos los IDs y los buscamos en el diccionario de IDs concatenando la información
         :param cell_block: Bloque de celda a obtener su contenido
-        :param block_by_id: Todos los bloques agrupados por el ID
+        :param block_by_id: Todos los bloques agrupados por el ID o su índice
         :return: El texto de la celda
         """
+        # El texto se memoriza en el índice para no reconstruirlo en cada recorrido del documento
+        if isinstance(block_by_id, BlockIndex):
+            cached: str | None = block_by_id.cell_text_cache.get(cell_block["Id"])
+            if cached is not None:
+                return cached
         text_parts: list[str] = []
         # Obtenemos todas las relaciones que sean de tipo CHILD
         child_relations: list[RelationshipTypeDef] = [
@@ -31,22 +37,26 @@ class TextractCellsUtils:
                     txt = child.get("Text", "")
                     if txt:
                         text_parts.append(txt)
-        return " ".join(text_parts).strip()
+        text: str = " ".join(text_parts).strip()
+        if isinstance(block_by_id, BlockIndex):
+            block_by_id.cell_text_cache[cell_block["Id"]] = text
+        return text
 
     @staticmethod
     def check_if_keyword_is_present(
             keywords: list[str],
             table_block: BlockTypeDef,
-            block_by_id: dict[str, BlockTypeDef]
+            block_by_id: dict[str, BlockTypeDef] | BlockIndex
     ) -> bool:
         """
         Evalúa si una lista de palabras clave (keywords) se encuentran dentro de al menos
         una de las celdas
         :param keywords: Palabras a buscar
         :param table_block: Tabla
-        :param block_by_id: Contiene todos los bloques agrupados por el ID
+        :param block_by_id: Contiene todos los bloques agrupados por el ID o su índice
         :return: True en caso exista al menos una de las palabras clave
         """
+        lowered_keywords: list[str] = [kw.lower() for kw in keywords]
         # Obtenemos todas las relaciones que sean de tipo CHILD
         child_relations: list[RelationshipTypeDef] = [
             rel for rel in table_block.get("Relationships", []) or []
@@ -56,9 +66,9 @@ class TextractCellsUtils:
             for rid in rel.get("Ids", []) or []:
                 cell: BlockTypeDef | None = block_by_id.get(rid)
                 if cell and cell.get("BlockType") == "CELL":
-                    cell_text = TextractCellsUtils.extract_cell_text(cell, block_by_id)
-                    for kw in keywords:
-                        if kw.lower() in cell_text.lower():
+                    cell_text = TextractCellsUtils.extract_cell_text(cell, block_by_id).lower()
+                    for kw in lowered_keywords:
+                        if kw in cell_text:
                             return True
 
         return False
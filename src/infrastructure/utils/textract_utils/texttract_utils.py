@@ -1,99 +1,113 @@
 from typing import Sequence
 
+import numpy as np
 from mypy_boto3_textract.literals import BlockTypeType
-from mypy_boto3_textract.type_defs import GetDocumentAnalysisResponseTypeDef, BlockTypeDef, BoundingBoxTypeDef, \
-    RelationshipTypeDef
+from mypy_boto3_textract.type_defs import GetDocumentAnalysisResponseTypeDef, BlockTypeDef, BoundingBoxTypeDef
 
 from infrastructure.internal_models.build_tables_result import BuildTablesResult
+from infrastructure.internal_models.keyword_hit import KeywordHit
+from infrastructure.utils.textract_utils.block_index import BlockIndex
+from infrastructure.utils.textract_utils.keyword_engine import KeywordEngine, KeywordHits
 from infrastructure.utils.textract_utils.textract_cells_utils import TextractCellsUtils
 
 
 class TextractUtils:
+    # Palabras clave que identifican la tabla de montos de la carta
+    TABLE_KEYWORDS: list[str] = ["ADENDA ACTUAL", "DESEMBOLSADOS"]
+    # Todas las palabras clave del documento se buscan en un solo recorrido
+    KEYWORD_ENGINE: KeywordEngine = KeywordEngine({
+        "letter": ["carta n°"],
+        "table": TABLE_KEYWORDS,
+    })
 
     @staticmethod
     def group_by_page(
-            response: list[GetDocumentAnalysisResponseTypeDef]
+            response: list[GetDocumentAnalysisResponseTypeDef] | BlockIndex
     ) -> tuple[list[BlockTypeDef], list[BlockTypeDef]]:
         """
           Agrupa los blocks por página y retorna (pages, blocks).
           """
+        if isinstance(response, BlockIndex):
+            return response.of_type("PAGE"), response.blocks
         blocks: list[BlockTypeDef] = [b for r in response for b in r.get("Blocks", [])]
         pages: list[BlockTypeDef] = [p for p in blocks if p.get("BlockType") == "PAGE"]
         return pages, blocks
 
     @staticmethod
-    def get_letter_block(results: list[BlockTypeDef]) -> BlockTypeDef | None:
-        # Encontramos las coordenadas de las páginas
-        patter_to_search: str = "carta n°"
-        element: BlockTypeDef | None = next(
-            (e for e in results if e["BlockType"] == "LINE" and patter_to_search in e.get("Text", "").lower()), None)
-        return element
+    def get_keyword_hits(results: list[BlockTypeDef] | BlockIndex) -> KeywordHits:
+        """
+        Ejecuta el motor de palabras clave una sola vez por documento y memoriza el resultado en el índice
+        :param results: Todos los bloques detectados por textract o su índice
+        :return:
+        """
+        block_index: BlockIndex = BlockIndex.ensure(results)
+        if block_index.keyword_hits is None:
+            block_index.keyword_hits = TextractUtils.KEYWORD_ENGINE.scan(block_index)
+        return block_index.keyword_hits
 
     @staticmethod
-    def _check_condition(top: float, left: float, width: float, r: BlockTypeDef) -> bool:
+    def get_letter_block(results: list[BlockTypeDef] | BlockIndex) -> BlockTypeDef | None:
+        # Encontramos la primera línea que contiene "carta n°"
+        block_index: BlockIndex = BlockIndex.ensure(results)
+        hit: KeywordHit | None = TextractUtils.get_keyword_hits(block_index).first("letter", block_type="LINE")
+        if hit is None:
+            return None
+        return block_index.get(hit.block_id)
+
+    @staticmethod
+    def _get_letter_position_mask(
+            letter_block: BlockTypeDef,
+            block_index: BlockIndex
+    ) -> np.ndarray | None:
         """
-        Revisa todos los bloques candidatos que se encuentren por encima del bounding box de la carta;
-        se descarta bloques de página y query ya qué son de carácter informativo
-        :param top: Coordenada superior del bounding box de la carta
-        :param left:Coordenada izquierda del bounding box de la carta
-        :param width: Ancho total del bounding box
-        :param r:Bloque que será auditado contra las coordenadas de bounding box de la carta
-        :return:
+        Calcula en una sola operación vectorizada qué líneas se encuentran por encima del bounding box de
+        la carta y empiezan antes de su borde derecho; como en el recorrido original, se consideran las
+        líneas de todas las páginas indexadas
+        :param letter_block: Bloque que contiene el bounding box de la carta
+        :param block_index: Índice de bloques del documento
+        :return: Máscara alineada con las líneas del índice o None si la carta no tiene bounding box
         """
-        if r["BlockType"] == "PAGE" or r["BlockType"] == "QUERY":
-            return False
-        if r["BlockType"] != "LINE":
-            return False
-        bounding_box = r["Geometry"]["BoundingBox"]
-        condition_1: bool = bounding_box["Top"] < top
-        condition_2: bool = bounding_box["Left"] < left + width
-        return condition_1 and condition_2
+        letter_bounding_box: BoundingBoxTypeDef | None = letter_block.get("Geometry", {}).get("BoundingBox", None)
+        if letter_bounding_box is None:
+            return None
+        return block_index.line_geometry.above_and_left_of(
+            letter_bounding_box["Top"],
+            letter_bounding_box["Left"],
+            letter_bounding_box["Width"]
+        )
 
     @staticmethod
     def _get_all_blocks_by_letter_position(
             letter_block: BlockTypeDef,
-            results: list[BlockTypeDef]
+            results: list[BlockTypeDef] | BlockIndex
     ) -> list[BlockTypeDef]:
-        letter_bounding_box: BoundingBoxTypeDef | None = letter_block.get("Geometry", {}).get("BoundingBox", None)
-        if letter_bounding_box is None:
+        block_index: BlockIndex = BlockIndex.ensure(results)
+        mask: np.ndarray | None = TextractUtils._get_letter_position_mask(letter_block, block_index)
+        if mask is None:
             return []
-        letter_bounding_box_top = letter_bounding_box["Top"]
-        letter_bounding_box_left = letter_bounding_box["Left"]
-        letter_bounding_box_width = letter_bounding_box["Width"]
-        rx: list[BlockTypeDef] = [r for r in results if
-                                  TextractUtils._check_condition(letter_bounding_box_top, letter_bounding_box_left,
-                                                                 letter_bounding_box_width, r) and r[
-                                      "BlockType"] != "PAGE"]
-        return rx
+        return block_index.line_geometry.select(mask)
 
     @staticmethod
-    def get_date_by_letter_position(letter_block: BlockTypeDef, results: list[BlockTypeDef]) -> BlockTypeDef | None:
+    def get_date_by_letter_position(
+            letter_block: BlockTypeDef,
+            results: list[BlockTypeDef] | BlockIndex
+    ) -> BlockTypeDef | None:
         """
         Determina la ubicación de la fecha en la carta basada en los candidatos que se encuentran
         en la parte superior a la palabra carat n.º; de los candidatos se selecciona el último, ya que el
         proceso OCR obtiene los resultados leyendo de arriba hacia abajo y de izquierda a derecha
         :param letter_block: Bloque que contiene el bounding box de la carta
-        :param results: Lista total de bloques existentes que serán evaluados
+        :param results: Lista total de bloques existentes que serán evaluados o su índice
         :return:
         """
-        letter_bounding_box: BoundingBoxTypeDef | None = letter_block.get("Geometry", {}).get("BoundingBox", None)
-        if letter_bounding_box is None:
+        block_index: BlockIndex = BlockIndex.ensure(results)
+        mask: np.ndarray | None = TextractUtils._get_letter_position_mask(letter_block, block_index)
+        if mask is None:
             return None
-        letter_bounding_box_top = letter_bounding_box["Top"]
-        letter_bounding_box_left = letter_bounding_box["Left"]
-        letter_bounding_box_width = letter_bounding_box["Width"]
-        all_blocks_candidate = TextractUtils._get_all_blocks_by_letter_position(letter_block, results)
-        # print(all_blocks_candidate[-1])
-        rx: BlockTypeDef | None = next((r for r in reversed(all_blocks_candidate) if
-                                        TextractUtils._check_condition(letter_bounding_box_top,
-                                                                       letter_bounding_box_left,
-                                                                       letter_bounding_box_width, r) and r[
-                                            "BlockType"] != "PAGE"),
-                                       None)
-        return rx
+        return block_index.line_geometry.last(mask)
 
     @staticmethod
-    def get_promotor_by_query_result(results: list[BlockTypeDef]) -> BlockTypeDef | None:
+    def get_promotor_by_query_result(results: list[BlockTypeDef] | BlockIndex) -> BlockTypeDef | None:
         """
         Busca la respuesta de la consulta sobre el promotor; textract si encuentra la respuesta retorna un tipo
         de bloque QUERY_RESULT; caso contrario no lo devuelve; siendo la única pregunta no es necesario el filtro
@@ -101,7 +115,7 @@ class TextractUtils:
         :param results:
         :return:
         """
-        promotor_block: BlockTypeDef | None = next((p for p in results if p["BlockType"] == "QUERY_RESULT"), None)
+        promotor_block: BlockTypeDef | None = next(iter(BlockIndex.ensure(results).of_type("QUERY_RESULT")), None)
         return promotor_block
 
     @staticmethod
@@ -111,10 +125,10 @@ class TextractUtils:
         return block.get("Text", None)
 
     @staticmethod
-    def get_query_response_block(alias: str, results: list[BlockTypeDef]) -> BlockTypeDef | None:
+    def get_query_response_block(alias: str, results: list[BlockTypeDef] | BlockIndex) -> BlockTypeDef | None:
+        block_index: BlockIndex = BlockIndex.ensure(results)
         # Obtenemos la query
-        query_blocks: BlockTypeDef | None = next(
-            (b for b in results if b["BlockType"] == "QUERY" and b["Query"]["Alias"] == alias), None)
+        query_blocks: BlockTypeDef | None = block_index.query(alias)
         if query_blocks is None:
             return None
         id_to_search_block: list[str] = next(
@@ -125,11 +139,11 @@ class TextractUtils:
             return None
         if len(id_to_search_block) == 0:
             return None
-        block_found: BlockTypeDef | None = next((b for b in results if b["Id"] == id_to_search_block[0]), None)
+        block_found: BlockTypeDef | None = block_index.get(id_to_search_block[0])
         return block_found
 
     @staticmethod
-    def _index_blocks_by_id(blocks: list[BlockTypeDef]) -> dict[str, BlockTypeDef]:
+    def _index_blocks_by_id(blocks: list[BlockTypeDef] | BlockIndex) -> dict[str, BlockTypeDef]:
         """
         Cread un diccionario que tiene la estructura:
         {
@@ -138,34 +152,10 @@ class TextractUtils:
         :param blocks: lista de bloques a transformar en diccionario por ID
         :return:
         """
+        if isinstance(blocks, BlockIndex):
+            return blocks.by_id
         return {b["Id"]: b for b in blocks}
 
-    @staticmethod
-    def _get_children_ids(
-            table_block: BlockTypeDef,
-            block_by_id: dict[str, BlockTypeDef],
-            types: tuple[str, ...]
-    ) -> list[str]:
-        """
-        Obtiene todos los ID asociados a una tabla (children)
-        :param table_block:El bloque de la tabla
-        :param types: Que tipos son requeridos
-        :param block_by_id: Todos los ids en formato de diccionario
-        :return:
-        """
-        ids: list[str] = []
-        # Obtenemos todas las relaciones que sean de tipo CHILD
-        child_relations: list[RelationshipTypeDef] = [
-            rel for rel in table_block.get("Relationships", []) or []
-            if rel.get("Type") == "CHILD"
-        ]
-        # Obtenemos todos los ids en bruto
-        ids.extend([rid for rel in child_relations for rid in rel.get("Ids", []) or []])
-        # Filtramos por los tipos deseados
-        # Por cada rid en ids obtenemos su valor en el diccionario general de ids y revisamos si el block type está
-        # dentro de los tipos deseados
-        return [rid for rid in ids if block_by_id.get(rid, {}).get("BlockType") in types]
-
     @staticmethod
     def _calculate_matrix_dimension(cell_blocks: list[BlockTypeDef]) -> tuple[int, int]:
         """
@@ -188,7 +178,7 @@ class TextractUtils:
     @staticmethod
     def _get_grid(
             cell_blocks: list[BlockTypeDef],
-            blocks_dict_by_id: dict[str, BlockTypeDef],
+            blocks_dict_by_id: dict[str, BlockTypeDef] | BlockIndex,
             broadcast_spans: bool = False
     ) -> list[list[str]]:
         """
@@ -224,40 +214,103 @@ class TextractUtils:
 
     @staticmethod
     def build_tables_from_textract_blocks(
-            blocks: list[BlockTypeDef],
+            blocks: list[BlockTypeDef] | BlockIndex,
             broadcast_spans: bool = False
     ) -> list[BuildTablesResult]:
         """
         Obtiene una lista de con todas las tablas reconocidas en textract; tal que el contenido se encuentra
         dentro del atributo grid
-        :param blocks: Todos los bloques detectados por textract
+        :param blocks: Todos los bloques detectados por textract o su índice
         :param broadcast_spans: Indica la estrategia en caso de celdas fusionadas
         :return: Una lista de objetos que contienen el atributo grid con el contenido de la tabla
         """
-        results: list[BuildTablesResult] = []
-        # Agrupamos los bloques por id en un diccionario
-        blocks_dict_by_id: dict[str, BlockTypeDef] = TextractUtils._index_blocks_by_id(blocks)
-        # Agrupamos todas las tablas existentes
-        tables: list[BlockTypeDef] = [b for b in blocks if b.get("BlockType") == "TABLE"]
+        # Agrupamos los bloques por id y por tipo
+        block_index: BlockIndex = BlockIndex.ensure(blocks)
         # Iniciamos la reconstrucción por cada tabla existente
-        for table in tables:
-            # Obtenemos la página a la cual pertenece la tabla
-            page: int = table.get("Page", 1)
-            # Obtenemos todos los ids de tipo CELDA asociados a la tabla
-            cell_ids: list[str] = TextractUtils._get_children_ids(table, block_by_id=blocks_dict_by_id, types=("CELL",))
-            # Obtenemos todos los bloques de las celdas
-            cell_blocks: list[BlockTypeDef] = [blocks_dict_by_id[cid] for cid in cell_ids if cid in blocks_dict_by_id]
-            # Calculamos la dimensión de la tabla (matrix)
-            # Inicializamos la matriz de contenido
-            # Estamos creando una tabla con solo None
-            grid: list[list[str]] = TextractUtils._get_grid(cell_blocks, blocks_dict_by_id, broadcast_spans)
-            aux = BuildTablesResult(
-                page=page,
-                table_block=table,
-                grid=grid
-            )
-            results.append(aux)
-        return results
+        return [
+            TextractUtils._build_table(table, block_index, broadcast_spans) for table in block_index.of_type("TABLE")
+        ]
+
+    @staticmethod
+    def _build_table(table: BlockTypeDef, block_index: BlockIndex, broadcast_spans: bool = False) -> BuildTablesResult:
+        """
+        Reconstruye el contenido de una sola tabla
+        :param table: Bloque de la tabla
+        :param block_index: Índice de bloques del documento
+        :param broadcast_spans: Indica la estrategia en caso de celdas fusionadas
+        :return:
+        """
+        # Obtenemos la página a la cual pertenece la tabla
+        page: int = table.get("Page", 1)
+        # Obtenemos todos los bloques de tipo CELDA asociados a la tabla
+        cell_blocks: list[BlockTypeDef] = block_index.children(table, types=("CELL",))
+        # Calculamos la dimensión de la tabla (matrix) e inicializamos la matriz de contenido
+        grid: list[list[str]] = TextractUtils._get_grid(cell_blocks, block_index, broadcast_spans)
+        return BuildTablesResult(
+            page=page,
+            table_block=table,
+            grid=grid
+        )
+
+    @staticmethod
+    def select_table(
+            blocks: list[BlockTypeDef] | BlockIndex,
+            page: int = 1,
+            keywords: list[str] | None = None,
+            broadcast_spans: bool = False
+    ) -> BuildTablesResult | None:
+        """
+        Selecciona la primera tabla de la página indicada que contiene alguna de las palabras clave; primero
+        se filtra por página, luego se recorren las tablas en orden deteniéndose en la primera coincidencia y
+        solo se reconstruye la grilla de la tabla elegida. Las coincidencias del motor de palabras clave
+        aceptan una tabla sin revisar sus celdas; las demás se evalúan con la regla por celda
+        :param blocks: Todos los bloques detectados por textract o su índice
+        :param page: Página donde se busca la tabla
+        :param keywords: Palabras clave que identifican la tabla
+        :param broadcast_spans: Indica la estrategia en caso de celdas fusionadas
+        :return: La tabla elegida o None si ninguna cumple
+        """
+        block_index: BlockIndex = BlockIndex.ensure(blocks)
+        tables: list[BlockTypeDef] = [t for t in block_index.on_page(page) if t.get("BlockType") == "TABLE"]
+        candidate_ids: set[str] = set()
+        if keywords is None:
+            # Las tablas candidatas salen de las coincidencias del motor de palabras clave
+            hits: list[KeywordHit] = TextractUtils.get_keyword_hits(block_index).of("table", page=page)
+            candidate_ids = {tid for h in hits for tid in TextractUtils._get_table_ids_of_hit(h, block_index)}
+            keywords = TextractUtils.TABLE_KEYWORDS
+        # Regla por celda: cubre palabras clave partidas en varias líneas dentro de una misma celda
+        table: BlockTypeDef | None = next(
+            (t for t in tables if t["Id"] in candidate_ids
+             or TextractCellsUtils.check_if_keyword_is_present(keywords, t, block_index)),
+            None
+        )
+        if table is None:
+            return None
+        return TextractUtils._build_table(table, block_index, broadcast_spans)
+
+    @staticmethod
+    def _get_table_ids_of_hit(hit: KeywordHit, block_index: BlockIndex) -> list[str]:
+        """
+        Obtiene las tablas que contienen el bloque de una coincidencia (LINE -> WORD -> CELL -> TABLE). Como
+        en la regla por celda, la coincidencia solo cuenta si todo el bloque está dentro de una misma celda
+        :param hit: Coincidencia del motor de palabras clave
+        :param block_index: Índice de bloques del documento
+        :return:
+        """
+        block: BlockTypeDef | None = block_index.get(hit.block_id)
+        if block is None:
+            return []
+        words: list[BlockTypeDef] = [block] if hit.block_type == "WORD" else block_index.children(block, ("WORD",))
+        cell_ids: set[str] = set()
+        for word in words:
+            word_cells: list[BlockTypeDef] = block_index.parents(word["Id"], ("CELL",))
+            if not word_cells:
+                # Parte de la línea está fuera de la tabla
+                return []
+            cell_ids.update(cell["Id"] for cell in word_cells)
+        if len(cell_ids) != 1:
+            return []
+        return [table["Id"] for table in block_index.parents(cell_ids.pop(), ("TABLE",))]
 
     @staticmethod
     def get_text_for_promotor_and_date(
@@ -280,11 +333,13 @@ class TextractUtils:
         return promotor_text, start_date_text
 
     @staticmethod
-    def filter_tables_keyword(tables: list[BuildTablesResult], blocks: list[BlockTypeDef]) -> list[BuildTablesResult]:
-        blocks_dict_by_id: dict[str, BlockTypeDef] = TextractUtils._index_blocks_by_id(blocks)
-        keywords: list[str] = ["ADENDA ACTUAL", "DESEMBOLSADOS"]
+    def filter_tables_keyword(
+            tables: list[BuildTablesResult],
+            blocks: list[BlockTypeDef] | BlockIndex
+    ) -> list[BuildTablesResult]:
+        block_index: BlockIndex = BlockIndex.ensure(blocks)
         return [t for t in tables if TextractCellsUtils.check_if_keyword_is_present(
-            keywords,
+            TextractUtils.TABLE_KEYWORDS,
             t.table_block,
-            blocks_dict_by_id)
+            block_index)
                 ]
@@ -1,7 +1,10 @@
+import argparse
 import asyncio
+import os
 import signal
 import sys
 from logging.config import dictConfig
+from typing import Any
 
 import uvicorn
 
@@ -20,39 +23,107 @@ def run_api() -> None:
     )
 
 
-async def run_worker() -> None:
+async def run_worker(metrics_queue: Any | None = None, worker_index: int = 0) -> None:
+    from infrastructure.bootstrap.container import get_application_container
+    from infrastructure.adapters.events.kafka_event_publisher import AioKafkaEventPublisher
+    from infrastructure.bootstrap.worker_supervisor import report_metrics
+    from infrastructure.config.app_settings import get_app_settings
+    from infrastructure.utils.kafka_utils.retry_policy import RetryPolicy
     from presentation.controllers.event_controllers.kafka_event_controller import KafkaEventController
-    max_conc = 8
-    controller = KafkaEventController(max_conc)
-    await controller.start()
+    worker_settings = get_app_settings().worker_settings
+    max_conc = worker_settings.concurrency
     stop_event = asyncio.Event()
     loop = asyncio.get_running_loop()
 
     # Señales (Unix). En Windows algunos signals no están disponibles: hacemos fallback.
+    # Se instalan antes de arrancar: una señal durante el arranque también cierra todo ordenadamente
     for sig in (signal.SIGINT, signal.SIGTERM):
         try:
             loop.add_signal_handler(sig, stop_event.set)
         except NotImplementedError:
             pass
 
+    container = get_application_container()
+    kafka_settings = get_app_settings().kafka_settings
+    publisher: AioKafkaEventPublisher | None = None
+    retry_policy: RetryPolicy | None = None
+    controllers: list[KafkaEventController] = []
+    metrics_task: asyncio.Task | None = None
     try:
+        await container.start()
+        if kafka_settings.retry_enabled:
+            publisher = AioKafkaEventPublisher()
+            await publisher.start()
+            retry_policy = RetryPolicy(kafka_settings.topic, kafka_settings.retry_delays_seconds,
+                                       kafka_settings.dlq_topic)
+        controllers.append(KafkaEventController(max_conc, workflow=container.workflow, retry_policy=retry_policy,
+                                                publisher=publisher))
+        # Un consumidor por nivel de reintento: las esperas nunca ocupan al consumidor principal
+        for retry_topic, delay_seconds in (retry_policy.retry_topics() if retry_policy is not None else []):
+            controllers.append(KafkaEventController(max_conc, workflow=container.workflow, topic=retry_topic,
+                                                    retry_delay_seconds=delay_seconds, retry_policy=retry_policy,
+                                                    publisher=publisher))
+        for controller in controllers:
+            if stop_event.is_set():
+                break
+            await controller.start()
+        # En modo multiproceso el supervisor suma las métricas de todos los workers
+        if metrics_queue is not None:
+            metrics_task = asyncio.create_task(
+                report_metrics(metrics_queue, worker_index, worker_settings.metrics_interval_seconds))
         await stop_event.wait()
     except KeyboardInterrupt:
         pass
     finally:
-        await controller.stop()
+        if metrics_task is not None:
+            metrics_task.cancel()
+        for controller in controllers:
+            await controller.stop()
+        if publisher is not None:
+            await publisher.close()
+        await container.stop()
+
+
+def run_worker_process(worker_index: int, metrics_queue: Any) -> None:
+    # Los handlers de señales del supervisor no aplican al worker; run_worker instala los suyos antes de
+    # arrancar el contenedor, hasta entonces una señal termina el proceso sin nada que cerrar
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    dictConfig(UVICORN_LOGGING)
+    asyncio.run(run_worker(metrics_queue, worker_index))
+
+
+def run_supervisor() -> int:
+    from infrastructure.bootstrap.worker_supervisor import WorkerSupervisor
+    from infrastructure.config.app_settings import get_app_settings
+    worker_settings = get_app_settings().worker_settings
+    supervisor = WorkerSupervisor(
+        processes=worker_settings.processes,
+        target=run_worker_process,
+        metrics_interval_seconds=worker_settings.metrics_interval_seconds,
+        metrics_path=worker_settings.metrics_path,
+    )
+    return supervisor.run()
 
 
 def main() -> None:
     dictConfig(UVICORN_LOGGING)
     load_environment()
-    mode = "kafka"
-    if len(sys.argv) > 1:
-        mode = sys.argv[1].lower()
+    parser = argparse.ArgumentParser(description="SBS ETL")
+    parser.add_argument("mode", nargs="?", default="kafka", help="api o worker")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Procesos consumidores del worker (por defecto WORKER_PROCESSES o 1)")
+    args = parser.parse_args()
+    mode = args.mode.lower()
+    if args.processes is not None:
+        # Se fija antes de leer la configuración: los procesos hijos la heredan (y reparten los límites)
+        os.environ["WORKER_PROCESSES"] = str(args.processes)
 
     if mode in ("api", "http", "server"):
         run_api()
     elif mode in ("worker", "event", "kafka"):
+        if int(os.getenv("WORKER_PROCESSES", "1")) > 1:
+            sys.exit(run_supervisor())
         asyncio.run(run_worker())
     else:
         sys.stderr.write(f"Modo desconocido: {mode}. Usa 'api' o 'worker'.\n")
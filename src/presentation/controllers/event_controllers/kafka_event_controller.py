@@ -1,21 +1,108 @@
 import asyncio
 import json
 import logging
+import time
+from dataclasses import dataclass
 from typing import Any
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, ConsumerRecord, TopicPartition
 from pydantic import ValidationError
+from application.use_cases.workflows.workflow_orchestrator import WorkflowOrchestrator
+from domain.enums.document_status import DocumentStatus
 from domain.models.states.document_contract_state import DocumentContractState
+from infrastructure.adapters.events.kafka_event_publisher import EventPublisher
 from infrastructure.bootstrap.container import build_workflow
 from infrastructure.config.app_settings import KafkaSettings, get_app_settings
+from infrastructure.utils.kafka_utils.micro_batcher import MicroBatcher
+from infrastructure.utils.kafka_utils.partition_offset_tracker import PartitionOffsetTracker
+from infrastructure.utils.kafka_utils.retry_policy import RetryPolicy
 from presentation.dtos.requests.process_document import ProcessDocumentRequest, ProcessDocument
 
+app_logger = logging.getLogger("app.environment")
+
+# Reintentos de la publicación de un fallo antes de volver a consumir el mensaje
+_PUBLISH_ATTEMPTS: int = 3
+_PUBLISH_BACKOFF_SECONDS: float = 0.5
+# Espera de una partición antes de volver a consumir un mensaje cuyo fallo no se pudo publicar
+_REDELIVERY_BACKOFF_SECONDS: float = 1
+_REDELIVERY_MAX_BACKOFF_SECONDS: float = 60
+
+
+@dataclass
+class _PendingDocument:
+    document: DocumentContractState
+    # Se resuelve con el resultado del documento apenas termina dentro de su lote
+    done: asyncio.Future[DocumentContractState]
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    """
+    Antes de perder una partición se confirma lo ya terminado; lo que sigue en curso lo volverá a
+    entregar el broker al nuevo dueño
+    """
+
+    def __init__(self, controller: "KafkaEventController"):
+        self._controller = controller
+
+    async def on_partitions_revoked(self, revoked: set[TopicPartition]) -> None:
+        await self._controller.commit()
+        self._controller.revoke(revoked)
+
+    async def on_partitions_assigned(self, assigned: set[TopicPartition]) -> None:
+        return None
+
 
 class KafkaEventController:
-    def __init__(self, max_concurrency: int = 8):
-        self._wf = build_workflow()
-        self._consumer: AIOKafkaConsumer | None = None
+    def __init__(
+            self,
+            max_concurrency: int = 8,
+            workflow: WorkflowOrchestrator | None = None,
+            topic: str | None = None,
+            retry_delay_seconds: float = 0,
+            retry_policy: RetryPolicy | None = None,
+            publisher: EventPublisher | None = None,
+            consumer: Any | None = None
+    ):
+        """
+        :param max_concurrency: Ejecuciones del orquestador en curso a la vez
+        :param workflow: Orquestador compartido del contenedor de la aplicación
+        :param topic: Tópico a consumir; por defecto el tópico principal
+        :param retry_delay_seconds: Espera desde la publicación de un mensaje hasta procesarlo (tópicos de reintento)
+        :param retry_policy: Enrutamiento de los fallos; None solo registra el error
+        :param publisher: Productor usado para publicar los fallos
+        :param consumer: Consumidor ya creado (por ejemplo el del broker en memoria); None crea uno de aiokafka
+        """
+        # El worker inyecta el workflow del contenedor de la aplicación; se construye uno solo si no existe
+        self._wf = workflow or build_workflow()
+        self._topic: str = topic or KafkaEventController._get_kafka_topic()
+        self._retry_delay_seconds: float = retry_delay_seconds
+        self._retry_policy: RetryPolicy | None = retry_policy if publisher is not None else None
+        self._publisher: EventPublisher | None = publisher
+        self._consumer: AIOKafkaConsumer | None = consumer
+        # Particiones detenidas hasta que vence la espera de su primer mensaje -> momento de reanudación
+        self._delayed: dict[TopicPartition, float] = {}
         self._stopping = asyncio.Event()
         self._sem = asyncio.Semaphore(max_concurrency)
+        # Commit manual: solo se confirman offsets cuyos mensajes (y todos los anteriores) terminaron
+        self.tracker = PartitionOffsetTracker()
+        self._commit_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        # Flujo continuo: se sigue leyendo mientras los mensajes en curso estén bajo el límite
+        k: KafkaSettings = get_app_settings().kafka_settings
+        self._max_in_flight: int = max(1, k.max_in_flight)
+        self._max_in_flight_per_partition: int = max(1, k.max_in_flight_per_partition)
+        self._in_flight: set[asyncio.Task] = set()
+        self._slot_freed = asyncio.Event()
+        # Mensajes cuyo fallo no se pudo publicar: la partición queda pausada hasta volver a consumirlos
+        self._redelivery: dict[TopicPartition, set[int]] = {}
+        # Offsets ya rebobinados que se procesan de nuevo sin volver a registrarlos en el tracker
+        self._redelivered: dict[TopicPartition, set[int]] = {}
+        self._redelivery_attempts: dict[TopicPartition, int] = {}
+        self._redelivery_tasks: set[asyncio.Task] = set()
+        self._message_finished = asyncio.Event()
+        # Los documentos de varios mensajes comparten una ejecución del orquestador (notify en lote)
+        self._batcher: MicroBatcher[_PendingDocument] = MicroBatcher(
+            self._run_batch, max_items=k.batch_max_documents, max_linger_ms=k.batch_max_linger_ms
+        )
 
     @staticmethod
     def _get_kafka_config() -> dict[str, Any]:
@@ -24,6 +111,7 @@ class KafkaEventController:
             "bootstrap_servers": k.bootstrap_servers,
             "group_id": k.group_id,
             "security_protocol": k.security_protocol,
+            "enable_auto_commit": False,
         }
         return cfg
 
@@ -33,69 +121,325 @@ class KafkaEventController:
         return k.topic
 
     @staticmethod
-    async def create_consumer() -> AIOKafkaConsumer:
+    async def create_consumer(listener: ConsumerRebalanceListener | None = None,
+                              topic: str | None = None) -> AIOKafkaConsumer:
         cfg = KafkaEventController._get_kafka_config()
-        topic = KafkaEventController._get_kafka_topic()
-        consumer = AIOKafkaConsumer(topic, **cfg)
+        topic = topic or KafkaEventController._get_kafka_topic()
+        consumer = AIOKafkaConsumer(**cfg)
+        consumer.subscribe(topics=[topic], listener=listener)
         await consumer.start()
         return consumer
 
     async def start(self) -> None:
-        self._consumer = await KafkaEventController.create_consumer()
-        asyncio.create_task(self._loop())
+        if self._consumer is None:
+            self._consumer = await KafkaEventController.create_consumer(_CommitOnRevoke(self), self._topic)
+        self._tasks = [asyncio.create_task(self._loop()), asyncio.create_task(self._commit_loop())]
 
     async def stop(self) -> None:
         self._stopping.set()
-        if self._consumer:
-            await self._consumer.stop()
+        # El loop termina los mensajes en curso, confirma sus offsets y detiene el consumidor
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def commit(self) -> None:
+        """
+        Confirma en el broker el offset contiguo más alto terminado de cada partición
+        """
+        if self._consumer is None:
+            return
+        async with self._commit_lock:
+            offsets: dict[TopicPartition, int] = self.tracker.pop_committable()
+            if not offsets:
+                return
+            try:
+                await self._consumer.commit(offsets)
+            except Exception as e:
+                app_logger.error(f"Error confirmando offsets de kafka: {str(e)}")
+                self.tracker.restore(offsets)
+
+    def revoke(self, partitions: set[TopicPartition]) -> None:
+        self.tracker.revoke(partitions)
+        for tp in partitions:
+            self._delayed.pop(tp, None)
+            self._redelivery.pop(tp, None)
+            self._redelivered.pop(tp, None)
+            self._redelivery_attempts.pop(tp, None)
+
+    async def _commit_loop(self) -> None:
+        interval: float = get_app_settings().kafka_settings.commit_interval_ms / 1000
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.commit()
 
     async def _loop(self) -> None:
+        """
+        Lee mensajes sin esperar a que terminen los anteriores. Cuando se alcanza el límite de mensajes en
+        curso se pausan las particiones en lugar de dejar de llamar a getmany: así el consumidor sigue
+        dentro de max_poll_interval_ms y el heartbeat del grupo se mantiene durante los jobs largos
+        """
         c = self._consumer
         try:
             while not self._stopping.is_set():
-                batches = await c.getmany(timeout_ms=1000, max_records=10)
-                tasks = []
-                for _tp, msgs in batches.items():
-                    document_requests: list[ProcessDocumentRequest] = []
+                self._apply_backpressure()
+                free_slots: int = self._max_in_flight - len(self._in_flight)
+                if free_slots <= 0:
+                    self._slot_freed.clear()
+                    try:
+                        await asyncio.wait_for(self._slot_freed.wait(), timeout=1)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                # Con particiones pausadas la espera es corta: al liberarse espacio se reanudan sin demora
+                timeout_ms: int = 100 if c.paused() else 1000
+                batches = await c.getmany(timeout_ms=timeout_ms, max_records=free_slots)
+                for tp, msgs in batches.items():
                     for m in msgs:
-                        text = m.value.decode("utf-8", errors="ignore")
-                        # Por negocio se decidió que solo debe procesarse un documento a la vez
-                        one_document_data = json.loads(text) if text else {}  # Esto representa un solo documento
-                        print(one_document_data)
-                        one_document: ProcessDocument = ProcessDocument.model_validate(one_document_data)
-                        process_document = ProcessDocumentRequest(documents=[one_document])
-                        document_requests.append(process_document)
-                    tasks.append(
-                        asyncio.create_task(
-                            self._handle(document_requests=document_requests)
-                        )
-                    )
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                        if self._delay_if_not_due(tp, m):
+                            # Los mensajes siguientes de la partición son posteriores: también esperan
+                            break
+                        if self.tracker.is_finished(tp, m.offset):
+                            # Ya terminó antes de rebobinar la partición por un mensaje anterior
+                            continue
+                        redelivered: set[int] = self._redelivered.get(tp, set())
+                        if m.offset in redelivered:
+                            # Sigue registrado en el tracker desde su primera entrega
+                            redelivered.discard(m.offset)
+                        elif self._running_in(tp) >= self._max_in_flight_per_partition:
+                            # El lote supera el límite de la partición: el resto se vuelve a leer al reanudarla
+                            c.seek(tp, m.offset)
+                            break
+                        else:
+                            self.tracker.track(tp, m.offset)
+                        task = asyncio.create_task(self._handle_message(tp, m))
+                        self._in_flight.add(task)
+                        task.add_done_callback(self._on_message_done)
         except Exception as e:
-            print(f"error: {str(e)}")
+            app_logger.error(f"Error en el consumidor de kafka: {str(e)}")
         finally:
+            for task in self._redelivery_tasks:
+                task.cancel()
+            # Los mensajes en curso terminan antes de confirmar y cerrar el consumidor
+            self._batcher.flush()
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
+            await self.commit()
             await c.stop()
 
-    async def _handle(self, document_requests: list[ProcessDocumentRequest]) -> None:
-        print("handler", document_requests)
+    def _delay_if_not_due(self, tp: TopicPartition, m: ConsumerRecord) -> bool:
+        """
+        En un tópico de reintento cada mensaje espera retry_delay_seconds desde su publicación. Si aún no
+        vence, la partición vuelve a ese offset y queda pausada hasta entonces; el consumidor sigue
+        atendiendo las demás particiones y nunca bloquea una ejecución esperando
+        :return: True si el mensaje todavía no debe procesarse
+        """
+        if self._retry_delay_seconds <= 0:
+            return False
+        wait_seconds: float = m.timestamp / 1000 + self._retry_delay_seconds - time.time()
+        if wait_seconds <= 0:
+            return False
+        loop = asyncio.get_running_loop()
+        self._consumer.seek(tp, m.offset)
+        self._consumer.pause(tp)
+        resume_at: float = loop.time() + wait_seconds
+        self._delayed[tp] = resume_at
+        loop.call_at(resume_at, self._on_delay_elapsed, tp, resume_at)
+        return True
+
+    def _on_delay_elapsed(self, tp: TopicPartition, resume_at: float) -> None:
+        if self._delayed.get(tp) != resume_at:
+            # La partición fue revocada o su espera se reprogramó
+            return
+        loop = asyncio.get_running_loop()
+        if resume_at > loop.time():
+            # El timer puede dispararse un poco antes: se vuelve a programar para no dejarla pausada
+            loop.call_at(resume_at, self._on_delay_elapsed, tp, resume_at)
+            return
+        self._delayed.pop(tp, None)
+        self._slot_freed.set()
+        self._apply_backpressure()
+
+    def _on_message_done(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._slot_freed.set()
+        self._message_finished.set()
+        self._apply_backpressure()
+
+    def _running_in(self, tp: TopicPartition) -> int:
+        """
+        Mensajes de la partición que están en proceso; no cuenta los que esperan volver a consumirse
+        """
+        waiting: int = len(self._redelivery.get(tp, ())) + len(self._redelivered.get(tp, ()))
+        return self.tracker.in_flight(tp) - waiting
+
+    def _apply_backpressure(self) -> None:
+        """
+        Pausa las particiones que llegaron a su límite (o todas si se llegó al límite global) y reanuda
+        las que volvieron a tener espacio
+        """
+        c = self._consumer
+        if c is None or self._stopping.is_set():
+            return
+        global_full: bool = len(self._in_flight) >= self._max_in_flight
+        paused: set[TopicPartition] = c.paused()
+        to_pause: list[TopicPartition] = []
+        to_resume: list[TopicPartition] = []
+        for tp in c.assignment():
+            full: bool = (global_full or tp in self._delayed or tp in self._redelivery
+                          or self._running_in(tp) >= self._max_in_flight_per_partition)
+            if full and tp not in paused:
+                to_pause.append(tp)
+            elif not full and tp in paused:
+                to_resume.append(tp)
+        if to_pause:
+            c.pause(*to_pause)
+        if to_resume:
+            c.resume(*to_resume)
+
+    async def _handle_message(self, tp: TopicPartition, m: ConsumerRecord) -> None:
+        try:
+            text = m.value.decode("utf-8", errors="ignore")
+            # Por negocio se decidió que solo debe procesarse un documento a la vez
+            one_document_data = json.loads(text) if text else {}  # Esto representa un solo documento
+            app_logger.debug(f"Mensaje recibido en {tp.topic}[{tp.partition}]@{m.offset}")
+            one_document: ProcessDocument = ProcessDocument.model_validate(one_document_data)
+        except (ValueError, ValidationError) as e:
+            # Un mensaje inválido no se puede reprocesar: va directo a mensajes muertos
+            app_logger.error(f"Mensaje inválido en {tp.topic}[{tp.partition}]@{m.offset}: {str(e)}")
+            routed: bool = await self._route_failure(m, "parse", str(e), dead_letter=True)
+        else:
+            routed = True
+            try:
+                results: list[DocumentContractState] = await self._handle(
+                    document_requests=[ProcessDocumentRequest(documents=[one_document])])
+            except Exception as e:
+                app_logger.error(f"Error procesando {tp.topic}[{tp.partition}]@{m.offset}: {str(e)}")
+                results = []
+                routed = await self._route_failure(m, "consumer", str(e))
+            for result in results:
+                if result.status == DocumentStatus.FAILED:
+                    routed = await self._route_failure(m, result.failure_stage, result.failure_reason) and routed
+        if routed:
+            self._redelivery_attempts.pop(tp, None)
+            self.tracker.finish(tp, m.offset)
+        else:
+            self._schedule_redelivery(tp, m.offset)
+
+    def _schedule_redelivery(self, tp: TopicPartition, offset: int) -> None:
+        """
+        El fallo no se pudo publicar: el offset queda sin confirmar y la partición se pausa. Tras una
+        espera creciente, y cuando terminan los demás mensajes en curso de la partición, se vuelve a
+        consumir desde ese offset
+        """
+        if self._stopping.is_set() or tp not in self._consumer.assignment():
+            # Sin commit de este offset el broker lo entregará al próximo dueño de la partición
+            return
+        app_logger.warning(f"Mensaje {tp.topic}[{tp.partition}]@{offset} se volverá a consumir")
+        failed: set[int] | None = self._redelivery.get(tp)
+        if failed is not None:
+            failed.add(offset)
+            return
+        self._redelivery[tp] = {offset}
+        self._apply_backpressure()
+        task = asyncio.create_task(self._redeliver(tp))
+        self._redelivery_tasks.add(task)
+        task.add_done_callback(self._redelivery_tasks.discard)
+
+    async def _redeliver(self, tp: TopicPartition) -> None:
+        attempt: int = self._redelivery_attempts.get(tp, 0)
+        self._redelivery_attempts[tp] = attempt + 1
+        await asyncio.sleep(min(_REDELIVERY_MAX_BACKOFF_SECONDS, _REDELIVERY_BACKOFF_SECONDS * 2 ** attempt))
+        # Los mensajes posteriores aún en curso terminan antes de rebobinar: así no se procesan dos veces
+        while tp in self._redelivery and self._running_in(tp) > 0:
+            self._message_finished.clear()
+            await self._message_finished.wait()
+        failed: set[int] | None = self._redelivery.pop(tp, None)
+        if failed is None or self._stopping.is_set():
+            return
+        self._redelivered.setdefault(tp, set()).update(failed)
+        self._consumer.seek(tp, min(failed))
+        self._apply_backpressure()
+
+    async def _route_failure(self, m: ConsumerRecord, stage: str | None, reason: str | None,
+                             dead_letter: bool = False) -> bool:
+        """
+        Publica el mensaje fallido en el siguiente tópico de reintento o en el de mensajes muertos
+        :param m: Mensaje original
+        :param stage: Etapa en la que falló
+        :param reason: Motivo del fallo
+        :param dead_letter: Envía directo a mensajes muertos (el mensaje no se puede reintentar)
+        :return: False si no se pudo publicar
+        """
+        if self._retry_policy is None:
+            app_logger.error(f"Documento fallido en {stage}: {reason}")
+            return True
+        attempt: int = RetryPolicy.attempt_of(m.headers)
+        topic: str = self._retry_policy.dlq_topic if dead_letter else self._retry_policy.destination(attempt)
+        headers: list[tuple[str, bytes]] = RetryPolicy.build_headers(attempt + 1, stage, reason,
+                                                                     self._retry_policy.topic)
+        for publish_attempt in range(_PUBLISH_ATTEMPTS):
+            try:
+                await self._publisher.publish(topic, m.value, key=m.key, headers=headers)
+                break
+            except Exception as e:
+                app_logger.error(f"Error publicando el mensaje fallido en {topic}: {str(e)}")
+                if publish_attempt == _PUBLISH_ATTEMPTS - 1:
+                    return False
+                await asyncio.sleep(_PUBLISH_BACKOFF_SECONDS * 2 ** publish_attempt)
+        app_logger.warning(f"Mensaje {m.topic}@{m.offset} enviado a {topic} (intento {attempt + 1}, etapa {stage})")
+        return True
+
+    async def _handle(self, document_requests: list[ProcessDocumentRequest]) -> list[DocumentContractState]:
+        """
+        Encola los documentos del mensaje en el lote en formación y espera sus resultados
+        :param document_requests: Documentos del mensaje
+        :return: Resultado de cada documento
+        """
+        loop = asyncio.get_running_loop()
+        pending: list[_PendingDocument] = []
+        for doc in document_requests:
+            for item in doc.documents:
+                document_contract_state = DocumentContractState(
+                    record_id=item.record_id,
+                    parent_id=item.parent_id,
+                    key=item.key,
+                    session_id=item.session_id,
+                    document_type=item.document_type,
+                    period_month=item.period_month,
+                    period_year=item.period_year,
+                    etag=item.etag,
+                )
+                pending.append(_PendingDocument(document=document_contract_state, done=loop.create_future()))
+        for p in pending:
+            self._batcher.add(p)
+        return list(await asyncio.gather(*[p.done for p in pending]))
+
+    async def _run_batch(self, batch: list[_PendingDocument]) -> None:
+        """
+        Ejecuta un lote de documentos en una sola corrida del orquestador. El orquestador aísla los
+        fallos por documento; cada mensaje recibe el resultado de su propio documento cuando termina la
+        corrida completa (incluida la notificación), así su offset no se confirma antes de notificar
+        :param batch: Documentos del lote
+        """
+        results: dict[tuple[str, str], DocumentContractState] = {}
+
+        async def _on_result(result: DocumentContractState) -> None:
+            results[(result.record_id, result.key)] = result
+
         async with self._sem:
             try:
-                documents_to_wf: list[DocumentContractState] = []
-                for doc in document_requests:
-                    for item in doc.documents:
-                        document_contract_state = DocumentContractState(
-                            record_id=item.record_id,
-                            parent_id=item.parent_id,
-                            key=item.key,
-                            session_id=item.session_id,
-                            document_type=item.document_type,
-                            period_month=item.period_month,
-                            period_year=item.period_year,
-                        )
-                        documents_to_wf.append(document_contract_state)
-                await self._wf.execute(documents=documents_to_wf)
-            except ValidationError as e:
-                print(f"Error de validación: {str(e)}")
+                await self._wf.execute(documents=[p.document for p in batch], on_result=_on_result)
             except Exception as e:
-                print(f"Error procesando mensaje kafka {str(e)}")
+                # Los documentos ya procesados no llegaron a notificarse: todo el lote se reintenta
+                app_logger.error(f"Error procesando un lote de {len(batch)} documentos de kafka: {str(e)}")
+                failed: dict[str, Any] = {
+                    "status": DocumentStatus.FAILED, "failure_stage": "notify", "failure_reason": str(e)}
+                for p in batch:
+                    if not p.done.done():
+                        p.done.set_result(p.document.model_copy(update=failed))
+                return
+        # Sin resultado: el documento fue descartado por duplicado
+        for p in batch:
+            if not p.done.done():
+                p.done.set_result(results.get((p.document.record_id, p.document.key), p.document))
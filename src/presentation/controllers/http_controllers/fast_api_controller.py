@@ -1,20 +1,37 @@
 import logging
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request
 from pydantic import ValidationError
 from application.use_cases.workflows.workflow_orchestrator import WorkflowOrchestrator
 from domain.models.states.document_contract_state import DocumentContractState
-from infrastructure.bootstrap.container import build_workflow
+from domain.models.states.etl_orchestrator_state import EtlOrchestratorState
+from infrastructure.bootstrap.container import ApplicationContainer, get_application_container
+from infrastructure.utils.metrics_utils.metrics_registry import get_metrics_registry
 from presentation.dtos.requests.process_document import (
     ProcessDocumentRequest,
 )
 
-app = FastAPI(title="SBS ETL API")
-
 app_logger = logging.getLogger("app.environment")
 
 
-def get_factory() -> WorkflowOrchestrator:
-    return build_workflow()
+@asynccontextmanager
+async def lifespan(fast_api_app: FastAPI):
+    # Adaptadores, clientes y grafos se construyen una sola vez al iniciar la API
+    container: ApplicationContainer = get_application_container()
+    await container.start()
+    fast_api_app.state.container = container
+    try:
+        yield
+    finally:
+        await container.stop()
+
+
+app = FastAPI(title="SBS ETL API", lifespan=lifespan)
+
+
+def get_factory(request: Request) -> WorkflowOrchestrator:
+    return request.app.state.container.workflow
 
 
 @app.post("/start-etl")
@@ -27,8 +44,9 @@ async def run_etl(
 
         for document in documents:
             app_logger.info(f"Ejecutando flow de: {document}")
-            await wf.execute(documents=documents)
-        return {"status": "success"}
+        # Una sola ejecución con todos los documentos; los ya procesados se descartan y se reportan
+        result: EtlOrchestratorState = await wf.execute(documents=documents)
+        return {"status": "success", "skipped": len(result.total_documents_skipped)}
     except ValidationError as e:
         return {"status": "error", "message": "Error de campos al validar el body del request"}
     except Exception as e:
@@ -40,7 +58,13 @@ async def run_etl_local(
         wf: WorkflowOrchestrator = Depends(get_factory),
 ):
     try:
-        await wf.execute([])
-        return {"status": "success"}
+        result: EtlOrchestratorState = await wf.execute([])
+        return {"status": "success", "skipped": len(result.total_documents_skipped)}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    # Incluye la profundidad de cola y el tiempo de espera de los límites de textract
+    return get_metrics_registry().snapshot()
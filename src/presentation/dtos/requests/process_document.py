@@ -11,6 +11,7 @@ class ProcessDocument(BaseModel):
     document_type: DocumentType = Field(..., alias="documentType")
     period_month: str = Field(..., alias="periodMonth")
     period_year: str = Field(..., alias="periodYear")
+    etag: str | None = Field(default=None, alias="etag")
 
 
 class ProcessDocumentRequest(BaseModel):
@@ -0,0 +1,140 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# El código se ejecuta desde src (mismo layout que main.py y los benchmarks)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# Variables mínimas para construir la configuración sin un entorno de AWS
+for name, value in {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "BUCKET_NAME": "bucket",
+    "SUPERVISED_ITEMS_TABLE": "table",
+    "NOTIFICATION_QUEUE_URL": "queue",
+    "AWS_KAFKA_BOOTSTRAP_SERVERS": "localhost:9092",
+    "AWS_KAFKA_TOPIC": "documents",
+    "AWS_KAFKA_GROUP_ID": "group",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    # Lotes y commits cortos para que las pruebas del consumidor no esperen
+    "AWS_KAFKA_BATCH_MAX_LINGER_MS": "10",
+    "AWS_KAFKA_COMMIT_INTERVAL_MS": "50",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Los módulos de la aplicación se importan después de preparar sys.path y el entorno
+from application.dto.financial_metadata_result import FinancialMetadataResult  # noqa: E402
+from application.dto.textract_pipeline_result import TextractPipelineResult  # noqa: E402
+from application.ports.extractor_document_port import ExtractorDocumentPort  # noqa: E402
+from application.ports.loader_metadata_port import LoaderMetadataPort  # noqa: E402
+from application.ports.notification_port import NotificationPort  # noqa: E402
+from application.ports.poller_document_port import PollerDocumentPort  # noqa: E402
+from application.ports.transform_document_port import TransformDocumentPort  # noqa: E402
+from domain.models.entities.bank_guarantee_item_entity import BankGuaranteeItemEntity  # noqa: E402
+from domain.models.notification import Notification  # noqa: E402
+from domain.models.states.document_contract_state import DocumentContractState  # noqa: E402
+
+
+class FakeExtractor(ExtractorDocumentPort):
+    """Extractor instantáneo; cuenta las llamadas y no extrae nada de los record_id en failures"""
+
+    def __init__(self):
+        self.calls: int = 0
+        self.failures: set[str] = set()
+
+    async def extract_pipeline(self, document_data: DocumentContractState) -> TextractPipelineResult | None:
+        self.calls += 1
+        if document_data.record_id in self.failures:
+            return None
+        return TextractPipelineResult(
+            date_text="Lima, 15 de marzo de 2024",
+            promotor_text="PROMOTOR S.A.C.",
+            letter_text="Carta N° 123-2024",
+            project_text="PROYECTO",
+            grid=[["ADENDA ACTUAL", "DESEMBOLSADOS"], ["1,000.00", "500.00"]],
+        )
+
+
+class FakeTransformer(TransformDocumentPort):
+    def get_financial_metadata(self, **kwargs) -> FinancialMetadataResult:
+        return FinancialMetadataResult(disbursed_amount=500.0, reduced_amount=0.0, total_amount=1000.0)
+
+
+class FakeLoader(LoaderMetadataPort):
+    """Loader en memoria; con fail=True simula una caída de dynamo"""
+
+    def __init__(self):
+        self.fail: bool = False
+        self.saved: list[BankGuaranteeItemEntity] = []
+
+    async def save_metadata(self, data: BankGuaranteeItemEntity) -> None:
+        if self.fail:
+            raise RuntimeError("dynamo no disponible")
+        self.saved.append(data)
+
+
+class FakeNotification(NotificationPort):
+    """Notificación en memoria; con fail=True simula una caída de sqs"""
+
+    def __init__(self):
+        self.fail: bool = False
+        self.sent: list[Notification] = []
+
+    async def notify(self, messages: list[Notification]) -> None:
+        if self.fail:
+            raise RuntimeError("sqs no disponible")
+        self.sent.extend(messages)
+
+
+class FakePoller(PollerDocumentPort):
+    """Poller sin bucket: el ETag de cada llave se define en etags"""
+
+    def __init__(self):
+        self.etags: dict[str, str] = {}
+        self.etag_calls: int = 0
+
+    async def get_file_names(self, bucket_name: str, prefix_path: str, document_type: str = "pdf",
+                             position: int | None = None) -> list[str]:
+        return []
+
+    async def get_etag(self, bucket_name: str, key: str) -> str | None:
+        self.etag_calls += 1
+        return self.etags.get(key)
+
+
+@pytest.fixture
+def extractor() -> FakeExtractor:
+    return FakeExtractor()
+
+
+@pytest.fixture
+def transformer() -> FakeTransformer:
+    return FakeTransformer()
+
+
+@pytest.fixture
+def loader() -> FakeLoader:
+    return FakeLoader()
+
+
+@pytest.fixture
+def notification() -> FakeNotification:
+    return FakeNotification()
+
+
+@pytest.fixture
+def poller() -> FakePoller:
+    return FakePoller()
+
+
+@pytest.fixture
+def documents():
+    def _documents(count: int) -> list[DocumentContractState]:
+        return [
+            DocumentContractState(record_id=str(i), parent_id="parent", key=f"cartas/{i}.pdf", session_id="session",
+                                  period_month="03", period_year="2024")
+            for i in range(count)
+        ]
+
+    return _documents
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from domain.models.entities.bank_guarantee_item_entity import BankGuaranteeItemEntity, BankGuaranteeMetadata
+from domain.models.notification import Notification, NotificationData
+from infrastructure.adapters.loaders.dynamo.aio_dynamo_loader_document import AioDynamoLoaderDocument
+from infrastructure.adapters.notificators.aio_sqs_notification import AioSqsNotification
+from infrastructure.adapters.poller.aio_s3_poller_document import AioS3PollerDocument
+
+
+class _FakePool:
+    """Pool de clientes aiobotocore falso: entrega el cliente registrado para cada servicio"""
+
+    def __init__(self, **clients):
+        self.clients = clients
+
+    async def get(self, service: str):
+        return self.clients[service]
+
+
+class _FakeSqs:
+    def __init__(self):
+        self.batches: list[list[dict]] = []
+        self.concurrent: int = 0
+        self.max_concurrent: int = 0
+
+    async def send_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(0.01)
+        self.concurrent -= 1
+        self.batches.append(Entries)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+
+class _FakePaginator:
+    def __init__(self, pages: list[dict]):
+        self.pages = pages
+
+    async def paginate(self, **kwargs):
+        for page in self.pages:
+            yield page
+
+
+class _FakeS3:
+    def __init__(self, pages: list[dict], etags: dict[str, str]):
+        self.pages = pages
+        self.etags = etags
+
+    def get_paginator(self, operation: str) -> _FakePaginator:
+        return _FakePaginator(self.pages)
+
+    async def head_object(self, Bucket: str, Key: str) -> dict:
+        if Key == "denied.pdf":
+            raise ClientError({"Error": {"Code": "403"}}, "HeadObject")
+        if Key not in self.etags:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ETag": self.etags[Key]}
+
+
+class _FakeDynamo:
+    def __init__(self, items: list[dict]):
+        self.items = items
+        self.updates: list[dict] = []
+
+    async def query(self, **kwargs) -> dict:
+        return {"Items": self.items}
+
+    async def update_item(self, **kwargs) -> dict:
+        self.updates.append(kwargs)
+        return {}
+
+
+def _notification(i: int) -> Notification:
+    return Notification(id=str(i), message=NotificationData(session_id="s", type="t", data={"i": i}))
+
+
+def test_sqs_notifications_are_sent_in_concurrent_batches_of_ten():
+    sqs = _FakeSqs()
+    notifier = AioSqsNotification(client_pool=_FakePool(sqs=sqs))
+
+    asyncio.run(notifier.notify([_notification(i) for i in range(25)]))
+    asyncio.run(notifier.notify([]))
+
+    assert sorted(len(batch) for batch in sqs.batches) == [5, 10, 10]
+    assert sqs.max_concurrent == 3
+
+
+def test_s3_poller_lists_every_page_and_resolves_etags():
+    s3 = _FakeS3(
+        pages=[{"Contents": [{"Key": "cartas/"}, {"Key": "cartas/1.pdf"}]},
+               {"Contents": [{"Key": "cartas/2.PDF"}, {"Key": "cartas/3.txt"}]},
+               {}],
+        etags={"cartas/1.pdf": '"abc"'},
+    )
+    poller = AioS3PollerDocument(client_pool=_FakePool(s3=s3))
+
+    assert asyncio.run(poller.get_file_names("bucket", "cartas/")) == ["cartas/1.pdf", "cartas/2.PDF"]
+    assert asyncio.run(poller.get_etag("bucket", "cartas/1.pdf")) == '"abc"'
+    assert asyncio.run(poller.get_etag("bucket", "cartas/9.pdf")) is None
+    with pytest.raises(ClientError):
+        asyncio.run(poller.get_etag("bucket", "denied.pdf"))
+
+
+def test_dynamo_loader_keeps_existing_metadata_with_low_level_types():
+    dynamo = _FakeDynamo(items=[{"id": {"S": "item-1"}, "metadata": {"M": {"total_amount": {"S": "900.00"}}}}])
+    loader = AioDynamoLoaderDocument(client_pool=_FakePool(dynamodb=dynamo))
+    entity = BankGuaranteeItemEntity(
+        id="new",
+        supervisory_record_id="record-1",
+        metadata=BankGuaranteeMetadata(total_amount="1000.00", disbursed_amount="500.00", file_name="1.pdf",
+                                       period_month="03", period_year="2024"),
+    )
+
+    asyncio.run(loader.save_metadata(entity))
+
+    update = dynamo.updates[0]
+    assert update["Key"] == {"id": {"S": "item-1"}}
+    metadata = update["ExpressionAttributeValues"][":metadata"]["M"]
+    # Los valores ya registrados en dynamo prevalecen, como en el loader de boto3
+    assert metadata["total_amount"] == {"S": "900.00"}
+    assert metadata["disbursed_amount"] == {"S": "500.00"}
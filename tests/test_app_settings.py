@@ -0,0 +1,10 @@
+import pytest
+
+from infrastructure.config.app_settings import AppSettings
+
+
+def test_malformed_numeric_variable_is_reported_as_invalid_configuration(monkeypatch):
+    monkeypatch.setenv("WORKER_PROCESSES", "dos")
+
+    with pytest.raises(RuntimeError, match="WORKER_PROCESSES|dos"):
+        AppSettings.load()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from infrastructure.bootstrap import container as container_module
+from infrastructure.bootstrap.container import ApplicationContainer
+
+
+class _FakeWorkflow:
+    def __init__(self):
+        self.closed: int = 0
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+@pytest.fixture
+def built(monkeypatch) -> list[_FakeWorkflow]:
+    workflows: list[_FakeWorkflow] = []
+
+    def build_workflow() -> _FakeWorkflow:
+        workflows.append(_FakeWorkflow())
+        return workflows[-1]
+
+    async def warm_up(self) -> None:
+        # Cede el loop: los arranques concurrentes se superponen como con clientes reales
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(container_module, "build_workflow", build_workflow)
+    monkeypatch.setattr(ApplicationContainer, "_warm_up", warm_up)
+    return workflows
+
+
+def test_start_is_idempotent_under_concurrent_calls(built):
+    container = ApplicationContainer()
+
+    async def scenario():
+        await asyncio.gather(container.start(), container.start(), container.start())
+        await container.start()
+
+    asyncio.run(scenario())
+
+    assert len(built) == 1
+    assert container.started and container.workflow is built[0]
+
+
+def test_stop_is_idempotent_and_the_container_can_start_again(built):
+    container = ApplicationContainer()
+
+    async def scenario():
+        # Detener un contenedor que nunca arrancó no hace nada
+        await container.stop()
+        await container.start()
+        await asyncio.gather(container.stop(), container.stop())
+        assert not container.started
+        await container.start()
+        await container.stop()
+
+    asyncio.run(scenario())
+
+    assert [workflow.closed for workflow in built] == [1, 1]
+
+
+def test_workflow_requires_a_started_container(built):
+    with pytest.raises(RuntimeError):
+        ApplicationContainer().workflow
@@ -0,0 +1,69 @@
+from infrastructure.utils.textract_utils.block_index import BlockIndex
+
+
+def _block(block_id: str, block_type: str, page: int = 1, children: tuple[str, ...] = (), **extra) -> dict:
+    block = {"Id": block_id, "BlockType": block_type, "Page": page, **extra}
+    if children:
+        block["Relationships"] = [{"Type": "CHILD", "Ids": list(children)}]
+    return block
+
+
+BLOCKS = [
+    _block("w1", "WORD", Text="CARTA"),
+    _block("w2", "WORD", Text="FIANZA"),
+    _block("l1", "LINE", children=("w1", "w2"), Text="CARTA FIANZA"),
+    _block("c1", "CELL", children=("w2",)),
+    _block("q1", "QUERY", Query={"Alias": "FECHA"}),
+    _block("q2", "QUERY", Query={"Alias": "FECHA"}),
+    _block("l2", "LINE", page=2, Text="PAGINA 2"),
+]
+
+
+def test_lookups_by_id_type_page_and_alias():
+    index = BlockIndex(BLOCKS)
+
+    assert index.get("l1")["Text"] == "CARTA FIANZA"
+    assert index.get("missing") is None
+    assert [b["Id"] for b in index.of_type("LINE")] == ["l1", "l2"]
+    assert index.of_type("TABLE") == []
+    assert [b["Id"] for b in index.on_page(2)] == ["l2"]
+    # Con alias repetidos se conserva el primero, como la búsqueda lineal original
+    assert index.query("FECHA")["Id"] == "q1"
+
+
+def test_children_and_parents_follow_child_relationships():
+    index = BlockIndex(BLOCKS)
+
+    assert [b["Id"] for b in index.children(index.get("l1"))] == ["w1", "w2"]
+    # Una palabra pertenece a la vez a su línea y a su celda
+    assert [b["Id"] for b in index.parents("w2")] == ["l1", "c1"]
+    assert [b["Id"] for b in index.parents("w2", types=("CELL",))] == ["c1"]
+
+
+def test_blocks_can_arrive_incrementally_and_page_completion_is_tracked():
+    index = BlockIndex(BLOCKS[:4])
+    assert not index.is_page_complete(1)
+    geometry = index.line_geometry
+    index.cell_text_cache["c1"] = "FIANZA"
+
+    index.add_blocks(BLOCKS[4:])
+
+    assert index.is_page_complete(1) and not index.is_page_complete(2)
+    # Los derivados se invalidan al agregar bloques
+    assert index.line_geometry is not geometry
+    assert len(index.line_geometry.lines) == 2
+    assert index.cell_text_cache == {}
+
+
+def test_blocks_after_max_page_are_ignored_but_still_mark_pages_complete():
+    index = BlockIndex(BLOCKS, max_page=1)
+
+    assert index.on_page(2) == [] and index.get("l2") is None
+    assert index.is_page_complete(1)
+
+
+def test_ensure_reuses_an_existing_index():
+    index = BlockIndex(BLOCKS)
+
+    assert BlockIndex.ensure(index) is index
+    assert BlockIndex.ensure(BLOCKS).get("w1")["Text"] == "CARTA"
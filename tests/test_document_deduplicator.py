@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from application.services.document_deduplicator import DocumentDeduplicator
+from domain.enums.document_status import DocumentStatus
+from infrastructure.adapters.processed_documents.sqlite.sqlite_processed_document_store import (
+    SqliteProcessedDocumentStore,
+)
+
+
+def _deduplicator(tmp_path, poller, ttl_seconds: float | None = None) -> DocumentDeduplicator:
+    store = SqliteProcessedDocumentStore(str(tmp_path / "processed.db"), ttl_seconds=ttl_seconds)
+    return DocumentDeduplicator(store, poller, "bucket", ttl_seconds=ttl_seconds)
+
+
+def _processed(doc):
+    return doc.model_copy(update={"status": DocumentStatus.PROCESSED})
+
+
+def test_store_persists_and_expires_records(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "processed.db")
+        store = SqliteProcessedDocumentStore(path)
+        await store.add("1:etag", 100.0)
+        await store.add("1:etag", 200.0)
+        await store.close()
+
+        reopened = SqliteProcessedDocumentStore(path)
+        assert await reopened.get_processed_at("1:etag") == 200.0
+        assert await reopened.get_processed_at("2:etag") is None
+        await reopened.close()
+
+        # Con vigencia, el registro viejo se depura al abrir el archivo
+        expiring = SqliteProcessedDocumentStore(path, ttl_seconds=60)
+        assert await expiring.get_processed_at("1:etag") is None
+        await expiring.close()
+
+    asyncio.run(scenario())
+
+
+def test_processed_documents_are_skipped_after_a_restart(tmp_path, poller, documents):
+    docs = documents(2)
+    poller.etags = {doc.key: f'"etag-{doc.record_id}"' for doc in docs}
+
+    async def scenario():
+        dedup = _deduplicator(tmp_path, poller)
+        new, skipped = await dedup.filter_new(docs)
+        assert [doc.record_id for doc in new] == ["0", "1"] and skipped == []
+        await dedup.complete(_processed(new[0]))
+        # Un documento fallido no queda registrado: se vuelve a procesar
+        await dedup.complete(new[1].model_copy(update={"status": DocumentStatus.FAILED}))
+        await dedup.close()
+
+        restarted = _deduplicator(tmp_path, poller)
+        new, skipped = await restarted.filter_new(docs)
+        await restarted.close()
+        return new, skipped
+
+    new, skipped = asyncio.run(scenario())
+
+    assert [doc.record_id for doc in new] == ["1"]
+    assert [doc.record_id for doc in skipped] == ["0"]
+
+
+def test_changed_etag_is_processed_again(tmp_path, poller, documents):
+    doc = documents(1)[0]
+
+    async def scenario():
+        dedup = _deduplicator(tmp_path, poller)
+        poller.etags = {doc.key: '"v1"'}
+        new, _ = await dedup.filter_new([doc])
+        await dedup.complete(_processed(new[0]))
+
+        poller.etags = {doc.key: '"v2"'}
+        new, skipped = await dedup.filter_new([doc])
+        await dedup.close()
+        return new, skipped
+
+    new, skipped = asyncio.run(scenario())
+
+    assert [d.etag for d in new] == ['"v2"'] and skipped == []
+
+
+def test_in_flight_documents_are_skipped_until_released(tmp_path, poller, documents):
+    doc = documents(1)[0]
+    poller.etags = {doc.key: '"etag"'}
+
+    async def scenario():
+        dedup = _deduplicator(tmp_path, poller)
+        first, _ = await dedup.filter_new([doc])
+        # Una entrega repetida mientras el primero sigue en curso se descarta
+        _, skipped = await dedup.filter_new([doc])
+        assert len(skipped) == 1
+
+        dedup.release(first)
+        new, skipped = await dedup.filter_new([doc])
+        await dedup.close()
+        return new, skipped
+
+    new, skipped = asyncio.run(scenario())
+
+    assert len(new) == 1 and skipped == []
+
+
+def test_expired_documents_are_processed_again(tmp_path, poller, documents):
+    doc = documents(1)[0].model_copy(update={"etag": '"etag"'})
+
+    async def scenario():
+        dedup = _deduplicator(tmp_path, poller, ttl_seconds=60)
+        await dedup.filter_new([doc])
+        await dedup.complete(_processed(doc))
+        # Se envejecen el LRU en memoria y el registro persistente
+        key = DocumentDeduplicator.build_key(doc)
+        dedup._memory[key] = time.time() - 120
+        await dedup._store.add(key, time.time() - 120)
+
+        new, _ = await dedup.filter_new([doc])
+        await dedup.close()
+        return new
+
+    assert len(asyncio.run(scenario())) == 1
+    # El ETag ya venía en el documento: no se consultó el bucket
+    assert poller.etag_calls == 0
+
+
+def test_documents_without_etag_are_always_processed(tmp_path, poller, documents):
+    doc = documents(1)[0]
+
+    async def scenario():
+        dedup = _deduplicator(tmp_path, poller)
+        new, _ = await dedup.filter_new([doc])
+        await dedup.complete(_processed(new[0]))
+        new, skipped = await dedup.filter_new([doc])
+        await dedup.close()
+        return new, skipped
+
+    new, skipped = asyncio.run(scenario())
+
+    assert len(new) == 1 and skipped == []
@@ -0,0 +1,245 @@
+import asyncio
+import json
+from typing import Awaitable, Callable
+
+from aiokafka import TopicPartition
+
+from application.use_cases.workflows.workflow_orchestrator import WorkflowOrchestrator
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+from infrastructure.adapters.events.in_memory_kafka_broker import InMemoryKafkaBroker
+from infrastructure.utils.kafka_utils.retry_policy import RetryPolicy
+from presentation.controllers.event_controllers import kafka_event_controller
+from presentation.controllers.event_controllers.kafka_event_controller import KafkaEventController
+
+TOPIC = "documents"
+TP = TopicPartition(TOPIC, 0)
+
+
+class _Workflow:
+    """Orquestador falso: cada documento tarda lo indicado y falla si su record_id está en failures"""
+
+    def __init__(self, delays: dict[str, float] | None = None, failures: set[str] | None = None):
+        self.delays: dict[str, float] = delays or {}
+        self.failures: set[str] = failures or set()
+        self.processed: list[str] = []
+        self.running: int = 0
+        self.max_running: int = 0
+
+    async def execute(self, documents: list[DocumentContractState],
+                      on_result: Callable[[DocumentContractState], Awaitable[None]] | None = None) -> None:
+        async def _one(doc: DocumentContractState) -> None:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(self.delays.get(doc.record_id, 0))
+            self.running -= 1
+            self.processed.append(doc.record_id)
+            if doc.record_id in self.failures:
+                result = doc.model_copy(update={
+                    "status": DocumentStatus.FAILED, "failure_stage": "extract", "failure_reason": "sin datos"})
+            else:
+                result = doc.model_copy(update={"status": DocumentStatus.PROCESSED})
+            if on_result is not None:
+                await on_result(result)
+
+        await asyncio.gather(*[_one(doc) for doc in documents])
+
+
+def _message(record_id: str) -> bytes:
+    return json.dumps({
+        "recordId": record_id, "parentId": "p", "key": f"{record_id}.pdf", "sessionId": "s",
+        "documentType": "BANK_GUARANTEE", "periodMonth": "03", "periodYear": "2024",
+    }).encode("utf-8")
+
+
+async def _wait_until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    async def _poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_poll(), timeout=timeout)
+
+
+def test_slow_message_does_not_block_the_next_ones():
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        workflow = _Workflow(delays={"0": 0.3})
+        controller = KafkaEventController(workflow=workflow, topic=TOPIC, consumer=broker.consumer(TOPIC))
+        await controller.start()
+        for record_id in ("0", "1", "2", "3"):
+            await broker.publish(TOPIC, _message(record_id))
+
+        await _wait_until(lambda: {"1", "2", "3"} <= set(workflow.processed))
+        await controller.commit()
+        # Los posteriores terminaron, pero el offset 0 sigue en curso: no se confirma nada
+        assert "0" not in workflow.processed
+        assert broker.committed.get(TP, 0) == 0
+
+        await _wait_until(lambda: "0" in workflow.processed)
+        await controller.stop()
+        assert broker.committed[TP] == 4
+
+    asyncio.run(scenario())
+
+
+def test_partition_is_paused_at_its_in_flight_limit():
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        workflow = _Workflow(delays={str(i): 0.05 for i in range(6)})
+        controller = KafkaEventController(workflow=workflow, topic=TOPIC, consumer=broker.consumer(TOPIC))
+        controller._max_in_flight_per_partition = 2
+        await controller.start()
+        for i in range(6):
+            await broker.publish(TOPIC, _message(str(i)))
+
+        await _wait_until(lambda: len(workflow.processed) == 6)
+        await controller.stop()
+        assert workflow.max_running <= 2
+        assert broker.committed[TP] == 6
+
+    asyncio.run(scenario())
+
+
+class _FlakyPublisher:
+    """Publicador que falla las primeras publicaciones antes de delegar en el broker"""
+
+    def __init__(self, broker: InMemoryKafkaBroker, failures: int):
+        self._broker = broker
+        self.failures: int = failures
+
+    async def publish(self, topic: str, value: bytes, key: bytes | None = None,
+                      headers: list[tuple[str, bytes]] | None = None) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("broker no disponible")
+        await self._broker.publish(topic, value, key=key, headers=headers)
+
+
+def _headers(record) -> dict[str, str]:
+    return {name: value.decode("utf-8") for name, value in record.headers}
+
+
+def test_failures_go_through_the_retry_topics_to_the_dead_letter_topic():
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        workflow = _Workflow(failures={"1"})
+        policy = RetryPolicy(TOPIC, [0.05, 0.05])
+        controllers = [KafkaEventController(workflow=workflow, topic=TOPIC, retry_policy=policy,
+                                            publisher=broker, consumer=broker.consumer(TOPIC))]
+        for topic, delay in policy.retry_topics():
+            controllers.append(KafkaEventController(workflow=workflow, topic=topic, retry_delay_seconds=delay,
+                                                    retry_policy=policy, publisher=broker,
+                                                    consumer=broker.consumer(topic)))
+        for controller in controllers:
+            await controller.start()
+        for record_id in ("0", "1"):
+            await broker.publish(TOPIC, _message(record_id))
+        await broker.publish(TOPIC, b"{not json")
+
+        await _wait_until(lambda: len(broker.topics.get(policy.dlq_topic, [])) == 2)
+        for controller in controllers:
+            await controller.stop()
+
+        assert workflow.processed.count("1") == 3
+        assert [_headers(r)[RetryPolicy.ATTEMPT_HEADER] for r in broker.topics[f"{TOPIC}.retry.1"]] == ["1"]
+        assert [_headers(r)[RetryPolicy.ATTEMPT_HEADER] for r in broker.topics[f"{TOPIC}.retry.2"]] == ["2"]
+        parse_failure, extract_failure = (_headers(r) for r in broker.topics[policy.dlq_topic])
+        # El mensaje inválido no se reintenta
+        assert parse_failure[RetryPolicy.STAGE_HEADER] == "parse"
+        assert extract_failure[RetryPolicy.STAGE_HEADER] == "extract"
+        assert extract_failure[RetryPolicy.ATTEMPT_HEADER] == "3"
+        assert extract_failure[RetryPolicy.ORIGINAL_TOPIC_HEADER] == TOPIC
+        assert broker.committed[TP] == 3
+        assert broker.committed[TopicPartition(f"{TOPIC}.retry.1", 0)] == 1
+        assert broker.committed[TopicPartition(f"{TOPIC}.retry.2", 0)] == 1
+
+    asyncio.run(scenario())
+
+
+def test_message_is_consumed_again_when_its_failure_cannot_be_published(monkeypatch):
+    monkeypatch.setattr(kafka_event_controller, "_PUBLISH_BACKOFF_SECONDS", 0.001)
+    monkeypatch.setattr(kafka_event_controller, "_REDELIVERY_BACKOFF_SECONDS", 0.05)
+
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        workflow = _Workflow(failures={"1"})
+        # Se agotan los reintentos de la primera publicación y falla uno más de la segunda
+        publisher = _FlakyPublisher(broker, failures=kafka_event_controller._PUBLISH_ATTEMPTS + 1)
+        controller = KafkaEventController(workflow=workflow, topic=TOPIC, retry_policy=RetryPolicy(TOPIC, [30]),
+                                          publisher=publisher, consumer=broker.consumer(TOPIC))
+        await controller.start()
+        for record_id in ("0", "1", "2"):
+            await broker.publish(TOPIC, _message(record_id))
+
+        await _wait_until(lambda: bool(broker.topics.get(f"{TOPIC}.retry.1")) and controller.tracker.in_flight() == 0)
+        await controller.stop()
+
+        # Solo el mensaje fallido se procesa de nuevo; los demás de la partición no se repiten
+        assert sorted(workflow.processed) == ["0", "1", "1", "2"]
+        assert len(broker.topics[f"{TOPIC}.retry.1"]) == 1
+        assert broker.committed[TP] == 3
+
+    asyncio.run(scenario())
+
+
+def test_delay_timer_that_fires_early_is_rearmed():
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        controller = KafkaEventController(workflow=_Workflow(), topic=TOPIC, retry_delay_seconds=1,
+                                          consumer=broker.consumer(TOPIC))
+        controller._consumer.pause(TP)
+        resume_at = asyncio.get_running_loop().time() + 0.05
+        controller._delayed[TP] = resume_at
+
+        controller._on_delay_elapsed(TP, resume_at)
+        assert TP in controller._consumer.paused()
+
+        await asyncio.sleep(0.1)
+        assert TP not in controller._delayed
+        assert TP not in controller._consumer.paused()
+
+    asyncio.run(scenario())
+
+
+def test_notify_failure_is_routed_to_the_retry_topic(extractor, poller, transformer, loader, notification):
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        notification.fail = True
+        workflow = WorkflowOrchestrator(extractor, poller, transformer, loader, notification)
+        controller = KafkaEventController(workflow=workflow, topic=TOPIC, retry_policy=RetryPolicy(TOPIC, [30]),
+                                          publisher=broker, consumer=broker.consumer(TOPIC))
+        await controller.start()
+        await broker.publish(TOPIC, _message("0"))
+
+        await _wait_until(lambda: bool(broker.topics.get(f"{TOPIC}.retry.1")))
+        await controller.stop()
+
+        headers = _headers(broker.topics[f"{TOPIC}.retry.1"][0])
+        assert headers[RetryPolicy.STAGE_HEADER] == "notify"
+        assert headers[RetryPolicy.REASON_HEADER] == "sqs no disponible"
+        assert broker.committed[TP] == 1
+
+    asyncio.run(scenario())
+
+
+def test_redelivery_backs_off_while_the_publisher_is_down(monkeypatch):
+    monkeypatch.setattr(kafka_event_controller, "_PUBLISH_BACKOFF_SECONDS", 0.001)
+    monkeypatch.setattr(kafka_event_controller, "_REDELIVERY_BACKOFF_SECONDS", 0.2)
+
+    async def scenario() -> None:
+        broker = InMemoryKafkaBroker()
+        workflow = _Workflow(failures={"0"})
+        controller = KafkaEventController(workflow=workflow, topic=TOPIC, retry_policy=RetryPolicy(TOPIC, [30]),
+                                          publisher=_FlakyPublisher(broker, failures=10_000),
+                                          consumer=broker.consumer(TOPIC))
+        await controller.start()
+        await broker.publish(TOPIC, _message("0"))
+        await _wait_until(lambda: "0" in workflow.processed)
+
+        await asyncio.sleep(0.5)
+        # Esperas de 0.2 s y 0.4 s: el documento no se vuelve a procesar en un ciclo continuo
+        assert workflow.processed.count("0") <= 3
+        await controller.stop()
+        assert broker.committed.get(TP, 0) == 0
+
+    asyncio.run(scenario())
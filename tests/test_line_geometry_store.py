@@ -0,0 +1,48 @@
+import numpy as np
+
+from infrastructure.utils.textract_utils.line_geometry_store import LineGeometryStore
+
+
+def _line(line_id: str, top: float | None = None, left: float | None = None, width: float = 0.2) -> dict:
+    line = {"Id": line_id, "BlockType": "LINE"}
+    if top is not None:
+        line["Geometry"] = {"BoundingBox": {"Top": top, "Left": left, "Width": width, "Height": 0.01}}
+    return line
+
+
+LINES = [
+    _line("header", top=0.05, left=0.1),
+    _line("date", top=0.10, left=0.6),
+    _line("no_box"),
+    _line("right", top=0.12, left=0.9),
+    _line("body", top=0.50, left=0.1),
+]
+
+
+def test_above_and_left_of_matches_the_per_line_predicate():
+    store = LineGeometryStore(LINES)
+    top, left, width = 0.3, 0.5, 0.3
+
+    mask = store.above_and_left_of(top, left, width)
+
+    expected = [
+        line["Id"] for line in LINES
+        if "Geometry" in line
+        and line["Geometry"]["BoundingBox"]["Top"] < top
+        and line["Geometry"]["BoundingBox"]["Left"] < left + width
+    ]
+    assert [line["Id"] for line in store.select(mask)] == expected == ["header", "date"]
+
+
+def test_last_follows_reading_order():
+    store = LineGeometryStore(LINES)
+
+    assert store.last(store.above_and_left_of(0.3, 0.5, 0.3))["Id"] == "date"
+    assert store.last(np.zeros(len(LINES), dtype=bool)) is None
+
+
+def test_lines_without_bounding_box_never_match():
+    store = LineGeometryStore([_line("no_box")])
+
+    assert store.select(store.above_and_left_of(1.0, 1.0, 1.0)) == []
+    assert LineGeometryStore([]).last(np.zeros(0, dtype=bool)) is None
@@ -0,0 +1,65 @@
+import asyncio
+
+from infrastructure.utils.kafka_utils.micro_batcher import MicroBatcher
+
+
+def _collect(items: list[int], max_items: int, max_linger_ms: int, wait_seconds: float) -> list[list[int]]:
+    async def scenario() -> list[list[int]]:
+        batches: list[list[int]] = []
+
+        async def flush(batch: list[int]) -> None:
+            batches.append(batch)
+
+        batcher: MicroBatcher[int] = MicroBatcher(flush, max_items=max_items, max_linger_ms=max_linger_ms)
+        for item in items:
+            batcher.add(item)
+        await asyncio.sleep(wait_seconds)
+        result = list(batches)
+        await batcher.close()
+        return result
+
+    return asyncio.run(scenario())
+
+
+def test_batch_closes_when_it_reaches_max_items():
+    # La espera es mucho menor que el linger: solo se entregan los lotes llenos
+    assert _collect([1, 2, 3, 4, 5], max_items=2, max_linger_ms=10_000, wait_seconds=0.01) == [[1, 2], [3, 4]]
+
+
+def test_batch_closes_when_the_linger_expires():
+    assert _collect([1, 2, 3], max_items=10, max_linger_ms=20, wait_seconds=0.2) == [[1, 2, 3]]
+
+
+def test_close_delivers_the_pending_batch():
+    async def scenario() -> list[list[int]]:
+        batches: list[list[int]] = []
+
+        async def flush(batch: list[int]) -> None:
+            await asyncio.sleep(0.01)
+            batches.append(batch)
+
+        batcher: MicroBatcher[int] = MicroBatcher(flush, max_items=10, max_linger_ms=10_000)
+        batcher.add(1)
+        batcher.add(2)
+        await batcher.close()
+        return batches
+
+    assert asyncio.run(scenario()) == [[1, 2]]
+
+
+def test_a_failing_batch_does_not_stop_the_next_ones():
+    async def scenario() -> list[list[int]]:
+        batches: list[list[int]] = []
+
+        async def flush(batch: list[int]) -> None:
+            if batch == [1]:
+                raise RuntimeError("boom")
+            batches.append(batch)
+
+        batcher: MicroBatcher[int] = MicroBatcher(flush, max_items=1, max_linger_ms=10_000)
+        batcher.add(1)
+        batcher.add(2)
+        await batcher.close()
+        return batches
+
+    assert asyncio.run(scenario()) == [[2]]
@@ -0,0 +1,91 @@
+from aiokafka import TopicPartition
+
+from infrastructure.utils.kafka_utils.partition_offset_tracker import PartitionOffsetTracker
+
+TP = TopicPartition("documents", 0)
+OTHER_TP = TopicPartition("documents", 1)
+
+
+def _tracker(*offsets: int, tp: TopicPartition = TP) -> PartitionOffsetTracker:
+    tracker = PartitionOffsetTracker()
+    for offset in offsets:
+        tracker.track(tp, offset)
+    return tracker
+
+
+def test_commits_only_the_contiguous_finished_prefix():
+    tracker = _tracker(10, 11, 12)
+
+    tracker.finish(TP, 11)
+    assert tracker.pop_committable() == {}
+
+    tracker.finish(TP, 10)
+    assert tracker.pop_committable() == {TP: 12}
+
+    tracker.finish(TP, 12)
+    assert tracker.pop_committable() == {TP: 13}
+    assert tracker.in_flight() == 0
+
+
+def test_partitions_advance_independently():
+    tracker = _tracker(0, 1)
+    tracker.track(OTHER_TP, 5)
+
+    tracker.finish(OTHER_TP, 5)
+    tracker.finish(TP, 1)
+
+    assert tracker.pop_committable() == {OTHER_TP: 6}
+    assert tracker.in_flight(TP) == 1
+
+
+def test_restore_keeps_offsets_of_a_failed_commit():
+    tracker = _tracker(0, 1)
+    tracker.finish(TP, 0)
+    offsets = tracker.pop_committable()
+
+    tracker.restore(offsets)
+
+    assert tracker.pop_committable() == {TP: 1}
+
+
+def test_restore_does_not_move_the_position_back():
+    tracker = _tracker(0, 1)
+    tracker.finish(TP, 0)
+    stale = tracker.pop_committable()
+    tracker.finish(TP, 1)
+
+    tracker.restore(stale)
+
+    assert tracker.pop_committable() == {TP: 2}
+
+
+def test_revoked_partition_is_forgotten():
+    tracker = _tracker(0, 1)
+    tracker.finish(TP, 0)
+
+    tracker.revoke({TP})
+    tracker.finish(TP, 1)
+
+    assert tracker.pop_committable() == {}
+    assert tracker.in_flight() == 0
+
+
+def test_finished_offsets_waiting_for_an_earlier_one_are_reported():
+    tracker = _tracker(0, 1, 2)
+
+    tracker.finish(TP, 1)
+
+    assert tracker.is_finished(TP, 1)
+    assert not tracker.is_finished(TP, 0)
+    tracker.finish(TP, 0)
+    # Confirmado: ya no espera a ningún anterior
+    assert not tracker.is_finished(TP, 1)
+
+
+def test_finishing_an_untracked_offset_is_ignored():
+    tracker = _tracker(0)
+
+    tracker.finish(TP, 5)
+
+    assert tracker.in_flight(TP) == 1
+    assert tracker.pop_committable() == {}
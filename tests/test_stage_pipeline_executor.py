@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from application.services.stage_pipeline_executor import StagePipelineExecutor
+from application.use_cases.workflows.workflow_bank_guarantee import WorkflowBankGuarantee
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+from domain.models.states.etl_base_state import EtlBaseState
+
+
+class _CorruptCheckpointWorkflow(WorkflowBankGuarantee):
+    async def restore_state(self, doc: DocumentContractState) -> EtlBaseState:
+        if doc.record_id == "1":
+            raise ValueError("checkpoint inválido")
+        return await super().restore_state(doc)
+
+
+@pytest.fixture
+def workflow_of(extractor, transformer, loader, notification):
+    def _workflow(cls: type[WorkflowBankGuarantee] = WorkflowBankGuarantee) -> WorkflowBankGuarantee:
+        return cls(extractor, transformer, loader, notification, engine="linear")
+
+    return _workflow
+
+
+async def _collect(executor: StagePipelineExecutor, documents: list[DocumentContractState]) -> list:
+    return [result async for result in executor.run(documents)]
+
+
+def test_every_document_reaches_the_results(workflow_of, documents):
+    results = asyncio.run(_collect(StagePipelineExecutor(workflow_of(), queue_size=1), documents(5)))
+
+    assert sorted(r.record_id for r in results) == [str(i) for i in range(5)]
+    assert {r.status for r in results} == {DocumentStatus.PROCESSED}
+
+
+def test_document_whose_state_cannot_be_restored_fails_alone(workflow_of, documents):
+    results = asyncio.run(_collect(StagePipelineExecutor(workflow_of(_CorruptCheckpointWorkflow)), documents(3)))
+
+    by_id = {r.record_id: r for r in results}
+    assert by_id["1"].status == DocumentStatus.FAILED
+    assert by_id["1"].failure_stage == "restore"
+    assert {by_id["0"].status, by_id["2"].status} == {DocumentStatus.PROCESSED}
+
+
+def test_feed_error_is_raised_instead_of_hanging(workflow_of, documents):
+    class _BrokenFeed(StagePipelineExecutor):
+        async def _feed(self, *args) -> None:
+            raise RuntimeError("feed interrumpido")
+
+    async def scenario() -> None:
+        await asyncio.wait_for(_collect(_BrokenFeed(workflow_of()), documents(2)), timeout=2)
+
+    with pytest.raises(RuntimeError, match="feed interrumpido"):
+        asyncio.run(scenario())
+
+
+def test_deadline_does_not_count_the_wait_for_the_first_stage(workflow_of, extractor, documents):
+    extract = extractor.extract_pipeline
+
+    async def slow_extract(document_data):
+        await asyncio.sleep(0.05)
+        return await extract(document_data)
+
+    extractor.extract_pipeline = slow_extract
+    # Un solo worker de extract: el quinto documento espera ~0.2 s en la cola, más que su tiempo máximo
+    executor = StagePipelineExecutor(workflow_of(), queue_size=1, deadline_seconds=0.15)
+
+    results = asyncio.run(_collect(executor, documents(5)))
+
+    assert {r.status for r in results} == {DocumentStatus.PROCESSED}
@@ -0,0 +1,69 @@
+import asyncio
+import gzip
+import json
+import os
+from pathlib import Path
+
+from infrastructure.adapters.extractors.textract.textract_analysis_cache import TextractAnalysisCache
+from infrastructure.config.app_settings import TextractCacheSettings
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+BLOCKS = [{"Id": "1", "BlockType": "LINE", "Text": "CARTA FIANZA"}]
+
+
+def _cache(tmp_path: Path, disk_max_bytes: int = 1024 * 1024) -> tuple[TextractAnalysisCache, MetricsRegistry]:
+    metrics = MetricsRegistry()
+    settings = TextractCacheSettings(enabled=True, disk_dir=str(tmp_path), disk_max_bytes=disk_max_bytes)
+    return TextractAnalysisCache(settings, metrics), metrics
+
+
+def _disk_bytes(tmp_path: Path) -> int:
+    return sum(entry.stat().st_size for entry in tmp_path.iterdir())
+
+
+def test_blocks_survive_a_restart_through_the_disk_cache(tmp_path):
+    cache, _ = _cache(tmp_path)
+    asyncio.run(cache.put("key", BLOCKS))
+
+    restarted, metrics = _cache(tmp_path)
+
+    assert asyncio.run(restarted.get("key")) == BLOCKS
+    assert metrics.snapshot()["counters"]["textract_cache.disk.hits"] == 1
+
+
+def test_corrupt_disk_entry_is_a_miss_and_is_deleted(tmp_path):
+    (tmp_path / "truncated.json.gz").write_bytes(gzip.compress(json.dumps(BLOCKS).encode("utf-8"))[:10])
+    (tmp_path / "not_json.json.gz").write_bytes(gzip.compress(b"{no es json"))
+    cache, metrics = _cache(tmp_path)
+
+    assert asyncio.run(cache.get("truncated")) is None
+    assert asyncio.run(cache.get("not_json")) is None
+
+    assert list(tmp_path.iterdir()) == []
+    counters = metrics.snapshot()["counters"]
+    assert counters["textract_cache.corrupt_entries"] == 2
+    assert counters["textract_cache.disk.misses"] == 2
+
+    # El nuevo análisis reemplaza la entrada descartada
+    asyncio.run(cache.put("truncated", BLOCKS))
+    assert asyncio.run(_cache(tmp_path)[0].get("truncated")) == BLOCKS
+
+
+def test_disk_size_is_tracked_and_the_least_used_entries_are_evicted(tmp_path):
+    cache, metrics = _cache(tmp_path)
+    asyncio.run(cache.put("a", BLOCKS))
+    entry_size = _disk_bytes(tmp_path)
+
+    # Cabe exactamente en dos entradas; leer "a" la deja como la más usada
+    cache, metrics = _cache(tmp_path, disk_max_bytes=2 * entry_size)
+    asyncio.run(cache.put("b", BLOCKS))
+    cache._memory.clear()
+    assert asyncio.run(cache.get("a")) == BLOCKS
+    asyncio.run(cache.put("c", BLOCKS))
+    # Reescribir una llave no duplica su tamaño en el total
+    asyncio.run(cache.put("c", BLOCKS))
+
+    assert sorted(os.listdir(tmp_path)) == ["a.json.gz", "c.json.gz"]
+    snapshot = metrics.snapshot()
+    assert snapshot["gauges"]["textract_cache.disk.bytes"] == _disk_bytes(tmp_path)
+    assert snapshot["counters"]["textract_cache.disk.evictions"] == 1
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from infrastructure.adapters.extractors.textract.textract_completion_listener import TextractCompletionListener
+from infrastructure.adapters.extractors.textract.textract_completion_queue import (
+    InMemoryTextractCompletionQueue,
+    TextractCompletionQueue,
+)
+
+
+def test_parse_body_accepts_sns_envelope_and_raw_delivery():
+    raw = json.dumps({"JobId": "job-1", "Status": "SUCCEEDED"})
+
+    assert TextractCompletionQueue.parse_body(json.dumps({"Message": raw})).job_id == "job-1"
+    assert TextractCompletionQueue.parse_body(raw, "rh").receipt_handle == "rh"
+    assert TextractCompletionQueue.parse_body("{not json") is None
+    assert TextractCompletionQueue.parse_body(json.dumps({"JobId": "job-1"})) is None
+
+
+def test_notification_wakes_the_waiting_job():
+    async def scenario() -> tuple[str | None, list[str]]:
+        queue = InMemoryTextractCompletionQueue()
+        listener = TextractCompletionListener(queue, wait_seconds=1)
+        waiting = asyncio.create_task(listener.wait_for("job-1", timeout=2))
+        await asyncio.sleep(0)
+        queue.publish("job-1", "FAILED")
+        status = await waiting
+        await listener.stop()
+        return status, queue.deleted
+
+    status, deleted = asyncio.run(scenario())
+
+    assert status == "FAILED"
+    assert len(deleted) == 1
+
+
+def test_notification_for_another_job_is_left_in_the_queue():
+    async def scenario() -> list[str]:
+        queue = InMemoryTextractCompletionQueue()
+        listener = TextractCompletionListener(queue, wait_seconds=1)
+        waiting = asyncio.create_task(listener.wait_for("job-1", timeout=2))
+        await asyncio.sleep(0)
+        # job-other lo espera otro worker: no se elimina para que le vuelva a llegar
+        queue.publish("job-other")
+        queue.publish("job-1")
+        await waiting
+        await listener.stop()
+        return queue.deleted
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_notification_received_before_waiting_is_kept():
+    async def scenario() -> str | None:
+        queue = InMemoryTextractCompletionQueue()
+        listener = TextractCompletionListener(queue, wait_seconds=1)
+        queue.publish("job-early")
+        # Otro job arranca el consumidor y recibe la notificación de job-early antes de que se espere
+        await listener.wait_for("job-other", timeout=0.2)
+        status = await listener.wait_for("job-early", timeout=0.2)
+        await listener.stop()
+        return status
+
+    assert asyncio.run(scenario()) == "SUCCEEDED"
+
+
+def test_missing_notification_times_out():
+    async def scenario() -> str | None:
+        listener = TextractCompletionListener(InMemoryTextractCompletionQueue(), wait_seconds=1)
+        status = await listener.wait_for("job-1", timeout=0.05)
+        await listener.stop()
+        return status
+
+    assert asyncio.run(scenario()) is None
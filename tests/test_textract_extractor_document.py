@@ -0,0 +1,166 @@
+import asyncio
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+from pypdf import PdfWriter
+
+from infrastructure.adapters.extractors.textract.textract_extractor_document import TextractExtractorDocument
+from infrastructure.internal_models.prepared_document import PreparedDocument
+from infrastructure.utils.pdf_utils.pdf_utils import PdfUtils
+
+
+def _extractor(**textract_settings) -> TextractExtractorDocument:
+    extractor = TextractExtractorDocument()
+    settings = extractor.app_settings
+    extractor.app_settings = settings.model_copy(update={
+        "textract_settings": settings.textract_settings.model_copy(update=textract_settings)
+    })
+    return extractor
+
+
+def _pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class _FakeS3:
+    """Bucket en memoria para _call_s3/_read_object; cuenta las llamadas por operación"""
+
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects: dict[str, bytes] = dict(objects)
+        self.calls: list[str] = []
+
+    def attach(self, extractor: TextractExtractorDocument) -> None:
+        extractor._head_object = self.head_object
+        extractor._read_object = self.read_object
+        extractor._call_s3 = self.call_s3
+
+    async def head_object(self, key: str) -> dict | None:
+        self.calls.append("head_object")
+        return {"ETag": '"etag"'} if key in self.objects else None
+
+    async def read_object(self, key: str) -> bytes:
+        self.calls.append("get_object")
+        return self.objects[key]
+
+    async def call_s3(self, operation: str, **kwargs) -> dict:
+        self.calls.append(operation)
+        self.objects[kwargs["Key"]] = kwargs["Body"]
+        return {}
+
+
+def _result_page(page: int, next_token: str | None) -> dict:
+    resp = {"JobStatus": "SUCCEEDED", "Blocks": [{"Id": f"l{page}", "BlockType": "LINE", "Page": page}]}
+    if next_token is not None:
+        resp["NextToken"] = next_token
+    return resp
+
+
+def test_result_pages_stop_once_the_used_pages_are_complete():
+    extractor = _extractor(stop_after_page=1)
+    requested: list[str] = []
+
+    async def call_textract(operation: str, **kwargs) -> dict:
+        requested.append(kwargs["NextToken"])
+        return {"t2": _result_page(2, "t3"), "t3": _result_page(3, None)}[kwargs["NextToken"]]
+
+    extractor._call_textract = call_textract
+    index = asyncio.run(extractor._get_analysis_result("job-1", _result_page(1, "t2")))
+
+    # La página 2 confirma que la 1 llegó completa: la 3 ya no se pide
+    assert requested == ["t2"]
+    assert [b["Id"] for b in index.blocks] == ["l1"]
+
+
+def test_all_result_pages_are_read_without_early_stop():
+    extractor = _extractor(stop_after_page=None)
+
+    async def call_textract(operation: str, **kwargs) -> dict:
+        return {"t2": _result_page(2, "t3"), "t3": _result_page(3, None)}[kwargs["NextToken"]]
+
+    extractor._call_textract = call_textract
+    index = asyncio.run(extractor._get_analysis_result("job-1", _result_page(1, "t2")))
+
+    assert [b["Id"] for b in index.blocks] == ["l1", "l2", "l3"]
+
+
+def test_long_pdf_is_trimmed_once_and_reused():
+    extractor = _extractor(trim_pages=1, trim_prefix="trimmed/")
+    s3 = _FakeS3({"cartas/1.pdf": _pdf(3)})
+    s3.attach(extractor)
+
+    async def scenario():
+        first = await extractor._prepare_document("cartas/1.pdf", '"abc"')
+        calls = len(s3.calls)
+        second = await extractor._prepare_document("cartas/1.pdf", '"abc"')
+        return first, second, calls
+
+    first, second, calls = asyncio.run(scenario())
+
+    assert first.key == second.key == "trimmed/abc-p1.pdf"
+    assert first.page_count == 1 and first.content == s3.objects["trimmed/abc-p1.pdf"]
+    assert PdfUtils.count_pages(first.content) == 1
+    # El segundo pedido sale de la memoria del extractor sin tocar S3 ni retener el PDF
+    assert len(s3.calls) == calls and second.content is None
+
+
+def test_short_pdf_is_sent_as_is():
+    extractor = _extractor(trim_pages=2)
+    s3 = _FakeS3({"cartas/1.pdf": _pdf(1)})
+    s3.attach(extractor)
+
+    document = asyncio.run(extractor._prepare_document("cartas/1.pdf", '"abc"'))
+
+    assert document.key == "cartas/1.pdf" and document.page_count == 1
+    assert "put_object" not in s3.calls
+
+
+def test_trimming_failure_falls_back_to_the_full_document():
+    extractor = _extractor(trim_pages=1)
+    s3 = _FakeS3({"cartas/1.pdf": b"no es un pdf"})
+    s3.attach(extractor)
+
+    document = asyncio.run(extractor._prepare_document("cartas/1.pdf", '"abc"'))
+
+    assert document.key == "cartas/1.pdf" and document.page_count is None
+
+
+@pytest.mark.parametrize("sync_mode, page_count, expected", [
+    ("auto", 1, True),
+    # Sin conteo de pypdf o con varias páginas se usa el job asíncrono
+    ("auto", None, False),
+    ("auto", 3, False),
+    ("always", None, True),
+    ("never", 1, False),
+])
+def test_sync_path_is_decided_from_the_page_count(sync_mode, page_count, expected):
+    extractor = _extractor(sync_mode=sync_mode)
+
+    assert extractor._use_sync_path(PreparedDocument(key="cartas/1.pdf", page_count=page_count)) is expected
+
+
+def test_sync_analysis_sends_downloaded_bytes_and_falls_back_when_rejected():
+    extractor = _extractor(stop_after_page=1)
+    documents: list[dict] = []
+
+    async def call_textract(operation: str, Document: dict, **kwargs) -> dict:
+        documents.append(Document)
+        if "S3Object" in Document:
+            raise ClientError({"Error": {"Code": "UnsupportedDocumentException"}}, "AnalyzeDocument")
+        return {"Blocks": [_result_page(1, None)["Blocks"][0], _result_page(2, None)["Blocks"][0]]}
+
+    extractor._call_textract = call_textract
+
+    index = asyncio.run(extractor._analyze_document_sync(
+        PreparedDocument(key="cartas/1.pdf", page_count=1, content=b"%PDF")))
+    fallback = asyncio.run(extractor._analyze_document_sync(PreparedDocument(key="cartas/2.pdf")))
+
+    assert documents[0] == {"Bytes": b"%PDF"}
+    assert [b["Id"] for b in index.blocks] == ["l1"]
+    # Un rechazo de textract no es un error: el documento sigue por el job asíncrono
+    assert fallback is None
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from infrastructure.adapters.extractors.textract.textract_job_tracker import TextractJobTracker
+
+
+class _Jobs:
+    """Textract falso: cada job termina tras una cantidad de consultas y registra cuándo se consultó"""
+
+    def __init__(self, polls_until_done: dict[str, int], fail_first: set[str] = frozenset()):
+        self.remaining: dict[str, int] = dict(polls_until_done)
+        self.fail_first: set[str] = set(fail_first)
+        self.polls: list[str] = []
+
+    async def fetch_page(self, job_id: str) -> dict:
+        self.polls.append(job_id)
+        if job_id in self.fail_first:
+            self.fail_first.discard(job_id)
+            raise RuntimeError("ThrottlingException")
+        self.remaining[job_id] -= 1
+        status = "SUCCEEDED" if self.remaining[job_id] <= 0 else "IN_PROGRESS"
+        return {"JobStatus": status, "JobId": job_id}
+
+
+def test_single_poller_resolves_every_tracked_job():
+    jobs = _Jobs({"a": 1, "b": 3, "c": 2})
+
+    async def scenario() -> list[dict]:
+        tracker = TextractJobTracker(jobs.fetch_page, schedule_seconds=(0.01,))
+        results = await asyncio.wait_for(asyncio.gather(*(tracker.track(j) for j in ("a", "b", "c"))), timeout=2)
+        assert tracker.pending_jobs == 0
+        await tracker.stop()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [r["JobId"] for r in results] == ["a", "b", "c"]
+    assert sorted(jobs.polls) == ["a", "b", "b", "b", "c", "c"]
+
+
+def test_failed_poll_is_retried_on_the_schedule():
+    jobs = _Jobs({"a": 1}, fail_first={"a"})
+
+    async def scenario() -> dict:
+        tracker = TextractJobTracker(jobs.fetch_page, schedule_seconds=(0.01,))
+        result = await asyncio.wait_for(tracker.track("a"), timeout=2)
+        await tracker.stop()
+        return result
+
+    assert asyncio.run(scenario())["JobStatus"] == "SUCCEEDED"
+    assert jobs.polls == ["a", "a"]
+
+
+def test_check_now_brings_a_scheduled_poll_forward():
+    jobs = _Jobs({"a": 1})
+
+    async def scenario() -> dict:
+        tracker = TextractJobTracker(jobs.fetch_page, schedule_seconds=(60,))
+        future = tracker.track("a")
+        await asyncio.sleep(0.05)
+        assert jobs.polls == []
+        tracker.track("a", check_now=True)
+        result = await asyncio.wait_for(future, timeout=2)
+        await tracker.stop()
+        return result
+
+    assert asyncio.run(scenario())["JobStatus"] == "SUCCEEDED"
+
+
+def test_job_exceeding_the_max_wait_fails_with_timeout():
+    jobs = _Jobs({"a": 1_000})
+
+    async def scenario() -> None:
+        tracker = TextractJobTracker(jobs.fetch_page, schedule_seconds=(0.01,), max_wait_seconds=0.05)
+        try:
+            await asyncio.wait_for(tracker.track("a"), timeout=2)
+        finally:
+            assert tracker.pending_jobs == 0
+            await tracker.stop()
+
+    with pytest.raises(TimeoutError, match="tiempo máximo"):
+        asyncio.run(scenario())
+
+
+def test_cancelled_waiter_stops_being_polled():
+    jobs = _Jobs({"a": 1_000})
+
+    async def scenario() -> int:
+        tracker = TextractJobTracker(jobs.fetch_page, schedule_seconds=(0.01,))
+        tracker.track("a").cancel()
+        await asyncio.sleep(0.1)
+        pending = tracker.pending_jobs
+        await tracker.stop()
+        return pending
+
+    assert asyncio.run(scenario()) == 0
+    assert jobs.polls == []
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from infrastructure.adapters.extractors.textract import textract_rate_limiter
+from infrastructure.adapters.extractors.textract.textract_rate_limiter import TextractRateLimiter
+from infrastructure.config.app_settings import TextractSettings, get_app_settings
+from infrastructure.utils.metrics_utils.metrics_registry import MetricsRegistry
+
+
+class _NoJitter:
+    """Reemplaza el módulo random del limitador: las esperas entre reintentos son de cero segundos"""
+
+    @staticmethod
+    def uniform(a: float, b: float) -> float:
+        return 0.0
+
+
+def _error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code}}, "GetDocumentAnalysis")
+
+
+def _limiter(monkeypatch, process_share: int = 1, **overrides) -> tuple[TextractRateLimiter, MetricsRegistry]:
+    monkeypatch.setattr(textract_rate_limiter, "random", _NoJitter)
+    settings: TextractSettings = get_app_settings().textract_settings.model_copy(update=overrides)
+    metrics = MetricsRegistry()
+    return TextractRateLimiter(settings, metrics, process_share), metrics
+
+
+def _flaky(errors: list[ClientError]):
+    calls: list[int] = []
+
+    async def call() -> dict:
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return {"JobStatus": "SUCCEEDED"}
+
+    return call, calls
+
+
+def test_throttled_call_is_retried_instead_of_failing(monkeypatch):
+    limiter, metrics = _limiter(monkeypatch, get_analysis_max_rps=100)
+    call, calls = _flaky([_error("ThrottlingException"), _error("ProvisionedThroughputExceededException")])
+
+    resp = asyncio.run(limiter.call("GetDocumentAnalysis", call))
+
+    assert resp == {"JobStatus": "SUCCEEDED"} and len(calls) == 3
+    assert metrics.snapshot()["counters"]["rate_limit.textract.get_document_analysis.throttled"] == 2
+
+
+def test_other_errors_and_exhausted_retries_are_raised(monkeypatch):
+    limiter, _ = _limiter(monkeypatch, get_analysis_max_rps=100, throttle_max_retries=1)
+
+    call, calls = _flaky([_error("InvalidJobIdException")])
+    with pytest.raises(ClientError):
+        asyncio.run(limiter.call("GetDocumentAnalysis", call))
+    assert len(calls) == 1
+
+    call, calls = _flaky([_error("ThrottlingException"), _error("ThrottlingException")])
+    with pytest.raises(ClientError):
+        asyncio.run(limiter.call("GetDocumentAnalysis", call))
+    assert len(calls) == 2
+
+
+def test_budget_is_split_between_worker_processes(monkeypatch):
+    limiter, _ = _limiter(monkeypatch, process_share=4, start_analysis_max_rps=2, get_analysis_max_rps=8,
+                          analyze_document_max_rps=1)
+
+    assert limiter.buckets["StartDocumentAnalysis"].rate == 0.5
+    assert limiter.buckets["GetDocumentAnalysis"].rate == 2
+    assert limiter.buckets["AnalyzeDocument"].rate == 0.25
+
+
+def test_calls_are_admitted_at_the_configured_rate(monkeypatch):
+    limiter, _ = _limiter(monkeypatch, get_analysis_max_rps=20)
+
+    async def scenario() -> float:
+        async def call() -> dict:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        # La ráfaga inicial es de un segundo de tokens; las 10 siguientes esperan su turno
+        await asyncio.gather(*(limiter.call("GetDocumentAnalysis", call) for _ in range(30)))
+        return loop.time() - started_at
+
+    assert asyncio.run(scenario()) >= 0.4
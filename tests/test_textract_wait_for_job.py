@@ -0,0 +1,57 @@
+import asyncio
+
+from infrastructure.adapters.extractors.textract.textract_completion_listener import TextractCompletionListener
+from infrastructure.adapters.extractors.textract.textract_completion_queue import InMemoryTextractCompletionQueue
+from infrastructure.adapters.extractors.textract.textract_extractor_document import TextractExtractorDocument
+from infrastructure.adapters.extractors.textract.textract_job_tracker import TextractJobTracker
+
+
+class _Job:
+    """Job de textract falso: termina cuando se marca finished y cuenta las consultas"""
+
+    def __init__(self):
+        self.finished: bool = False
+        self.polls: int = 0
+
+    async def fetch_page(self, job_id: str) -> dict:
+        self.polls += 1
+        return {"JobStatus": "SUCCEEDED" if self.finished else "IN_PROGRESS"}
+
+
+def _extractor(job: _Job, queue: InMemoryTextractCompletionQueue, schedule: tuple[float, ...]) -> TextractExtractorDocument:
+    extractor = TextractExtractorDocument(completion_listener=TextractCompletionListener(queue, wait_seconds=1))
+    extractor.job_tracker = TextractJobTracker(fetch_page=job.fetch_page, schedule_seconds=schedule)
+    return extractor
+
+
+def test_polling_runs_while_the_notification_never_arrives():
+    async def scenario() -> dict:
+        job = _Job()
+        extractor = _extractor(job, InMemoryTextractCompletionQueue(), schedule=(0.01,))
+        job.finished = True
+        # Sin notificación el tracker resuelve el job sin esperar notification_timeout_seconds
+        resp = await asyncio.wait_for(extractor._wait_for_job("job-1"), timeout=2)
+        await extractor.job_tracker.stop()
+        await extractor.completion_listener.stop()
+        return resp
+
+    assert asyncio.run(scenario())["JobStatus"] == "SUCCEEDED"
+
+
+def test_notification_brings_the_next_poll_forward():
+    async def scenario() -> tuple[dict, int]:
+        job = _Job()
+        queue = InMemoryTextractCompletionQueue()
+        extractor = _extractor(job, queue, schedule=(60,))
+        waiting = asyncio.create_task(extractor._wait_for_job("job-1"))
+        await asyncio.sleep(0.05)
+        job.finished = True
+        queue.publish("job-1")
+        resp = await asyncio.wait_for(waiting, timeout=2)
+        await extractor.job_tracker.stop()
+        await extractor.completion_listener.stop()
+        return resp, job.polls
+
+    resp, polls = asyncio.run(scenario())
+    assert resp["JobStatus"] == "SUCCEEDED"
+    assert polls == 1
@@ -0,0 +1,112 @@
+from mypy_boto3_textract.type_defs import BlockTypeDef
+
+from benchmarks.synthetic_textract import SyntheticTextractConfig, SyntheticTextractGenerator
+from infrastructure.utils.textract_utils.block_index import BlockIndex
+from infrastructure.utils.textract_utils.texttract_utils import TextractUtils
+
+
+def _reference_date(letter_block: BlockTypeDef, blocks: list[BlockTypeDef]) -> BlockTypeDef | None:
+    """Recorrido original: última línea (de cualquier página) por encima y a la izquierda de la carta"""
+    box = letter_block["Geometry"]["BoundingBox"]
+    candidates = [
+        b for b in blocks
+        if b["BlockType"] == "LINE"
+        and b["Geometry"]["BoundingBox"]["Top"] < box["Top"]
+        and b["Geometry"]["BoundingBox"]["Left"] < box["Left"] + box["Width"]
+    ]
+    return candidates[-1] if candidates else None
+
+
+def test_date_matches_reference_on_single_page():
+    blocks = SyntheticTextractGenerator(SyntheticTextractConfig(pages=1)).blocks()
+    letter = TextractUtils.get_letter_block(blocks)
+
+    date = TextractUtils.get_date_by_letter_position(letter, BlockIndex(blocks))
+
+    assert date is _reference_date(letter, blocks)
+    assert date["Page"] == 1
+
+
+def test_candidate_on_another_page_matches_reference():
+    # Las páginas siguientes también tienen líneas por encima de la carta; el recorrido original las considera
+    blocks = SyntheticTextractGenerator(SyntheticTextractConfig(pages=3)).blocks()
+    letter = TextractUtils.get_letter_block(blocks)
+
+    date = TextractUtils.get_date_by_letter_position(letter, BlockIndex(blocks))
+
+    assert date is _reference_date(letter, blocks)
+    assert date["Page"] != letter["Page"]
+
+
+class _TableBuilder:
+    """Bloques mínimos de textract: tablas de una fila cuyas celdas contienen líneas de palabras"""
+
+    def __init__(self):
+        self.blocks: list[BlockTypeDef] = []
+        self._ids: int = 0
+
+    def _id(self) -> str:
+        self._ids += 1
+        return f"b{self._ids}"
+
+    def words(self, text: str) -> list[BlockTypeDef]:
+        words = [{"BlockType": "WORD", "Id": self._id(), "Page": 1, "Text": w} for w in text.split()]
+        self.blocks.extend(words)
+        return words
+
+    def line(self, *words: BlockTypeDef) -> None:
+        self.blocks.append({
+            "BlockType": "LINE", "Id": self._id(), "Page": 1, "Text": " ".join(w["Text"] for w in words),
+            "Relationships": [{"Type": "CHILD", "Ids": [w["Id"] for w in words]}],
+        })
+
+    def table(self, *cells: list[list[BlockTypeDef]] | list[BlockTypeDef]) -> str:
+        cell_blocks = []
+        for column, words in enumerate(cells, start=1):
+            cell_blocks.append({
+                "BlockType": "CELL", "Id": self._id(), "Page": 1, "RowIndex": 1, "ColumnIndex": column,
+                "RowSpan": 1, "ColumnSpan": 1, "Relationships": [{"Type": "CHILD", "Ids": [w["Id"] for w in words]}],
+            })
+        table = {"BlockType": "TABLE", "Id": self._id(), "Page": 1,
+                 "Relationships": [{"Type": "CHILD", "Ids": [c["Id"] for c in cell_blocks]}]}
+        self.blocks.extend([*cell_blocks, table])
+        return table["Id"]
+
+
+def _reference_table_id(blocks: list[BlockTypeDef]) -> str | None:
+    """Selección original: primera tabla de la página 1 con alguna palabra clave dentro de una celda"""
+    tables = [t for t in TextractUtils.build_tables_from_textract_blocks(blocks) if t.page == 1]
+    matching = TextractUtils.filter_tables_keyword(tables, blocks)
+    return matching[0].table_block["Id"] if matching else None
+
+
+def test_earlier_table_matching_only_per_cell_is_preferred():
+    builder = _TableBuilder()
+    # Primera tabla: la cabecera está partida en dos líneas dentro de la misma celda (sin coincidencia por línea)
+    adenda, actual = builder.words("ADENDA"), builder.words("ACTUAL")
+    builder.line(*adenda)
+    builder.line(*actual)
+    first = builder.table(adenda + actual)
+    # Segunda tabla: coincidencia directa del motor de palabras clave
+    disbursed = builder.words("DESEMBOLSADOS")
+    builder.line(*disbursed)
+    builder.table(disbursed)
+
+    selected = TextractUtils.select_table(BlockIndex(builder.blocks))
+
+    assert selected.table_block["Id"] == first == _reference_table_id(builder.blocks)
+
+
+def test_line_spanning_two_cells_does_not_select_the_table():
+    builder = _TableBuilder()
+    # Primera tabla: "ADENDA | ACTUAL" es una sola LINE repartida en dos celdas
+    adenda, actual = builder.words("ADENDA"), builder.words("ACTUAL")
+    builder.line(*adenda, *actual)
+    builder.table(adenda, actual)
+    disbursed = builder.words("DESEMBOLSADOS")
+    builder.line(*disbursed)
+    second = builder.table(disbursed)
+
+    selected = TextractUtils.select_table(BlockIndex(builder.blocks))
+
+    assert selected.table_block["Id"] == second == _reference_table_id(builder.blocks)
@@ -0,0 +1,128 @@
+from infrastructure.bootstrap import worker_supervisor
+from infrastructure.bootstrap.worker_supervisor import WorkerSupervisor
+
+
+class _FakeProcess:
+    def __init__(self, pid: int):
+        self.pid: int = pid
+        self.exitcode: int | None = None
+        self.alive: bool = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def join(self, timeout: float | None = None) -> None:
+        return None
+
+
+class _FakeSupervisor(WorkerSupervisor):
+    """Supervisor que no crea procesos: cada inicio registra un proceso falso con un pid nuevo"""
+
+    def __init__(self, processes: int):
+        super().__init__(processes, target=lambda index, metrics_queue: None)
+        self.starts: list[int] = []
+
+    def _start_worker(self, index: int) -> None:
+        self.starts.append(index)
+        self._workers[index] = _FakeProcess(pid=100 + len(self.starts))
+        self._started_at[index] = worker_supervisor.time.monotonic()
+        self._restart_at.pop(index, None)
+
+    def crash(self, index: int) -> None:
+        self._workers[index].alive = False
+        self._workers[index].exitcode = 1
+
+
+class _Clock:
+    """Reemplaza el módulo time solo dentro del supervisor; las colas siguen usando el reloj real"""
+
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _supervisor(monkeypatch, processes: int = 1) -> tuple[_FakeSupervisor, _Clock]:
+    clock = _Clock()
+    monkeypatch.setattr(worker_supervisor, "time", clock)
+    supervisor = _FakeSupervisor(processes)
+    for index in range(processes):
+        supervisor._start_worker(index)
+    return supervisor, clock
+
+
+def _snapshot(counter: float, gauge: float) -> dict:
+    return {"counters": {"documents": counter}, "gauges": {"in_flight": gauge},
+            "timings": {"stage": {"count": 1, "total": 2.0, "max": 2.0}}}
+
+
+def test_crashing_worker_is_restarted_with_growing_backoff(monkeypatch):
+    supervisor, clock = _supervisor(monkeypatch)
+
+    # Primera caída rápida: 1s de espera
+    supervisor.crash(0)
+    supervisor._check_workers()
+    assert supervisor.starts == [0]
+    clock.now += 1
+    supervisor._check_workers()
+    assert supervisor.starts == [0, 0]
+
+    # Segunda caída rápida: 3s de espera
+    supervisor.crash(0)
+    supervisor._check_workers()
+    clock.now += 2
+    supervisor._check_workers()
+    assert supervisor.starts == [0, 0]
+    clock.now += 1
+    supervisor._check_workers()
+    assert supervisor.starts == [0, 0, 0]
+
+
+def test_backoff_is_capped_and_reset_after_a_stable_run(monkeypatch):
+    supervisor, clock = _supervisor(monkeypatch)
+    supervisor._failures[0] = 10
+
+    supervisor.crash(0)
+    supervisor._check_workers()
+    assert supervisor._restart_at[0] - clock.now == WorkerSupervisor.RESTART_MAX_DELAY_SECONDS
+
+    clock.now += WorkerSupervisor.RESTART_MAX_DELAY_SECONDS
+    supervisor._check_workers()
+    # Tras vivir lo suficiente el contador vuelve a cero y el reinicio es inmediato
+    clock.now += WorkerSupervisor.STABLE_SECONDS
+    supervisor.crash(0)
+    supervisor._check_workers()
+    assert supervisor._failures[0] == 0
+    assert supervisor.starts == [0, 0, 0]
+
+
+def test_aggregated_metrics_keep_counters_of_replaced_workers(monkeypatch):
+    supervisor, clock = _supervisor(monkeypatch, processes=2)
+    supervisor._latest_metrics = {0: _snapshot(5, 3), 1: _snapshot(7, 4)}
+
+    supervisor.crash(0)
+    supervisor._check_workers()
+    merged = supervisor.aggregated_metrics()
+
+    # Los contadores del proceso caído se conservan; sus gauges ya no aplican
+    assert merged["counters"] == {"documents": 12}
+    assert merged["gauges"] == {"in_flight": 4}
+    assert merged["timings"]["stage"] == {"count": 2, "total": 4.0, "max": 2.0}
+    assert merged["workers"] == {"processes": 2, "alive": 1, "reporting": 1}
+
+
+def test_late_report_of_a_replaced_worker_is_ignored(monkeypatch):
+    supervisor, clock = _supervisor(monkeypatch)
+    old_pid: int = supervisor._workers[0].pid
+    supervisor.crash(0)
+    supervisor._check_workers()
+    clock.now += 1
+    supervisor._check_workers()
+
+    supervisor._metrics_queue.put((0, old_pid, _snapshot(1, 1)))
+    supervisor._metrics_queue.put((0, supervisor._workers[0].pid, _snapshot(2, 2)))
+    supervisor._drain_metrics(timeout=1)
+    supervisor._drain_metrics(timeout=1)
+
+    assert supervisor.aggregated_metrics()["counters"] == {"documents": 2}
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from application.dto.textract_pipeline_result import TextractPipelineResult
+from application.ports.extractor_document_port import ExtractorDocumentPort
+from application.use_cases.workflows.workflow_bank_guarantee import WorkflowBankGuarantee
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+
+
+class _SlowExtractor(ExtractorDocumentPort):
+    """Extractor cuyo resultado depende del documento; los primeros documentos terminan al último"""
+
+    def __init__(self, extractor: ExtractorDocumentPort):
+        self._extractor = extractor
+
+    async def extract_pipeline(self, document_data: DocumentContractState) -> TextractPipelineResult | None:
+        result = await self._extractor.extract_pipeline(document_data)
+        await asyncio.sleep(0.05 - 0.004 * int(document_data.record_id))
+        if result is None:
+            return None
+        return result.model_copy(update={"letter_text": f"Carta {document_data.record_id}"})
+
+
+@pytest.mark.parametrize("engine", ["langgraph", "linear"])
+def test_one_workflow_runs_many_documents_at_once(engine, extractor, transformer, loader, notification, documents):
+    extractor.failures = {"3"}
+    workflow = WorkflowBankGuarantee(_SlowExtractor(extractor), transformer, loader, notification, engine=engine)
+    docs = documents(10)
+
+    async def scenario() -> list[DocumentContractState]:
+        return await asyncio.wait_for(asyncio.gather(*(workflow.execute(doc) for doc in docs)), timeout=5)
+
+    results = asyncio.run(scenario())
+
+    # Cada resultado corresponde a su documento aunque terminen en otro orden
+    assert [r.record_id for r in results] == [d.record_id for d in docs]
+    assert [r.status for r in results] == [
+        DocumentStatus.FAILED if d.record_id == "3" else DocumentStatus.PROCESSED for d in docs]
+    assert results[3].failure_reason == "No se consiguió extraer la metadata"
+    assert {e.supervisory_record_id: e.metadata.letter_text for e in loader.saved} == {
+        d.record_id: f"Carta {d.record_id}" for d in docs if d.record_id != "3"}
+    # El documento de entrada no se modifica
+    assert all(d.status != DocumentStatus.PROCESSED for d in docs)
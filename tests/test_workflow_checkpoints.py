@@ -0,0 +1,48 @@
+import asyncio
+
+from application.use_cases.workflows.workflow_bank_guarantee import WorkflowBankGuarantee
+from domain.enums.document_status import DocumentStatus
+from infrastructure.adapters.checkpoints.sqlite.sqlite_checkpoint_store import SqliteCheckpointStore
+
+
+def test_checkpoint_resumes_after_a_failure_and_is_deleted_after_success(
+        tmp_path, extractor, transformer, loader, notification, documents):
+    async def scenario() -> None:
+        store = SqliteCheckpointStore(str(tmp_path / "checkpoints.db"))
+        workflow = WorkflowBankGuarantee(extractor, transformer, loader, notification,
+                                         engine="linear", checkpoint_store=store)
+        doc = documents(1)[0].model_copy(update={"etag": '"v1"'})
+
+        loader.fail = True
+        assert (await workflow.execute(doc)).status == DocumentStatus.FAILED
+        loader.fail = False
+        # Se retoma después de extract: no se vuelve a llamar a textract
+        assert (await workflow.execute(doc)).status == DocumentStatus.PROCESSED
+        assert extractor.calls == 1
+        assert await store.load(workflow.checkpoint_key(doc)) is None
+
+        # Terminado el documento, una nueva ejecución empieza de cero
+        await workflow.execute(doc)
+        assert extractor.calls == 2
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_new_object_version_does_not_resume_the_previous_one(
+        tmp_path, extractor, transformer, loader, notification, documents):
+    async def scenario() -> None:
+        store = SqliteCheckpointStore(str(tmp_path / "checkpoints.db"))
+        workflow = WorkflowBankGuarantee(extractor, transformer, loader, notification,
+                                         engine="linear", checkpoint_store=store)
+        doc = documents(1)[0]
+
+        loader.fail = True
+        await workflow.execute(doc.model_copy(update={"etag": '"v1"'}))
+        loader.fail = False
+        await workflow.execute(doc.model_copy(update={"etag": '"v2"'}))
+
+        assert extractor.calls == 2
+        await store.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from application.use_cases.workflows.workflow_orchestrator import WorkflowOrchestrator
+from domain.enums.document_status import DocumentStatus
+from infrastructure.adapters.processed_documents.sqlite.sqlite_processed_document_store import (
+    SqliteProcessedDocumentStore,
+)
+
+
+def test_document_is_recorded_as_processed_only_after_its_notification(
+        tmp_path, extractor, poller, transformer, loader, notification, documents):
+    async def scenario() -> None:
+        store = SqliteProcessedDocumentStore(str(tmp_path / "processed.db"))
+        orchestrator = WorkflowOrchestrator(extractor, poller, transformer, loader, notification,
+                                            processed_document_store=store)
+        doc = documents(1)[0].model_copy(update={"etag": '"v1"'})
+
+        notification.fail = True
+        with pytest.raises(RuntimeError):
+            await orchestrator.execute([doc])
+
+        # La entrega repetida no se descarta: la notificación nunca salió
+        notification.fail = False
+        result = await orchestrator.execute([doc])
+        assert [d.status for d in result.total_documents_processed] == [DocumentStatus.PROCESSED]
+        assert len(notification.sent) == 1
+
+        result = await orchestrator.execute([doc])
+        assert result.total_documents_processed == []
+        assert [d.record_id for d in result.total_documents_skipped] == ["0"]
+        assert extractor.calls == 2
+        await orchestrator.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+
+from application.services.workflow_orchestrator_service import WorkflowOrchestratorServiceApplication
+from domain.enums.document_status import DocumentStatus
+from domain.models.states.document_contract_state import DocumentContractState
+
+
+class _TimedWorkflow:
+    """Workflow falso: cada documento tarda lo indicado en durations; registra los que están en curso"""
+
+    def __init__(self, durations: dict[str, float], failures: set[str] = frozenset()):
+        self.durations = durations
+        self.failures = failures
+        self.running: int = 0
+        self.max_running: int = 0
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def execute(self, doc: DocumentContractState) -> DocumentContractState:
+        self.started.append(doc.record_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.durations[doc.record_id])
+        except asyncio.CancelledError:
+            self.cancelled.append(doc.record_id)
+            raise
+        finally:
+            self.running -= 1
+        if doc.record_id in self.failures:
+            raise RuntimeError("falla del workflow")
+        return doc.model_copy(update={"status": DocumentStatus.PROCESSED})
+
+
+def _run(docs, wf, concurrency: int, deadline_seconds: float | None = None, take: int | None = None):
+    async def scenario() -> tuple[list[DocumentContractState], float]:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        results: list[DocumentContractState] = []
+        stream = WorkflowOrchestratorServiceApplication.run_sliding_window(docs, wf, concurrency, deadline_seconds)
+        async for result in stream:
+            results.append(result)
+            if take is not None and len(results) == take:
+                break
+        await stream.aclose()
+        # Deja que las cancelaciones pendientes lleguen a los documentos en curso
+        await asyncio.sleep(0)
+        return results, loop.time() - started_at
+
+    return asyncio.run(scenario())
+
+
+def test_next_document_starts_as_soon_as_one_finishes(documents):
+    docs = documents(4)
+    # Con batches de 2 serían 0.3 + 0.3; con ventana el "2" entra apenas termina el "1"
+    wf = _TimedWorkflow({"0": 0.3, "1": 0.05, "2": 0.05, "3": 0.3})
+
+    results, elapsed = _run(docs, wf, concurrency=2)
+
+    assert wf.max_running == 2
+    assert [r.record_id for r in results] == ["1", "2", "0", "3"]
+    assert all(r.status == DocumentStatus.PROCESSED for r in results)
+    assert elapsed < 0.5
+
+
+def test_failed_and_late_documents_are_reported_without_stopping_the_rest(documents):
+    docs = documents(3)
+    wf = _TimedWorkflow({"0": 0.01, "1": 1.0, "2": 0.01}, failures={"0"})
+
+    results, _ = _run(docs, wf, concurrency=3, deadline_seconds=0.1)
+    by_id = {r.record_id: r for r in results}
+
+    assert by_id["0"].status == DocumentStatus.FAILED and by_id["0"].failure_reason == "falla del workflow"
+    assert by_id["1"].status == DocumentStatus.FAILED and by_id["1"].failure_stage == "workflow"
+    assert by_id["2"].status == DocumentStatus.PROCESSED
+
+
+def test_abandoned_iteration_cancels_the_documents_in_flight(documents):
+    docs = documents(5)
+    wf = _TimedWorkflow({"0": 0.01, "1": 1.0, "2": 1.0, "3": 1.0, "4": 1.0})
+
+    results, _ = _run(docs, wf, concurrency=3, take=1)
+
+    assert [r.record_id for r in results] == ["0"]
+    # Ningún documento queda corriendo: los iniciados se cancelan y el resto ya no empieza
+    assert wf.running == 0
+    assert sorted(wf.cancelled) == sorted(set(wf.started) - {"0"})
+    assert "4" not in wf.started